@@ -0,0 +1,77 @@
+# proveedor/acciones.py
+
+"""
+Acciones masivas sobre los productos del proveedor (lista del panel).
+
+Cada acción es una sola sentencia sobre los productos elegidos, siempre
+filtrados por el proveedor: update() para activar, desactivar, destacar o
+cambiar la categoría, y delete() para eliminar. La selección puede ser una
+lista de ids o "todos los que cumplen los filtros" de la lista.
+
+update() no dispara señales: fecha_actualizacion (auto_now) se pone aquí y,
+si cambia 'activo', se reprograma el índice de búsqueda del directorio. El
+delete() sí las dispara por fila; el contador de productos se junta con
+contadores.en_lote() en un solo UPDATE.
+"""
+
+from django.db import transaction
+from django.http import QueryDict
+from django.utils import timezone
+
+from . import contadores
+from .busqueda import programar_indexacion
+from .listados import filtrar_productos
+from .models import ProductoServicio
+
+ACCIONES = {
+    'activar': 'Activar',
+    'desactivar': 'Desactivar',
+    'destacar': 'Marcar como destacados',
+    'quitar_destacado': 'Quitar destacado',
+    'categoria': 'Cambiar categoría',
+    'eliminar': 'Eliminar',
+}
+
+_CAMBIOS = {
+    'activar': {'activo': True},
+    'desactivar': {'activo': False},
+    'destacar': {'destacado': True},
+    'quitar_destacado': {'destacado': False},
+}
+
+
+def seleccion(proveedor, params):
+    """
+    Productos del proveedor elegidos en la lista: los ids marcados o, con
+    todos=1, los que cumplen los filtros de la lista ('filtros', la query
+    string con que se estaba viendo).
+    """
+    if params.get('todos') == '1':
+        return filtrar_productos(proveedor, QueryDict(params.get('filtros', '')))
+    ids = [i for i in params.getlist('productos') if i.isdigit()]
+    return ProductoServicio.objects.filter(proveedor=proveedor, pk__in=ids)
+
+
+def aplicar(proveedor, productos, accion, categoria=None):
+    """Aplica la acción a 'productos' y devuelve cuántos cambiaron. ValueError si no es válida."""
+    if accion == 'eliminar':
+        with transaction.atomic(), contadores.en_lote():
+            # QuerySet.delete() cuenta también las filas de otras tablas
+            _, por_modelo = productos.delete()
+        return por_modelo.get(ProductoServicio._meta.label, 0)
+
+    if accion == 'categoria':
+        if categoria not in dict(ProductoServicio.CATEGORIA_CHOICES):
+            raise ValueError('Elige una categoría válida.')
+        cambios = {'categoria': categoria}
+    elif accion in _CAMBIOS:
+        cambios = _CAMBIOS[accion]
+    else:
+        raise ValueError('Acción no válida.')
+
+    with transaction.atomic():
+        # Los que ya están así no se reescriben
+        total = productos.exclude(**cambios).update(**cambios, fecha_actualizacion=timezone.now())
+        if total and 'activo' in cambios:
+            programar_indexacion([proveedor.pk])
+    return total
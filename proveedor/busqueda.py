@@ -0,0 +1,218 @@
+# proveedor/busqueda.py
+
+"""
+Búsqueda de texto del directorio de proveedores.
+
+En vez de un LIKE '%texto%' sobre toda la tabla, cada proveedor tiene sus
+términos precalculados en TerminoBusqueda (índice invertido): nombre,
+descripción, nombres de sus rubros y de sus productos activos. Los términos se
+normalizan (minúsculas, sin tildes ni eñes) y se reducen a una raíz simple para que
+"panaderías", "panadería" y "panadero" coincidan. La consulta se normaliza
+igual y se resuelve con búsquedas por prefijo sobre el índice (termino,
+proveedor); la relevancia es la suma de los pesos de los términos encontrados,
+más un extra para los proveedores destacados y verificados.
+
+El índice se mantiene con señales (proveedor/signals.py) y se puede
+reconstruir completo con el comando reindexar_proveedores.
+"""
+
+import re
+import threading
+import unicodedata
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, OuterRef, Q, Subquery, Value, When
+
+PESO_NOMBRE = 8
+PESO_CATEGORIA = 4
+PESO_PRODUCTO = 3
+PESO_DESCRIPCION = 1
+
+BONO_DESTACADO = 5
+BONO_VERIFICADO = 3
+
+LARGO_MAXIMO_TERMINO = 50
+MAXIMO_TERMINOS_CONSULTA = 8
+
+STOPWORDS = frozenset('''
+    a al ante con de del desde e el en entre es esta este la las lo los mas muy
+    o para pero por que se sin sobre su sus tu un una uno unos unas y ya
+'''.split())
+
+# Primero se quita el plural y luego un sufijo derivativo (el primero de la
+# lista que deje una raíz de al menos 4 letras), así "panaderías", "panadería"
+# y "panadero" quedan en la misma raíz.
+PLURALES = (('ces', 'z'), ('es', ''), ('s', ''))
+SUFIJOS = (
+    'amiento', 'imiento', 'acion', 'icion', 'mente', 'ancia', 'encia',
+    'idad', 'ista', 'ismo', 'ible', 'able', 'ador', 'dora', 'eria', 'ero', 'era',
+)
+VOCALES_FINALES = 'aeo'
+LARGO_MINIMO_RAIZ = 4
+
+_PALABRA = re.compile(r'[a-z0-9]+')
+
+_estado = threading.local()
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes; la ñ queda como n porque muchos la escriben así."""
+    texto = unicodedata.normalize('NFKD', (texto or '').lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def raiz(palabra):
+    """Raíz aproximada de una palabra en español ya normalizada."""
+    for sufijo, reemplazo in PLURALES:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= 2:
+            palabra = palabra[:-len(sufijo)] + reemplazo
+            break
+    for sufijo in SUFIJOS:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= LARGO_MINIMO_RAIZ:
+            palabra = palabra[:-len(sufijo)]
+            break
+    if len(palabra) > 3 and palabra[-1] in VOCALES_FINALES:
+        palabra = palabra[:-1]
+    return palabra[:LARGO_MAXIMO_TERMINO]
+
+
+def terminos(texto):
+    """Raíces de las palabras significativas del texto, en orden y sin repetir."""
+    vistos = {}
+    for palabra in _PALABRA.findall(normalizar(texto)):
+        if palabra in STOPWORDS or len(palabra) < 2:
+            continue
+        vistos.setdefault(raiz(palabra), None)
+    return list(vistos)
+
+
+def terminos_proveedor(nombre, descripcion, categorias=(), productos=()):
+    """{termino: peso} del documento de un proveedor; cada término toma su mayor peso."""
+    pesos = {}
+    fuentes = [(nombre, PESO_NOMBRE), (descripcion, PESO_DESCRIPCION)]
+    fuentes += [(c, PESO_CATEGORIA) for c in categorias]
+    fuentes += [(p, PESO_PRODUCTO) for p in productos]
+    for texto, peso in fuentes:
+        for termino in terminos(texto):
+            if pesos.get(termino, 0) < peso:
+                pesos[termino] = peso
+    return pesos
+
+
+def indexar_proveedores(proveedor_ids):
+    """Reconstruye los términos de los proveedores indicados."""
+    from .models import Proveedor, ProductoServicio, TerminoBusqueda
+
+    proveedor_ids = list(proveedor_ids)
+    if not proveedor_ids:
+        return
+
+    categorias = {}
+    for pid, nombre in Proveedor.categorias.through.objects.filter(
+        proveedor_id__in=proveedor_ids
+    ).values_list('proveedor_id', 'categoriaproveedor__nombre'):
+        categorias.setdefault(pid, []).append(nombre)
+
+    productos = {}
+    for pid, nombre in ProductoServicio.objects.filter(
+        proveedor_id__in=proveedor_ids, activo=True
+    ).values_list('proveedor_id', 'nombre'):
+        productos.setdefault(pid, []).append(nombre)
+
+    nuevos = []
+    for pid, nombre, descripcion in Proveedor.objects.filter(
+        pk__in=proveedor_ids
+    ).values_list('pk', 'nombre_empresa', 'descripcion'):
+        pesos = terminos_proveedor(nombre, descripcion, categorias.get(pid, ()), productos.get(pid, ()))
+        nuevos += [TerminoBusqueda(proveedor_id=pid, termino=t, peso=p) for t, p in pesos.items()]
+
+    with transaction.atomic():
+        TerminoBusqueda.objects.filter(proveedor_id__in=proveedor_ids).delete()
+        TerminoBusqueda.objects.bulk_create(nuevos, batch_size=1000)
+
+
+def _indexar_pendientes():
+    proveedor_ids = getattr(_estado, 'pendientes', None)
+    _estado.pendientes = set()
+    if proveedor_ids:
+        indexar_proveedores(proveedor_ids)
+
+
+def programar_indexacion(proveedor_ids):
+    """
+    Reindexa al confirmar la transacción en curso (o en el acto, fuera de una
+    transacción). Los ids de una misma transacción se juntan en un solo
+    reindexado (un borrado masivo de productos dispara una señal por fila):
+    cada llamada deja su callback, el primero que corre reindexa todo lo
+    juntado y los demás encuentran el conjunto vacío. Si la transacción se
+    revierte, sus ids se reindexan con la siguiente que se confirme, lo que no
+    cambia el resultado.
+    """
+    proveedor_ids = set(proveedor_ids)
+    if not proveedor_ids:
+        return
+    pendientes = getattr(_estado, 'pendientes', None)
+    if pendientes is None:
+        pendientes = _estado.pendientes = set()
+    pendientes.update(proveedor_ids)
+    transaction.on_commit(_indexar_pendientes)
+
+
+def _coincidencias(consulta):
+    """
+    Queryset (proveedor_id, puntaje) de los proveedores que tienen todas las
+    palabras de la consulta (por prefijo, para que también sirva mientras se
+    escribe), o None si la consulta no tiene palabras significativas.
+    """
+    from .models import TerminoBusqueda
+
+    consulta_terminos = terminos(consulta)[:MAXIMO_TERMINOS_CONSULTA]
+    if not consulta_terminos:
+        return None
+
+    coincidencias = {
+        f'c{i}': Max(Case(When(termino__startswith=t, then=F('peso')), default=Value(0)))
+        for i, t in enumerate(consulta_terminos)
+    }
+    return (
+        TerminoBusqueda.objects
+        .filter(reduce(or_, (Q(termino__startswith=t) for t in consulta_terminos)))
+        .values('proveedor_id')
+        .annotate(**coincidencias)
+        .filter(**{f'{alias}__gt': 0 for alias in coincidencias})
+        .annotate(puntaje=reduce(lambda a, b: a + b, (F(alias) for alias in coincidencias)))
+    )
+
+
+def filtrar_por_texto(proveedores, consulta):
+    """Solo filtra (sin anotar relevancia); sirve para conteos."""
+    por_proveedor = _coincidencias(consulta)
+    if por_proveedor is None:
+        return proveedores
+    # El filtro por id usa el índice (termino, proveedor).
+    return proveedores.filter(pk__in=Subquery(por_proveedor.values('proveedor_id')))
+
+
+def buscar_proveedores(proveedores, consulta):
+    """
+    Filtra el queryset de proveedores por la consulta y lo anota con
+    'relevancia'. Si la consulta no tiene palabras significativas no se
+    filtra y la relevancia es solo el bono.
+    """
+    bono = (
+        Case(When(destacado=True, then=Value(BONO_DESTACADO)), default=Value(0))
+        + Case(When(verificado=True, then=Value(BONO_VERIFICADO)), default=Value(0))
+    )
+    por_proveedor = _coincidencias(consulta)
+    if por_proveedor is None:
+        return proveedores.annotate(relevancia=bono)
+
+    # La relevancia se calcula solo para los proveedores que coincidieron.
+    return filtrar_por_texto(proveedores, consulta).annotate(
+        relevancia=Subquery(
+            por_proveedor.filter(proveedor_id=OuterRef('pk')).values('puntaje')[:1],
+            output_field=IntegerField(),
+        ) + bono,
+    )
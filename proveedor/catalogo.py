@@ -0,0 +1,163 @@
+# proveedor/catalogo.py
+
+"""
+Catálogo público de productos de todos los proveedores.
+
+El listado se ordena por precio y se pagina por cursor (paginacion.py) sobre
+los índices (activo, categoria, precio_referencia, id) y (activo,
+precio_referencia, id): con o sin categoría, un rango de precios y la página
+siguiente son un recorrido acotado del índice, nunca de la tabla completa.
+Los productos sin precio no entran al catálogo (se ven en la página del
+proveedor).
+
+Los histogramas de precios por categoría (y con ellos el total de cada
+categoría) se precalculan en HistogramaPrecio con el comando
+calcular_histogramas; la página solo los lee. La caché es por proceso, así
+que la clave lleva el mayor id de HistogramaPrecio: cada cálculo reescribe
+las filas con ids nuevos y todos los procesos pasan a leer el nuevo cálculo
+sin depender de que alguien borre su caché.
+"""
+
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, IntegerField, Max, Min, Value
+from django.db.models.functions import Floor, Least
+
+from .models import HistogramaPrecio, ProductoServicio
+
+TRAMOS = 10
+POR_PAGINA = 24
+CLAVE_HISTOGRAMAS = 'catalogo:histogramas:{version}'
+DURACION_HISTOGRAMAS = 60 * 60
+
+ORDENES = {
+    'precio': ['precio_referencia', 'id'],
+    '-precio': ['-precio_referencia', '-id'],
+}
+ORDEN_POR_DEFECTO = 'precio'
+
+
+def _precio(valor):
+    try:
+        precio = Decimal((valor or '').strip())
+    except InvalidOperation:
+        return None
+    return precio if precio.is_finite() and precio >= 0 else None
+
+
+def filtros_de_request(params):
+    """Filtros válidos del GET; los valores que no se entienden se ignoran."""
+    filtros = {}
+    categoria = params.get('categoria')
+    if categoria in dict(ProductoServicio.CATEGORIA_CHOICES):
+        filtros['categoria'] = categoria
+    for nombre in ('precio_min', 'precio_max'):
+        precio = _precio(params.get(nombre))
+        if precio is not None:
+            filtros[nombre] = precio
+    region = (params.get('region') or '').strip()
+    if region.isdigit():
+        filtros['region'] = int(region)
+    if params.get('verificado') == '1':
+        filtros['verificado'] = True
+    return filtros
+
+
+def productos_catalogo(filtros):
+    """Queryset de productos del catálogo con los filtros aplicados (sin ordenar)."""
+    productos = ProductoServicio.objects.filter(
+        activo=True, precio_referencia__isnull=False, proveedor__activo=True,
+    )
+    if 'categoria' in filtros:
+        productos = productos.filter(categoria=filtros['categoria'])
+    if 'precio_min' in filtros:
+        productos = productos.filter(precio_referencia__gte=filtros['precio_min'])
+    if 'precio_max' in filtros:
+        productos = productos.filter(precio_referencia__lte=filtros['precio_max'])
+    if 'region' in filtros:
+        productos = productos.filter(proveedor__region_id=filtros['region'])
+    if filtros.get('verificado'):
+        productos = productos.filter(proveedor__verificado=True)
+    return productos.select_related('proveedor', 'proveedor__comuna')
+
+
+def _tramos_categoria(productos, minimo, maximo):
+    """[(desde, hasta, total)] en TRAMOS tramos de igual ancho entre minimo y maximo."""
+    ancho = (maximo - minimo) / TRAMOS or Decimal('1')
+    tramo = Least(
+        Floor(ExpressionWrapper(
+            (F('precio_referencia') - Value(minimo)) / Value(ancho), output_field=DecimalField(),
+        )),
+        Value(TRAMOS - 1),
+        output_field=IntegerField(),
+    )
+    totales = {
+        int(fila['tramo']): fila['total']
+        for fila in productos.annotate(tramo=tramo).values('tramo').annotate(total=Count('pk')).order_by()
+    }
+    centavo = Decimal('0.01')
+    return [
+        (
+            (minimo + ancho * i).quantize(centavo),
+            maximo if i == TRAMOS - 1 else (minimo + ancho * (i + 1)).quantize(centavo),
+            totales.get(i, 0),
+        )
+        for i in range(TRAMOS)
+    ]
+
+
+def calcular_histogramas():
+    """Recalcula HistogramaPrecio para todas las categorías. Devuelve las filas escritas."""
+    productos = ProductoServicio.objects.filter(
+        activo=True, precio_referencia__isnull=False, proveedor__activo=True,
+    )
+    rangos = productos.values('categoria').annotate(
+        minimo=Min('precio_referencia'), maximo=Max('precio_referencia'),
+    ).order_by()
+
+    filas = []
+    for rango in rangos:
+        tramos = _tramos_categoria(
+            productos.filter(categoria=rango['categoria']), rango['minimo'], rango['maximo'],
+        )
+        filas += [
+            HistogramaPrecio(categoria=rango['categoria'], tramo=i, desde=desde, hasta=hasta, total=total)
+            for i, (desde, hasta, total) in enumerate(tramos)
+        ]
+
+    with transaction.atomic():
+        HistogramaPrecio.objects.all().delete()
+        HistogramaPrecio.objects.bulk_create(filas)
+    return len(filas)
+
+
+def histogramas():
+    """
+    {categoria: {'nombre', 'total', 'tramos': [{'desde', 'hasta', 'total',
+    'altura'}]}} para las categorías con productos, según el último cálculo.
+    """
+    # Cambia con cada cálculo (ver el docstring del módulo)
+    version = HistogramaPrecio.objects.aggregate(ultimo=Max('pk'))['ultimo'] or 0
+    clave = CLAVE_HISTOGRAMAS.format(version=version)
+    datos = cache.get(clave)
+    if datos is not None:
+        return datos
+
+    nombres = dict(ProductoServicio.CATEGORIA_CHOICES)
+    datos = {}
+    for fila in HistogramaPrecio.objects.order_by('categoria', 'tramo').values('categoria', 'desde', 'hasta', 'total'):
+        categoria = datos.setdefault(
+            fila['categoria'], {'nombre': nombres.get(fila['categoria'], fila['categoria']), 'total': 0, 'tramos': []},
+        )
+        categoria['tramos'].append({'desde': fila['desde'], 'hasta': fila['hasta'], 'total': fila['total']})
+        categoria['total'] += fila['total']
+
+    for categoria in datos.values():
+        maximo = max(t['total'] for t in categoria['tramos']) or 1
+        for t in categoria['tramos']:
+            t['altura'] = round(t['total'] * 100 / maximo)
+
+    cache.set(clave, datos, DURACION_HISTOGRAMAS)
+    return datos
@@ -0,0 +1,126 @@
+# proveedor/cercania.py
+
+"""
+Proveedores cercanos a un punto ("cerca de mí").
+
+Cada proveedor guarda su ubicación efectiva en ubicacion_lat/ubicacion_lon:
+la exacta si la indicó, o el centro de su comuna. La búsqueda no calcula
+distancias sobre toda la tabla: primero pide al índice (ubicacion_lat,
+ubicacion_lon) los proveedores dentro de un rectángulo alrededor del punto y
+solo a esos les calcula la distancia real (haversine). Si dentro del radio no
+hay suficientes, se agranda el rectángulo y se repite.
+"""
+
+import math
+
+from .referencias import obtener_referencias
+
+RADIO_TIERRA_KM = 6371.0
+KM_POR_GRADO = 111.32
+CERCANOS = 12
+# Radios que se prueban en orden; None = sin límite (todo el país)
+RADIOS_KM = (5, 15, 50, 150, 500, 1500, None)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Distancia en km sobre la superficie terrestre."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * RADIO_TIERRA_KM * math.asin(math.sqrt(a))
+
+
+def rectangulo(lat, lon, radio_km):
+    """(lat_min, lat_max, lon_min, lon_max) que contiene el círculo de radio_km."""
+    delta_lat = radio_km / KM_POR_GRADO
+    coseno = math.cos(math.radians(lat))
+    # Cerca de los polos el rectángulo abarca todas las longitudes
+    delta_lon = radio_km / (KM_POR_GRADO * coseno) if coseno > 0.01 else 180
+    return lat - delta_lat, lat + delta_lat, lon - delta_lon, lon + delta_lon
+
+
+def ubicacion_de_comuna(comuna_id):
+    comuna = obtener_referencias().comunas.get(comuna_id)
+    if comuna is None or comuna.latitud is None or comuna.longitud is None:
+        return None, None
+    return comuna.latitud, comuna.longitud
+
+
+def fijar_ubicacion(proveedor):
+    """Calcula la ubicación efectiva del proveedor antes de guardarlo."""
+    if proveedor.latitud is not None and proveedor.longitud is not None:
+        proveedor.ubicacion_lat, proveedor.ubicacion_lon = proveedor.latitud, proveedor.longitud
+    else:
+        proveedor.ubicacion_lat, proveedor.ubicacion_lon = ubicacion_de_comuna(proveedor.comuna_id)
+
+
+def propagar_ubicacion_comuna(comuna_id, latitud, longitud):
+    """Actualiza a los proveedores de la comuna que no tienen ubicación exacta."""
+    from .models import Proveedor
+
+    return Proveedor.objects.filter(comuna_id=comuna_id, latitud__isnull=True).update(
+        ubicacion_lat=latitud, ubicacion_lon=longitud,
+    )
+
+
+def cercanos(proveedores, lat, lon, limite=CERCANOS):
+    """
+    Los 'limite' proveedores del queryset más cercanos al punto, ordenados por
+    distancia y anotados con 'distancia_km'.
+    """
+    con_ubicacion = proveedores.filter(ubicacion_lat__isnull=False, ubicacion_lon__isnull=False)
+
+    for radio in RADIOS_KM:
+        candidatos = con_ubicacion
+        if radio is not None:
+            lat_min, lat_max, lon_min, lon_max = rectangulo(lat, lon, radio)
+            candidatos = candidatos.filter(
+                ubicacion_lat__range=(lat_min, lat_max),
+                ubicacion_lon__range=(lon_min, lon_max),
+            )
+        distancias = sorted(
+            (haversine(lat, lon, c_lat, c_lon), pk)
+            for pk, c_lat, c_lon in candidatos.order_by().values_list('pk', 'ubicacion_lat', 'ubicacion_lon')
+        )
+        # Las esquinas del rectángulo quedan fuera del radio: ahí podría
+        # faltar alguien más cercano que no entró, así que no cuentan.
+        if radio is not None:
+            distancias = [d for d in distancias if d[0] <= radio]
+        if len(distancias) >= limite or radio is None:
+            break
+
+    distancias = distancias[:limite]
+    por_id = proveedores.in_bulk([pk for _, pk in distancias])
+    resultado = []
+    for distancia, pk in distancias:
+        proveedor = por_id[pk]
+        proveedor.distancia_km = distancia
+        resultado.append(proveedor)
+    return resultado
+
+
+def _coordenada(valor, limite):
+    try:
+        valor = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return valor if math.isfinite(valor) and -limite <= valor <= limite else None
+
+
+def punto_de_request(request):
+    """
+    (lat, lon) desde donde buscar: la posición que mandó el navegador o, si
+    no, el centro de la comuna del comerciante conectado. None si no hay ninguna.
+    """
+    lat = _coordenada(request.GET.get('lat'), 90)
+    lon = _coordenada(request.GET.get('lon'), 180)
+    if lat is not None and lon is not None:
+        return lat, lon
+    comuna_id = getattr(request.user, 'comuna_normalizada_id', None)
+    if comuna_id:
+        lat, lon = ubicacion_de_comuna(comuna_id)
+        if lat is not None:
+            return lat, lon
+    return None
@@ -0,0 +1,118 @@
+# proveedor/cobertura.py
+
+"""
+Tabla de cobertura expandida (ZonaAtendida).
+
+La 'cobertura' de un proveedor junto con su comuna/región/país define dónde
+atiende: local o comunal, su comuna; regional, todas las comunas de su región;
+nacional, todo su país; internacional, todos los países. En vez de resolver
+esas reglas en cada consulta, cada proveedor se expande a una fila por comuna,
+región y país atendido, y "quién atiende la comuna X" es una sola búsqueda en
+el índice (nivel, lugar_id, proveedor).
+
+Las filas de un proveedor se rehacen al guardarlo si cambió su cobertura o su
+ubicación (signals.py). Las altas y cambios de comunas, regiones y países
+rehacen a los proveedores de cobertura amplia. El comando
+reconstruir_cobertura rehace la tabla completa.
+"""
+
+from django.db import transaction
+
+from .referencias import obtener_referencias
+
+CAMPOS_ZONA = ('cobertura', 'pais_id', 'region_id', 'comuna_id')
+COBERTURAS_AMPLIAS = ('regional', 'nacional', 'internacional')
+
+
+def _region_completa(region):
+    return [('region', region.id)] + [('comuna', c.id) for c in region.comunas]
+
+
+def _pais_completo(pais):
+    zonas = [('pais', pais.id)]
+    for region in pais.regiones:
+        zonas += _region_completa(region)
+    return zonas
+
+
+def zonas_de(cobertura, pais_id, region_id, comuna_id, referencias=None):
+    """Lista de (nivel, lugar_id) que atiende un proveedor con esos datos."""
+    referencias = referencias or obtener_referencias()
+    # Completar hacia arriba desde el dato más preciso
+    comuna = referencias.comunas.get(comuna_id)
+    if comuna is not None:
+        region_id = comuna.region_id
+    region = referencias.regiones.get(region_id)
+    if region is not None:
+        pais_id = region.pais_id
+
+    if cobertura == 'internacional':
+        zonas = []
+        for pais in referencias.paises:
+            zonas += _pais_completo(pais)
+        return zonas
+    if cobertura == 'nacional':
+        pais = next((p for p in referencias.paises if p.id == pais_id), None)
+        if pais is not None:
+            return _pais_completo(pais)
+    if cobertura in ('regional', 'nacional') and region is not None:
+        return _region_completa(region)
+    return [('comuna', comuna.id)] if comuna is not None else []
+
+
+def reconstruir_cobertura(proveedor_ids):
+    """Rehace las filas de ZonaAtendida de los proveedores indicados."""
+    from .models import Proveedor, ZonaAtendida
+
+    proveedor_ids = list(proveedor_ids)
+    if not proveedor_ids:
+        return 0
+
+    referencias = obtener_referencias()
+    nuevas = []
+    for pk, *zona in Proveedor.objects.filter(pk__in=proveedor_ids).values_list('pk', *CAMPOS_ZONA):
+        nuevas += [
+            ZonaAtendida(proveedor_id=pk, nivel=nivel, lugar_id=lugar_id)
+            for nivel, lugar_id in zonas_de(*zona, referencias=referencias)
+        ]
+
+    with transaction.atomic():
+        ZonaAtendida.objects.filter(proveedor_id__in=proveedor_ids).delete()
+        ZonaAtendida.objects.bulk_create(nuevas, batch_size=1000)
+    return len(nuevas)
+
+
+def reconstruir_por_lotes(proveedores, tamano=500):
+    """Rehace la cobertura de un queryset de proveedores por lotes de ids. Genera (ultimo_id, filas)."""
+    ultimo_id = 0
+    while True:
+        ids = list(proveedores.filter(pk__gt=ultimo_id).order_by('pk').values_list('pk', flat=True)[:tamano])
+        if not ids:
+            return
+        filas = reconstruir_cobertura(ids)
+        ultimo_id = ids[-1]
+        yield ultimo_id, filas
+
+
+def reconstruir_amplios():
+    """Rehace a los proveedores regionales, nacionales e internacionales (cambió la geografía)."""
+    from .models import Proveedor
+
+    for _ in reconstruir_por_lotes(Proveedor.objects.filter(cobertura__in=COBERTURAS_AMPLIAS)):
+        pass
+
+
+def quitar_lugar(nivel, lugar_id):
+    """Borra las filas de un lugar eliminado (los proveedores quedan con SET_NULL, sin señales)."""
+    from .models import ZonaAtendida
+
+    ZonaAtendida.objects.filter(nivel=nivel, lugar_id=lugar_id).delete()
+
+
+def atienden(proveedores, nivel, lugar_id):
+    """Filtra el queryset a los proveedores que atienden ese lugar."""
+    from .models import ZonaAtendida
+
+    return proveedores.filter(
+        pk__in=ZonaAtendida.objects.filter(nivel=nivel, lugar_id=lugar_id).values('proveedor_id')
+    )
@@ -0,0 +1,94 @@
+# proveedor/contadores.py
+
+"""
+Contadores del panel del proveedor (ContadoresProveedor).
+
+El panel muestra total de productos, promociones vigentes y solicitudes
+pendientes leyendo una sola fila. Las señales (proveedor/signals.py) suman o
+restan con F() en la misma transacción del cambio. La vigencia de una
+promoción cambia con la fecha aunque nadie la edite, así que
+promociones_vigentes se guarda junto al día en que se calculó y, si el panel
+se abre otro día, se recuenta sobre el conjunto de promociones vigentes del
+día (vigencia.py). El comando reconciliar_contadores corrige desvíos (p. ej.
+por QuerySet.update(), que no dispara señales).
+
+Un borrado masivo dispara una señal por fila; dentro de en_lote() esas sumas
+se juntan y se aplican con un UPDATE por contador al salir del bloque.
+"""
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db.models import Count, F
+from django.utils import timezone
+
+from . import vigencia
+from .models import ContadoresProveedor, ProductoServicio, SolicitudContacto
+
+CAMPOS = ('total_productos', 'promociones_vigentes', 'solicitudes_pendientes')
+
+_estado = threading.local()
+
+
+def calcular(proveedor_ids, hoy=None):
+    """{proveedor_id: {campo: valor}} contando en la base de datos, una consulta agrupada por campo."""
+    hoy = hoy or timezone.localdate()
+    proveedor_ids = list(proveedor_ids)
+    valores = {pid: dict.fromkeys(CAMPOS, 0) for pid in proveedor_ids}
+    consultas = {
+        'total_productos': ProductoServicio.objects.all(),
+        'promociones_vigentes': vigencia.del_dia(hoy),
+        'solicitudes_pendientes': SolicitudContacto.objects.filter(estado='pendiente'),
+    }
+    for campo, queryset in consultas.items():
+        for fila in queryset.filter(proveedor_id__in=proveedor_ids).order_by().values('proveedor_id').annotate(n=Count('pk')):
+            valores[fila['proveedor_id']][campo] = fila['n']
+    return valores
+
+
+def obtener_contadores(proveedor):
+    """Contadores del proveedor; los crea o actualiza la vigencia si hace falta."""
+    hoy = timezone.localdate()
+    contadores = ContadoresProveedor.objects.filter(proveedor=proveedor).first()
+    if contadores is None:
+        contadores, _ = ContadoresProveedor.objects.update_or_create(
+            proveedor=proveedor, defaults={**calcular([proveedor.pk], hoy)[proveedor.pk], 'vigencia_al': hoy},
+        )
+    elif contadores.vigencia_al != hoy:
+        contadores.promociones_vigentes = vigencia.del_dia(hoy).filter(proveedor=proveedor).count()
+        contadores.vigencia_al = hoy
+        contadores.save(update_fields=['promociones_vigentes', 'vigencia_al'])
+    return contadores
+
+
+def sumar(proveedor_id, campo, cantidad):
+    """Suma 'cantidad' al contador. Si la fila no existe no hace nada: se creará contando."""
+    if not cantidad:
+        return
+    lote = getattr(_estado, 'lote', None)
+    if lote is not None:
+        lote[proveedor_id, campo] += cantidad
+        return
+    contadores = ContadoresProveedor.objects.filter(proveedor_id=proveedor_id)
+    if campo == 'promociones_vigentes':
+        # Solo si el valor guardado es de hoy; si no, se recuenta al leerlo.
+        contadores = contadores.filter(vigencia_al=timezone.localdate())
+    contadores.update(**{campo: F(campo) + cantidad})
+
+
+@contextmanager
+def en_lote():
+    """Junta las llamadas a sumar() del bloque y las aplica al salir (si no hubo error)."""
+    if getattr(_estado, 'lote', None) is not None:
+        # Anidado: el bloque exterior aplica todo
+        yield
+        return
+    _estado.lote = Counter()
+    try:
+        yield
+        lote = _estado.lote
+    finally:
+        _estado.lote = None
+    for (proveedor_id, campo), cantidad in lote.items():
+        sumar(proveedor_id, campo, cantidad)
@@ -0,0 +1,127 @@
+# proveedor/directorio.py
+
+"""
+Filtros y conteos por faceta del directorio público de proveedores.
+
+Cada faceta (rubro, región, comuna, cobertura) se cuenta con una sola consulta
+agrupada, aplicando todos los filtros activos menos el de la propia faceta:
+así cada opción muestra cuántos proveedores habría al elegirla y las opciones
+sin resultados no se ofrecen. Los conteos se guardan en la caché por firma de
+filtros; cualquier cambio en proveedores o rubros (signals) o una
+reconstrucción masiva (comandos reconstruir_cobertura y reindexar_proveedores)
+cambia la versión compartida (proveedor/versiones.py) y los descarta todos, en
+todos los procesos.
+"""
+
+import hashlib
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from . import versiones
+from .busqueda import filtrar_por_texto
+from .cobertura import atienden
+from .models import Proveedor
+
+CLAVE_VERSION = 'directorio'
+TTL_SEGUNDOS = 10 * 60
+
+FILTROS_NUMERICOS = ('categoria', 'region', 'comuna', 'atiende')
+
+# faceta: (campo del valor, campo del nombre)
+FACETAS = {
+    'categoria': ('categorias__id', 'categorias__nombre'),
+    'region': ('region_id', 'region__nombre'),
+    'comuna': ('comuna_id', 'comuna__nombre'),
+    'cobertura': ('cobertura', None),
+}
+
+
+def invalidar_facetas():
+    versiones.invalidar(CLAVE_VERSION)
+
+
+def filtros_de_request(params):
+    """Filtros válidos del GET; los ids no numéricos se ignoran."""
+    filtros = {}
+    for nombre in FILTROS_NUMERICOS:
+        valor = (params.get(nombre) or '').strip()
+        if valor.isdigit():
+            filtros[nombre] = int(valor)
+    cobertura = params.get('cobertura')
+    if cobertura in dict(Proveedor.COBERTURA_CHOICES):
+        filtros['cobertura'] = cobertura
+    busqueda = (params.get('q') or '').strip()
+    if busqueda:
+        filtros['q'] = busqueda
+    return filtros
+
+
+def aplicar_filtros(proveedores, filtros, excepto=None):
+    """Aplica los filtros al queryset; 'excepto' omite uno (para su faceta)."""
+    if 'categoria' in filtros and excepto != 'categoria':
+        proveedores = proveedores.filter(categorias__id=filtros['categoria'])
+    if 'region' in filtros and excepto != 'region':
+        proveedores = proveedores.filter(region_id=filtros['region'])
+    if 'comuna' in filtros and excepto != 'comuna':
+        proveedores = proveedores.filter(comuna_id=filtros['comuna'])
+    if 'cobertura' in filtros and excepto != 'cobertura':
+        proveedores = proveedores.filter(cobertura=filtros['cobertura'])
+    if 'atiende' in filtros:
+        # Comuna que el proveedor atiende, esté o no ubicado en ella (ver cobertura.py)
+        proveedores = atienden(proveedores, 'comuna', filtros['atiende'])
+    if 'q' in filtros:
+        proveedores = filtrar_por_texto(proveedores, filtros['q'])
+    return proveedores
+
+
+def _contar(filtros, faceta):
+    campo_valor, campo_nombre = FACETAS[faceta]
+    proveedores = aplicar_filtros(Proveedor.objects.filter(activo=True), filtros, excepto=faceta)
+    if faceta == 'categoria':
+        proveedores = proveedores.filter(categorias__activo=True)
+    else:
+        proveedores = proveedores.filter(**{f'{campo_valor}__isnull': False})
+
+    campos = [campo_valor] + ([campo_nombre] if campo_nombre else [])
+    filas = proveedores.order_by().values(*campos).annotate(total=Count('pk'))
+
+    etiquetas = dict(Proveedor.COBERTURA_CHOICES)
+    opciones = [
+        {
+            'id': fila[campo_valor],
+            'nombre': fila[campo_nombre] if campo_nombre else etiquetas.get(fila[campo_valor], fila[campo_valor]),
+            'total': fila['total'],
+        }
+        for fila in filas
+    ]
+    opciones.sort(key=lambda o: o['nombre'])
+    return opciones
+
+
+def contar_facetas(filtros):
+    """
+    {faceta: [{'id', 'nombre', 'total'}, ...]} con solo las opciones que
+    tienen proveedores bajo los filtros actuales.
+    """
+    firma = hashlib.md5(urlencode(sorted(filtros.items())).encode()).hexdigest()
+    clave = f'directorio:facetas:{versiones.version(CLAVE_VERSION)}:{firma}'
+    facetas = cache.get(clave)
+    if facetas is None:
+        facetas = {faceta: _contar(filtros, faceta) for faceta in FACETAS}
+        cache.set(clave, facetas, TTL_SEGUNDOS)
+    return facetas
+
+
+def total_proveedores(filtros, facetas):
+    """
+    Total de proveedores bajo los filtros, sacado de los conteos por faceta
+    (que ya están en caché) en vez de un COUNT(*) sobre el listado. Cada
+    faceta se cuenta con todos los demás filtros, así que el conteo de la
+    opción elegida es el total exacto.
+    """
+    for faceta in ('cobertura', 'comuna', 'region', 'categoria'):
+        if faceta in filtros:
+            return next((o['total'] for o in facetas[faceta] if o['id'] == filtros[faceta]), 0)
+    return sum(o['total'] for o in facetas['cobertura'])
@@ -0,0 +1,121 @@
+# proveedor/estadisticas.py
+
+"""
+Estadísticas diarias pre-agregadas para el panel del proveedor.
+
+consolidar() arma EstadisticaDiaria (una fila por proveedor y día) con
+consultas agrupadas sobre VisitaDiaria y SolicitudContacto. El comando
+consolidar_estadisticas lo corre de forma incremental: retoma desde el último
+día consolidado, que se recalcula porque seguía abierto. El panel lee a lo
+sumo 90 filas de EstadisticaDiaria y nunca los eventos originales.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import EstadisticaDiaria, SolicitudContacto, VisitaDiaria
+
+RANGOS_DIAS = (7, 30, 90)
+RANGO_POR_DEFECTO = 30
+DIAS_POR_BLOQUE = 31
+
+CAMPOS = ('visitas', 'contactos_enviados', 'contactos_aceptados', 'vistas_productos', 'vistas_promociones')
+
+
+def consolidar(desde, hasta):
+    """Recalcula EstadisticaDiaria para los días desde..hasta (inclusive). Devuelve las filas escritas."""
+    filas = {}
+
+    def fila(pid, fecha):
+        return filas.setdefault((pid, fecha), dict.fromkeys(CAMPOS, 0))
+
+    for v in VisitaDiaria.objects.filter(fecha__range=(desde, hasta)).values(
+        'proveedor_id', 'fecha', 'visitas', 'vistas_productos', 'vistas_promociones'
+    ).iterator():
+        f = fila(v['proveedor_id'], v['fecha'])
+        f['visitas'] = v['visitas']
+        f['vistas_productos'] = v['vistas_productos']
+        f['vistas_promociones'] = v['vistas_promociones']
+
+    enviados = SolicitudContacto.objects.filter(
+        fecha_solicitud__date__range=(desde, hasta)
+    ).annotate(dia=TruncDate('fecha_solicitud')).values('proveedor_id', 'dia').annotate(total=Count('pk'))
+    for s in enviados:
+        fila(s['proveedor_id'], s['dia'])['contactos_enviados'] = s['total']
+
+    aceptados = SolicitudContacto.objects.filter(
+        estado='aceptada', fecha_respuesta__date__range=(desde, hasta)
+    ).annotate(dia=TruncDate('fecha_respuesta')).values('proveedor_id', 'dia').annotate(total=Count('pk'))
+    for s in aceptados:
+        fila(s['proveedor_id'], s['dia'])['contactos_aceptados'] = s['total']
+
+    # Se reemplaza el rango completo: así también se corrigen días que quedaron en cero.
+    with transaction.atomic():
+        EstadisticaDiaria.objects.filter(fecha__range=(desde, hasta)).delete()
+        EstadisticaDiaria.objects.bulk_create(
+            [EstadisticaDiaria(proveedor_id=pid, fecha=fecha, **valores) for (pid, fecha), valores in filas.items()],
+            batch_size=1000,
+        )
+    return len(filas)
+
+
+def primer_dia_pendiente():
+    """Último día consolidado (se rehace) o, si no hay ninguno, el primer día con datos."""
+    ultimo = EstadisticaDiaria.objects.aggregate(ultimo=Max('fecha'))['ultimo']
+    if ultimo:
+        return ultimo
+    candidatos = [
+        VisitaDiaria.objects.aggregate(primero=Min('fecha'))['primero'],
+        SolicitudContacto.objects.aggregate(primero=Min('fecha_solicitud'))['primero'],
+    ]
+    candidatos = [timezone.localdate(c) if hasattr(c, 'hour') else c for c in candidatos if c]
+    return min(candidatos) if candidatos else None
+
+
+def consolidar_pendiente(desde=None, hasta=None):
+    """Consolida por bloques de días hasta hoy. Genera (desde, hasta, filas) por bloque."""
+    desde = desde or primer_dia_pendiente()
+    hasta = hasta or timezone.localdate()
+    if desde is None:
+        return
+    while desde <= hasta:
+        fin = min(desde + timedelta(days=DIAS_POR_BLOQUE - 1), hasta)
+        yield desde, fin, consolidar(desde, fin)
+        desde = fin + timedelta(days=1)
+
+
+def serie(proveedor, dias=RANGO_POR_DEFECTO):
+    """
+    Datos del gráfico del panel para los últimos 'dias' días: un punto por
+    día (los días sin fila van en cero), los totales del período y la altura
+    relativa de cada barra de visitas.
+    """
+    if dias not in RANGOS_DIAS:
+        dias = RANGO_POR_DEFECTO
+    hoy = timezone.localdate()
+    inicio = hoy - timedelta(days=dias - 1)
+
+    por_fecha = {
+        f['fecha']: f
+        for f in EstadisticaDiaria.objects.filter(proveedor=proveedor, fecha__gte=inicio).values('fecha', *CAMPOS)
+    }
+    puntos = []
+    for i in range(dias):
+        fecha = inicio + timedelta(days=i)
+        valores = por_fecha.get(fecha) or dict.fromkeys(CAMPOS, 0)
+        puntos.append({'fecha': fecha, **{c: valores[c] for c in CAMPOS}})
+
+    maximo = max((p['visitas'] for p in puntos), default=0) or 1
+    for p in puntos:
+        p['altura'] = round(p['visitas'] * 100 / maximo)
+
+    return {
+        'dias': dias,
+        'rangos': RANGOS_DIAS,
+        'puntos': puntos,
+        'totales': {c: sum(p[c] for p in puntos) for c in CAMPOS},
+    }
@@ -0,0 +1,106 @@
+# proveedor/exportacion.py
+
+"""
+Exportación del catálogo de un proveedor (productos o promociones) en CSV o
+JSON Lines, opcionalmente comprimida con gzip.
+
+La respuesta se genera mientras se envía: el encabezado sale de inmediato y
+las filas se leen con iterator(chunk_size=...) y se mandan en bloques de unos
+64 KB, así que ni el queryset ni el archivo se arman completos en memoria y
+la descarga empieza al instante aunque el catálogo sea enorme. Con gzip cada
+bloque se comprime y se vacía (Z_SYNC_FLUSH) para no retener datos.
+"""
+
+import csv
+import json
+import zlib
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .listados import filtrar_productos, filtrar_promociones
+
+TAMANO_CHUNK = 1000
+TAMANO_BLOQUE = 64 * 1024
+
+FORMATOS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson; charset=utf-8', 'jsonl'),
+}
+
+CAMPOS = {
+    'productos': (
+        'id', 'sku', 'nombre', 'descripcion', 'categoria', 'precio_referencia',
+        'activo', 'destacado', 'imagen', 'fecha_creacion', 'fecha_actualizacion',
+    ),
+    'promociones': (
+        'id', 'titulo', 'descripcion', 'imagen', 'fecha_inicio', 'fecha_fin', 'activo', 'fecha_creacion',
+    ),
+}
+
+
+def queryset_exportacion(proveedor, tipo, params):
+    """Productos o promociones del proveedor con los filtros de su lista en el panel."""
+    if tipo == 'productos':
+        return filtrar_productos(proveedor, params)
+    return filtrar_promociones(proveedor, params)
+
+
+def _filas(queryset, campos):
+    indice_imagen = campos.index('imagen')
+    for fila in queryset.order_by('id').values_list(*campos).iterator(chunk_size=TAMANO_CHUNK):
+        if fila[indice_imagen]:
+            # La URL pública sirve más que el nombre interno en el storage
+            fila = list(fila)
+            fila[indice_imagen] = default_storage.url(fila[indice_imagen])
+        yield fila
+
+
+class _Linea:
+    """Destino de csv.writer: devuelve lo escrito en vez de guardarlo."""
+
+    def write(self, texto):
+        return texto
+
+
+def _lineas_csv(filas, campos):
+    escritor = csv.writer(_Linea())
+    yield escritor.writerow(campos)
+    for fila in filas:
+        yield escritor.writerow(fila)
+
+
+def _lineas_jsonl(filas, campos):
+    for fila in filas:
+        yield json.dumps(dict(zip(campos, fila)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def _bloques(lineas):
+    """Agrupa las líneas en bloques de bytes; la primera sale sola para empezar a enviar ya."""
+    bloque = []
+    tamano = 0
+    for i, linea in enumerate(lineas):
+        datos = linea.encode('utf-8')
+        bloque.append(datos)
+        tamano += len(datos)
+        if i == 0 or tamano >= TAMANO_BLOQUE:
+            yield b''.join(bloque)
+            bloque = []
+            tamano = 0
+    if bloque:
+        yield b''.join(bloque)
+
+
+def _gzip(bloques):
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for bloque in bloques:
+        yield compresor.compress(bloque) + compresor.flush(zlib.Z_SYNC_FLUSH)
+    yield compresor.flush()
+
+
+def generar_exportacion(queryset, tipo, formato, comprimir=False):
+    """Generador de bytes con el archivo exportado."""
+    campos = CAMPOS[tipo]
+    lineas = _lineas_csv if formato == 'csv' else _lineas_jsonl
+    bloques = _bloques(lineas(_filas(queryset, campos), campos))
+    return _gzip(bloques) if comprimir else bloques
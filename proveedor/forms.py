@@ -8,8 +8,10 @@ from .models import (
     SolicitudContacto,
     CategoriaProveedor,
     Region,
-    Comuna
+    Comuna,
+    ImportacionCatalogo
 )
+from .referencias import obtener_referencias, comunas_de_region
 
 
 class ProveedorForm(forms.ModelForm):
@@ -27,6 +29,8 @@ class ProveedorForm(forms.ModelForm):
             'region',
             'comuna',
             'direccion',
+            'latitud',
+            'longitud',
             'cobertura',
             'telefono',
             'whatsapp',
@@ -70,6 +74,16 @@ class ProveedorForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': 'Dirección de tu negocio'
             }),
+            'latitud': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'step': 'any',
+                'placeholder': '-33.4378'
+            }),
+            'longitud': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'step': 'any',
+                'placeholder': '-70.6505'
+            }),
             'cobertura': forms.Select(attrs={
                 'class': 'form-control'
             }),
@@ -112,6 +126,8 @@ class ProveedorForm(forms.ModelForm):
             'region': 'Región',
             'comuna': 'Comuna',
             'direccion': 'Dirección',
+            'latitud': 'Latitud',
+            'longitud': 'Longitud',
             'cobertura': 'Zona de Cobertura *',
             'telefono': 'Teléfono',
             'whatsapp': 'WhatsApp *',
@@ -128,18 +144,30 @@ class ProveedorForm(forms.ModelForm):
             'whatsapp': 'Principal medio de contacto para los comerciantes.',
             'instagram': 'Ingresa solo el nombre de usuario sin @',
             'twitter': 'Ingresa solo el nombre de usuario sin @',
+            'latitud': 'Opcional. Si la dejas vacía se usa el centro de tu comuna.',
         }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
-        # Si hay una instancia, filtrar comunas por región
-        if self.instance.pk and self.instance.region:
-            self.fields['comuna'].queryset = Comuna.objects.filter(
-                region=self.instance.region
-            )
+        # Opciones desde los datos de referencia en memoria: dibujar el
+        # formulario no consulta la base (validar sí usa el queryset).
+        referencias = obtener_referencias()
+        vacio = [('', '---------')]
+        self.fields['pais'].choices = vacio + [(p.id, p.nombre) for p in referencias.paises]
+        self.fields['region'].choices = vacio + [(r.id, r.nombre) for r in referencias.regiones.values()]
+        self.fields['categorias'].choices = [(c.id, c.nombre) for c in referencias.categorias]
+        
+        # Filtrar comunas por la región enviada o, si no, la de la instancia
+        region_id = self.data.get(self.add_prefix('region')) if self.is_bound else None
+        if not region_id and self.instance.pk:
+            region_id = self.instance.region_id
+        comunas = comunas_de_region(region_id)
+        if comunas:
+            self.fields['comuna'].queryset = Comuna.objects.filter(region_id=region_id)
         else:
             self.fields['comuna'].queryset = Comuna.objects.none()
+        self.fields['comuna'].choices = vacio + [(c.id, c.nombre) for c in comunas]
         
         # Hacer que la imagen no sea requerida en edición
         if self.instance.pk:
@@ -174,9 +202,13 @@ class ProveedorForm(forms.ModelForm):
         
         # Validar que la comuna pertenezca a la región seleccionada
         if region and comuna:
-            if comuna.region != region:
+            if comuna.region_id != region.pk:
                 raise ValidationError('La comuna seleccionada no pertenece a la región.')
         
+        # La ubicación exacta va completa o no va
+        if (cleaned_data.get('latitud') is None) != (cleaned_data.get('longitud') is None):
+            raise ValidationError('Indica latitud y longitud, o deja ambas vacías.')
+        
         return cleaned_data
 
 
@@ -187,6 +219,7 @@ class ProductoServicioForm(forms.ModelForm):
     class Meta:
         model = ProductoServicio
         fields = [
+            'sku',
             'nombre',
             'descripcion',
             'precio_referencia',
@@ -196,6 +229,10 @@ class ProductoServicioForm(forms.ModelForm):
             'categoria',
         ]
         widgets = {
+            'sku': forms.TextInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Código interno (opcional)'
+            }),
             'nombre': forms.TextInput(attrs={
                 'class': 'form-control',
                 'placeholder': 'Nombre del producto o servicio',
@@ -229,6 +266,7 @@ class ProductoServicioForm(forms.ModelForm):
 
         }
         labels = {
+            'sku': 'SKU / Código',
             'nombre': 'Nombre del Producto/Servicio *',
             'descripcion': 'Descripción *',
             'precio_referencia': 'Precio Referencial',
@@ -238,11 +276,25 @@ class ProductoServicioForm(forms.ModelForm):
             'categoria': 'Categoría ',
         }
         help_texts = {
+            'sku': 'Identifica el producto al importar tu catálogo desde un CSV.',
             'precio_referencia': 'Precio aproximado en pesos chilenos (opcional).',
             'destacado': 'Los productos destacados aparecen primero en tu perfil.',
             'activo': 'Desmarca esta opción para ocultar temporalmente el producto.',
         }
 
+    def __init__(self, *args, proveedor=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.proveedor = proveedor
+
+    def clean_sku(self):
+        """SKU vacío = sin SKU; si hay proveedor, no puede repetirse en su catálogo"""
+        sku = (self.cleaned_data.get('sku') or '').strip() or None
+        if sku and self.proveedor is not None:
+            repetido = ProductoServicio.objects.filter(proveedor=self.proveedor, sku=sku).exclude(pk=self.instance.pk)
+            if repetido.exists():
+                raise ValidationError('Ya tienes otro producto con ese SKU.')
+        return sku
+
     def clean_precio_referencia(self):
         """Validar que el precio sea positivo"""
         precio = self.cleaned_data.get('precio_referencia')
@@ -251,6 +303,41 @@ class ProductoServicioForm(forms.ModelForm):
         return precio
 
 
+class ImportacionCatalogoForm(forms.ModelForm):
+    """
+    Subida del CSV del catálogo (y del zip con imágenes) para importarlo
+    """
+    class Meta:
+        model = ImportacionCatalogo
+        fields = ['archivo', 'imagenes']
+        widgets = {
+            'archivo': forms.FileInput(attrs={
+                'class': 'form-control',
+                'accept': '.csv,text/csv'
+            }),
+            'imagenes': forms.FileInput(attrs={
+                'class': 'form-control',
+                'accept': '.zip,application/zip'
+            }),
+        }
+        help_texts = {
+            'archivo': 'CSV en UTF-8 con encabezado: sku, nombre, descripcion, categoria, precio_referencia, activo, destacado, imagen.',
+            'imagenes': 'Opcional. Zip con las imágenes nombradas en la columna "imagen".',
+        }
+
+    def clean_archivo(self):
+        archivo = self.cleaned_data.get('archivo')
+        if archivo and not archivo.name.lower().endswith('.csv'):
+            raise ValidationError('El archivo debe ser un CSV.')
+        return archivo
+
+    def clean_imagenes(self):
+        imagenes = self.cleaned_data.get('imagenes')
+        if imagenes and not imagenes.name.lower().endswith('.zip'):
+            raise ValidationError('Las imágenes deben venir en un archivo .zip.')
+        return imagenes
+
+
 class PromocionForm(forms.ModelForm):
     """
     Formulario para crear y editar promociones
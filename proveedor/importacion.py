@@ -0,0 +1,360 @@
+# proveedor/importacion.py
+
+"""
+Importación masiva del catálogo de un proveedor desde un CSV.
+
+El CSV se lee fila a fila desde el storage (nunca entero en memoria) y cada
+fila se valida con las mismas reglas de ProductoServicioForm. Las filas
+válidas se guardan por lotes: las que traen un SKU que el proveedor ya tiene
+actualizan ese producto (bulk_update) y el resto se crea (bulk_create). Las
+imágenes se toman del zip que acompaña al CSV, por nombre de archivo; al
+guardar cada lote se validan con Pillow (forms.ImageField) y se copian al
+storage solo las de las filas que se escriben. Si el lote falla, las copiadas
+se borran.
+
+Desde el panel la importación queda como ImportacionCatalogo y corre en un
+hilo aparte al confirmar la transacción, actualizando el avance después de
+cada lote. Pase lo que pase la importación termina como 'terminada' o
+'fallida'; si el proceso muere a mitad de camino queda 'procesando', y pasado
+TIEMPO_MAXIMO se da por fallida (reclamar_colgadas) para que el proveedor
+pueda volver a importar. El comando importar_catalogo hace ese reclamo,
+procesa las que hayan quedado pendientes (p. ej. si el proceso se reinició)
+o importa un archivo local.
+
+Columnas (encabezado obligatorio, en cualquier orden; solo 'nombre' y
+'descripcion' son obligatorias):
+    sku, nombre, descripcion, categoria, precio_referencia, activo, destacado, imagen
+"""
+
+import csv
+import io
+import logging
+import posixpath
+import threading
+import zipfile
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Case, TextField, Value, When
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from . import contadores
+from .busqueda import normalizar, programar_indexacion
+from .forms import ProductoServicioForm
+from .listados import indexar_productos, reindexar
+from .models import ImportacionCatalogo, ProductoServicio
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 500
+# Una importación 'procesando' más vieja que esto se da por perdida
+TIEMPO_MAXIMO = timedelta(hours=2)
+MAXIMO_ERRORES = 100
+MAXIMO_IMAGEN = 5 * 1024 * 1024
+
+COLUMNAS_OBLIGATORIAS = ('nombre', 'descripcion')
+CAMPOS_ACTUALIZABLES = ('nombre', 'descripcion', 'categoria', 'precio_referencia', 'activo', 'destacado')
+
+VERDADEROS = frozenset(('1', 'si', 'true', 'verdadero', 'x', 's', 'yes'))
+FALSOS = frozenset(('0', 'no', 'false', 'falso', 'n'))
+
+# La categoría puede venir como código (ALIMENTOS) o como nombre (Alimentos y Comida)
+CATEGORIAS = {
+    normalizar(texto): codigo
+    for codigo, nombre in ProductoServicio.CATEGORIA_CHOICES
+    for texto in (codigo, nombre)
+}
+
+
+class FilaProductoForm(ProductoServicioForm):
+    """Mismas reglas que el formulario del panel; la imagen viene del zip."""
+    class Meta(ProductoServicioForm.Meta):
+        fields = [campo for campo in ProductoServicioForm.Meta.fields if campo != 'imagen']
+
+
+def _booleano(valor, defecto):
+    valor = normalizar(valor).strip()
+    if not valor:
+        return defecto
+    if valor in VERDADEROS:
+        return True
+    if valor in FALSOS:
+        return False
+    return None
+
+
+class ImportadorCatalogo:
+    """
+    Importa filas de un CSV al catálogo de 'proveedor'. 'progreso', si se
+    indica, se llama después de cada lote con el importador y los bytes leídos.
+    """
+
+    def __init__(self, proveedor, progreso=None, tamano_lote=TAMANO_LOTE):
+        self.proveedor = proveedor
+        self.progreso = progreso
+        self.tamano_lote = max(1, tamano_lote)
+        self.filas_procesadas = 0
+        self.creados = 0
+        self.actualizados = 0
+        self.invalidos = 0
+        self.errores = []
+        self._imagenes = None
+        self._indice_imagenes = {}
+        self._sin_indexar = False
+
+    def registrar_error(self, mensaje):
+        if len(self.errores) < MAXIMO_ERRORES:
+            self.errores.append(mensaje)
+
+    def importar(self, archivo, imagenes=None):
+        """'archivo' es el CSV abierto en binario; 'imagenes', un ZipFile o None."""
+        self._imagenes = imagenes
+        if imagenes is not None:
+            # Solo el índice del zip (nombres), no su contenido
+            self._indice_imagenes = {
+                posixpath.basename(info.filename).lower(): info
+                for info in imagenes.infolist() if not info.is_dir()
+            }
+
+        lector = csv.DictReader(io.TextIOWrapper(archivo, encoding='utf-8-sig', newline=''))
+        encabezado = [normalizar(c).strip() for c in (lector.fieldnames or [])]
+        faltantes = [c for c in COLUMNAS_OBLIGATORIAS if c not in encabezado]
+        if faltantes:
+            raise ValueError(f'Faltan columnas en el encabezado: {", ".join(faltantes)}.')
+        lector.fieldnames = encabezado
+
+        lote = []
+        # La fila 1 es el encabezado
+        for numero_fila, fila in enumerate(lector, start=2):
+            self.filas_procesadas += 1
+            datos = self._validar_fila(numero_fila, fila)
+            if datos is not None:
+                lote.append(datos)
+            if len(lote) >= self.tamano_lote:
+                self._guardar_lote(lote)
+                lote = []
+                self._informar(archivo)
+        self._guardar_lote(lote)
+        self._informar(archivo)
+
+        if self.creados or self.actualizados:
+            programar_indexacion([self.proveedor.pk])
+        if self._sin_indexar:
+            reindexar([self.proveedor.pk])
+
+    def _informar(self, archivo):
+        if self.progreso is not None:
+            self.progreso(self, archivo.tell())
+
+    def _validar_fila(self, numero_fila, fila):
+        activo = _booleano(fila.get('activo'), True)
+        destacado = _booleano(fila.get('destacado'), False)
+        categoria = (fila.get('categoria') or '').strip()
+        form = FilaProductoForm(data={
+            'sku': (fila.get('sku') or '').strip(),
+            'nombre': (fila.get('nombre') or '').strip(),
+            'descripcion': (fila.get('descripcion') or '').strip(),
+            'categoria': CATEGORIAS.get(normalizar(categoria), categoria) if categoria else 'OTRO',
+            'precio_referencia': (fila.get('precio_referencia') or '').strip(),
+            'activo': bool(activo),
+            'destacado': bool(destacado),
+        })
+
+        errores = [] if form.is_valid() else [form.errors.as_text().replace('\n', ' ')]
+        if activo is None or destacado is None:
+            errores.append('activo y destacado deben ser si/no.')
+        if errores:
+            self.invalidos += 1
+            self.registrar_error(f'Fila {numero_fila}: {" ".join(errores)}')
+            return None
+
+        datos = form.cleaned_data
+        # La imagen se copia al guardar el lote, solo si la fila se escribe
+        datos['imagen'] = self._buscar_imagen(numero_fila, (fila.get('imagen') or '').strip())
+        return datos
+
+    def _buscar_imagen(self, numero_fila, nombre):
+        """(numero_fila, ZipInfo) de la imagen de la fila, o None."""
+        if not nombre:
+            return None
+        info = self._indice_imagenes.get(posixpath.basename(nombre).lower())
+        if info is None:
+            self.registrar_error(f'Fila {numero_fila}: la imagen "{nombre}" no está en el zip; se importó sin imagen.')
+            return None
+        if info.file_size > MAXIMO_IMAGEN:
+            self.registrar_error(f'Fila {numero_fila}: la imagen "{nombre}" pesa más de 5 MB; se importó sin imagen.')
+            return None
+        return numero_fila, info
+
+    def _copiar_imagen(self, numero_fila, info):
+        """Valida la imagen del zip, la copia al storage y devuelve su nombre, o None."""
+        nombre = posixpath.basename(info.filename)
+        contenido = ContentFile(self._imagenes.read(info), name=nombre)
+        try:
+            # Extensión y contenido: Pillow tiene que poder abrirla
+            forms.ImageField().clean(contenido)
+        except ValidationError:
+            self.registrar_error(f'Fila {numero_fila}: "{nombre}" no es una imagen válida; se importó sin imagen.')
+            return None
+        contenido.seek(0)
+        return default_storage.save(f'productos/{nombre}', contenido)
+
+    def _guardar_lote(self, lote):
+        if not lote:
+            return
+
+        # Un SKU repetido dentro del lote: gana la última fila
+        por_sku = {}
+        sin_sku = []
+        for datos in lote:
+            if datos['sku']:
+                por_sku[datos['sku']] = datos
+            else:
+                sin_sku.append(datos)
+
+        existentes = {
+            p.sku: p
+            for p in ProductoServicio.objects.filter(proveedor=self.proveedor, sku__in=list(por_sku))
+        }
+        ahora = timezone.now()
+        nuevos = []
+        actualizados = []
+        copiadas = []
+        try:
+            for datos in list(por_sku.values()) + sin_sku:
+                imagen = datos.pop('imagen')
+                imagen = self._copiar_imagen(*imagen) if imagen else None
+                if imagen:
+                    copiadas.append(imagen)
+                producto = existentes.get(datos['sku']) if datos['sku'] else None
+                if producto is None:
+                    nuevos.append(ProductoServicio(proveedor=self.proveedor, imagen=imagen, **datos))
+                    continue
+                for campo in CAMPOS_ACTUALIZABLES:
+                    setattr(producto, campo, datos[campo])
+                if imagen:
+                    producto.imagen = imagen
+                producto.fecha_actualizacion = ahora
+                actualizados.append(producto)
+
+            # bulk_create/bulk_update no disparan señales: el contador y los
+            # índices de búsqueda se actualizan aquí.
+            with transaction.atomic():
+                ProductoServicio.objects.bulk_create(nuevos, batch_size=self.tamano_lote)
+                ProductoServicio.objects.bulk_update(
+                    actualizados, [*CAMPOS_ACTUALIZABLES, 'imagen', 'fecha_actualizacion'], batch_size=self.tamano_lote,
+                )
+                contadores.sumar(self.proveedor.pk, 'total_productos', len(nuevos))
+                # Sin RETURNING (MySQL) los nuevos quedan sin id: se indexan al final
+                con_id = [p for p in nuevos if p.pk is not None]
+                indexar_productos(actualizados + con_id)
+        except BaseException:
+            # El lote no quedó escrito: sus imágenes no pueden quedar huérfanas
+            for nombre in copiadas:
+                default_storage.delete(nombre)
+            raise
+        self._sin_indexar = self._sin_indexar or len(con_id) < len(nuevos)
+        self.creados += len(nuevos)
+        self.actualizados += len(actualizados)
+
+
+@contextmanager
+def _abrir_zip(campo):
+    if not campo:
+        yield None
+        return
+    with campo.open('rb') as archivo, zipfile.ZipFile(archivo) as imagenes:
+        yield imagenes
+
+
+def _guardar_avance(importacion_id, importador, bytes_leidos=None, **extra):
+    campos = {
+        'filas_procesadas': importador.filas_procesadas,
+        'creados': importador.creados,
+        'actualizados': importador.actualizados,
+        'invalidos': importador.invalidos,
+        'errores': '\n'.join(importador.errores),
+        **extra,
+    }
+    if bytes_leidos is not None:
+        campos['bytes_leidos'] = bytes_leidos
+    ImportacionCatalogo.objects.filter(pk=importacion_id).update(**campos)
+
+
+def procesar_importacion(importacion_id):
+    """Procesa una importación pendiente. Devuelve False si otro proceso ya la tomó."""
+    tomada = ImportacionCatalogo.objects.filter(pk=importacion_id, estado='pendiente').update(
+        estado='procesando', fecha_inicio=timezone.now(),
+    )
+    if not tomada:
+        return False
+
+    importacion = ImportacionCatalogo.objects.select_related('proveedor').get(pk=importacion_id)
+    importador = ImportadorCatalogo(
+        importacion.proveedor,
+        progreso=lambda imp, bytes_leidos: _guardar_avance(importacion_id, imp, bytes_leidos),
+    )
+    estado = 'terminada'
+    try:
+        with importacion.archivo.open('rb') as archivo, _abrir_zip(importacion.imagenes) as imagenes:
+            importador.importar(archivo, imagenes)
+    except (ValueError, csv.Error, zipfile.BadZipFile, OSError) as e:
+        # Problemas del archivo (UnicodeDecodeError es un ValueError). Los lotes ya guardados quedan.
+        estado = 'fallida'
+        importador.errores.append(f'La importación se detuvo: {e}')
+    except Exception:
+        # Cualquier otro error no puede dejar la importación 'procesando' para siempre
+        logger.exception('Falló la importación de catálogo %s', importacion_id)
+        estado = 'fallida'
+        importador.errores.append('La importación se detuvo por un error interno.')
+    _guardar_avance(importacion_id, importador, estado=estado, fecha_fin=timezone.now())
+    return True
+
+
+def _procesar_en_hilo(importacion_id):
+    try:
+        procesar_importacion(importacion_id)
+    finally:
+        connection.close()
+
+
+def iniciar_en_segundo_plano(importacion):
+    """Lanza la importación en un hilo al confirmar la transacción que la creó."""
+    transaction.on_commit(lambda: threading.Thread(
+        target=_procesar_en_hilo, args=(importacion.pk,), name=f'importacion-{importacion.pk}', daemon=True,
+    ).start())
+
+
+def reclamar_colgadas(proveedor=None, tiempo_maximo=TIEMPO_MAXIMO):
+    """
+    Da por fallidas las importaciones que llevan más de 'tiempo_maximo'
+    procesando (el proceso que las tenía murió). Devuelve cuántas reclamó.
+    """
+    colgadas = ImportacionCatalogo.objects.filter(
+        estado='procesando', fecha_inicio__lt=timezone.now() - tiempo_maximo,
+    )
+    if proveedor is not None:
+        colgadas = colgadas.filter(proveedor=proveedor)
+    mensaje = 'La importación se interrumpió antes de terminar.'
+    return colgadas.update(
+        estado='fallida',
+        fecha_fin=timezone.now(),
+        errores=Case(
+            When(errores='', then=Value(mensaje)),
+            default=Concat('errores', Value('\n' + mensaje)),
+            output_field=TextField(),
+        ),
+    )
+
+
+def procesar_pendientes():
+    """Procesa las importaciones pendientes en orden. Genera el id de cada una."""
+    for importacion_id in ImportacionCatalogo.objects.filter(estado='pendiente').order_by('pk').values_list('pk', flat=True):
+        if procesar_importacion(importacion_id):
+            yield importacion_id
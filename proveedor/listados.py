@@ -0,0 +1,163 @@
+# proveedor/listados.py
+
+"""
+Filtros de los listados del panel del proveedor (productos y promociones).
+
+Los usan las listas del panel, las acciones masivas y la exportación del
+catálogo, para que todas trabajen exactamente sobre lo que el proveedor
+estaba viendo.
+
+La caja "buscar" no hace LIKE '%texto%' sobre nombre y descripción: cada
+producto y cada promoción tiene sus términos en TerminoProducto /
+TerminoPromocion (normalizados y reducidos a su raíz como en busqueda.py),
+junto al proveedor. Cada palabra de la búsqueda es una búsqueda por prefijo
+sobre el índice (proveedor, termino, ...), así que el costo depende de
+cuántos productos coinciden, no del tamaño del catálogo. Los términos se
+actualizan con señales al guardar (proveedor/signals.py); la importación los
+escribe por lote y el comando reindexar_listados los reconstruye.
+"""
+
+from django.db import transaction
+from django.db.models import Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import vigencia
+from .busqueda import MAXIMO_TERMINOS_CONSULTA, terminos
+from .models import ProductoServicio, Promocion, TerminoProducto, TerminoPromocion
+
+TAMANO_LOTE = 1000
+
+# Orden de cada lista; el id desempata para el cursor (ver paginacion.py)
+ORDEN_PRODUCTOS = ['-id']
+ORDEN_PROMOCIONES = ['-fecha_inicio', '-id']
+
+
+def terminos_documento(*textos):
+    """Términos distintos de varios textos (p. ej. nombre y descripción)."""
+    vistos = {}
+    for texto in textos:
+        for termino in terminos(texto):
+            vistos.setdefault(termino, None)
+    return list(vistos)
+
+
+def _indexar(modelo, campo, filas):
+    """Reescribe los términos de las filas (id, proveedor_id, *textos)."""
+    filas = list(filas)
+    if not filas:
+        return
+    nuevos = [
+        modelo(proveedor_id=proveedor_id, termino=termino, **{f'{campo}_id': pk})
+        for pk, proveedor_id, *textos in filas
+        for termino in terminos_documento(*textos)
+    ]
+    with transaction.atomic():
+        modelo.objects.filter(**{f'{campo}_id__in': [fila[0] for fila in filas]}).delete()
+        modelo.objects.bulk_create(nuevos, batch_size=TAMANO_LOTE)
+
+
+def indexar_productos(productos):
+    """Reescribe los términos de los productos indicados (instancias guardadas)."""
+    _indexar(TerminoProducto, 'producto', ((p.pk, p.proveedor_id, p.nombre, p.descripcion) for p in productos))
+
+
+def indexar_promociones(promociones):
+    """Reescribe los términos de las promociones indicadas (instancias guardadas)."""
+    _indexar(TerminoPromocion, 'promocion', ((p.pk, p.proveedor_id, p.titulo, p.descripcion) for p in promociones))
+
+
+def reindexar(proveedor_ids=None):
+    """
+    Reconstruye los términos de productos y promociones, de todos los
+    proveedores o de los indicados, por lotes. Devuelve (productos, promociones).
+    """
+    totales = []
+    for modelo, terminos_modelo, campo, textos in (
+        (ProductoServicio, TerminoProducto, 'producto', ('nombre', 'descripcion')),
+        (Promocion, TerminoPromocion, 'promocion', ('titulo', 'descripcion')),
+    ):
+        filas = modelo.objects.order_by('pk')
+        if proveedor_ids is not None:
+            filas = filas.filter(proveedor_id__in=proveedor_ids)
+        total = 0
+        lote = []
+        for fila in filas.values_list('pk', 'proveedor_id', *textos).iterator(chunk_size=TAMANO_LOTE):
+            lote.append(fila)
+            if len(lote) >= TAMANO_LOTE:
+                _indexar(terminos_modelo, campo, lote)
+                total += len(lote)
+                lote = []
+        _indexar(terminos_modelo, campo, lote)
+        totales.append(total + len(lote))
+    return tuple(totales)
+
+
+def _buscar(queryset, proveedor, modelo, campo, texto):
+    """Filas que tienen todas las palabras del texto (por prefijo) en su índice."""
+    for termino in terminos(texto)[:MAXIMO_TERMINOS_CONSULTA]:
+        coincidencias = modelo.objects.filter(proveedor=proveedor, termino__startswith=termino)
+        queryset = queryset.filter(pk__in=Subquery(coincidencias.values(f'{campo}_id')))
+    return queryset
+
+
+def filtrar_productos(proveedor, params):
+    """Productos del proveedor con los filtros de lista_productos: categoria, estado (activo/inactivo) y buscar."""
+    productos = ProductoServicio.objects.filter(proveedor=proveedor)
+
+    categoria = params.get('categoria', '')
+    if categoria:
+        productos = productos.filter(categoria=categoria)
+
+    estado = params.get('estado', '')
+    if estado == 'activo':
+        productos = productos.filter(activo=True)
+    elif estado == 'inactivo':
+        productos = productos.filter(activo=False)
+
+    buscar = params.get('buscar', '')
+    if buscar:
+        productos = _buscar(productos, proveedor, TerminoProducto, 'producto', buscar)
+    return productos
+
+
+def _fecha(valor):
+    try:
+        return parse_date(valor or '')
+    except ValueError:
+        return None
+
+
+def filtrar_promociones(proveedor, params):
+    """Promociones del proveedor con los filtros de lista_promociones: estado, vigencia, buscar y rango de fechas."""
+    promociones = Promocion.objects.filter(proveedor=proveedor)
+
+    estado = params.get('estado', '')
+    if estado == 'activas':
+        promociones = promociones.filter(activo=True)
+    elif estado == 'inactivas':
+        promociones = promociones.filter(activo=False)
+
+    filtro_vigencia = params.get('vigencia', '')
+    hoy = timezone.localdate()
+    if filtro_vigencia == 'vigentes':
+        # Del conjunto materializado del día (ver vigencia.py)
+        vigentes = vigencia.del_dia(hoy).filter(proveedor=proveedor)
+        promociones = promociones.filter(pk__in=Subquery(vigentes.values('promocion_id')))
+    elif filtro_vigencia == 'programadas':
+        promociones = promociones.filter(activo=True, fecha_inicio__gt=hoy)
+    elif filtro_vigencia == 'vencidas':
+        promociones = promociones.filter(fecha_fin__lt=hoy)
+
+    buscar = params.get('buscar', '')
+    if buscar:
+        promociones = _buscar(promociones, proveedor, TerminoPromocion, 'promocion', buscar)
+
+    # Las fechas mal escritas se ignoran en vez de romper la consulta
+    fecha_desde = _fecha(params.get('fecha_desde'))
+    if fecha_desde:
+        promociones = promociones.filter(fecha_inicio__gte=fecha_desde)
+    fecha_hasta = _fecha(params.get('fecha_hasta'))
+    if fecha_hasta:
+        promociones = promociones.filter(fecha_fin__lte=fecha_hasta)
+    return promociones
@@ -0,0 +1,22 @@
+# proveedor/management/commands/calcular_histogramas.py
+
+"""
+Recalcula los histogramas de precios por categoría del catálogo público
+(HistogramaPrecio). Pensado para correr una vez al día o después de una carga
+masiva de productos; el catálogo solo lee el último cálculo.
+
+Uso:
+    python manage.py calcular_histogramas
+"""
+
+from django.core.management.base import BaseCommand
+
+from proveedor.catalogo import calcular_histogramas
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los histogramas de precios del catálogo de productos.'
+
+    def handle(self, *args, **options):
+        filas = calcular_histogramas()
+        self.stdout.write(self.style.SUCCESS(f'{filas} tramos de precios escritos.'))
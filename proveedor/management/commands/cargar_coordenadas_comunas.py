@@ -0,0 +1,97 @@
+# proveedor/management/commands/cargar_coordenadas_comunas.py
+
+"""
+Carga el centro aproximado de cada comuna desde el CSV incluido en
+proveedor/datos/comunas_coordenadas.csv (columnas region, comuna, latitud,
+longitud) y actualiza la ubicación efectiva de los proveedores de esas
+comunas que no indicaron una ubicación exacta.
+
+Las comunas se cruzan por nombre normalizado (sin tildes ni mayúsculas); si
+hay dos con el mismo nombre se usa también la región. Al final lista las
+comunas de la base que siguen sin coordenadas (no están en el CSV ni las
+tenían), porque sus proveedores no aparecen en las búsquedas por cercanía.
+
+Uso:
+    python manage.py cargar_coordenadas_comunas
+    python manage.py cargar_coordenadas_comunas --archivo otras.csv --dry-run
+"""
+
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from proveedor.busqueda import normalizar
+from proveedor.cercania import propagar_ubicacion_comuna
+from proveedor.models import Comuna
+from proveedor.referencias import invalidar_referencias
+
+ARCHIVO_POR_DEFECTO = Path(__file__).resolve().parents[2] / 'datos' / 'comunas_coordenadas.csv'
+
+
+class Command(BaseCommand):
+    help = 'Carga las coordenadas de las comunas y la ubicación de sus proveedores.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archivo', default=str(ARCHIVO_POR_DEFECTO), help='CSV con las coordenadas.')
+        parser.add_argument('--dry-run', action='store_true', help='Solo muestra qué comunas se actualizarían.')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['archivo'], newline='', encoding='utf-8') as archivo:
+                filas = list(csv.DictReader(archivo))
+        except OSError as e:
+            raise CommandError(f'No se pudo leer {options["archivo"]}: {e}')
+
+        por_nombre = {}
+        for comuna in Comuna.objects.select_related('region'):
+            por_nombre.setdefault(normalizar(comuna.nombre), []).append(comuna)
+
+        actualizadas = []
+        sin_comuna = []
+        cubiertas = set()
+        for fila in filas:
+            try:
+                latitud, longitud = float(fila['latitud']), float(fila['longitud'])
+            except (KeyError, TypeError, ValueError):
+                raise CommandError(f'Fila inválida: {fila}')
+            candidatas = por_nombre.get(normalizar(fila.get('comuna')), [])
+            if len(candidatas) > 1:
+                region = normalizar(fila.get('region'))
+                candidatas = [c for c in candidatas if region and region in normalizar(c.region.nombre)]
+            if len(candidatas) != 1:
+                sin_comuna.append(fila.get('comuna'))
+                continue
+            comuna = candidatas[0]
+            cubiertas.add(comuna.pk)
+            if (comuna.latitud, comuna.longitud) != (latitud, longitud):
+                comuna.latitud, comuna.longitud = latitud, longitud
+                actualizadas.append(comuna)
+
+        if sin_comuna:
+            self.stdout.write(f'Sin comuna en la base ({len(sin_comuna)}): {", ".join(sin_comuna)}')
+        sin_coordenadas = sorted(
+            f'{comuna.nombre} ({comuna.region.nombre})'
+            for comunas in por_nombre.values() for comuna in comunas
+            if comuna.pk not in cubiertas and (comuna.latitud is None or comuna.longitud is None)
+        )
+        if sin_coordenadas:
+            self.stdout.write(self.style.WARNING(
+                f'Comunas sin coordenadas ({len(sin_coordenadas)}): {", ".join(sin_coordenadas)}'
+            ))
+        if options['dry_run']:
+            self.stdout.write(f'Se actualizarían {len(actualizadas)} comunas.')
+            return
+
+        proveedores = 0
+        with transaction.atomic():
+            Comuna.objects.bulk_update(actualizadas, ['latitud', 'longitud'], batch_size=500)
+            for comuna in actualizadas:
+                proveedores += propagar_ubicacion_comuna(comuna.pk, comuna.latitud, comuna.longitud)
+            # bulk_update no dispara señales
+            transaction.on_commit(invalidar_referencias)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(actualizadas)} comunas actualizadas; ubicación de {proveedores} proveedores.'
+        ))
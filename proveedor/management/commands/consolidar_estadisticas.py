@@ -0,0 +1,41 @@
+# proveedor/management/commands/consolidar_estadisticas.py
+
+"""
+Consolida las estadísticas diarias de los proveedores (EstadisticaDiaria).
+
+Es incremental: sin argumentos retoma desde el último día consolidado (que se
+recalcula) hasta hoy. Pensado para correr periódicamente (cron), por ejemplo
+cada hora. Con --desde se puede rehacer un período completo.
+
+Uso:
+    python manage.py consolidar_estadisticas
+    python manage.py consolidar_estadisticas --desde 2025-01-01 --hasta 2025-03-31
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from proveedor.estadisticas import consolidar_pendiente
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f'Fecha inválida: {valor} (use AAAA-MM-DD).')
+
+
+class Command(BaseCommand):
+    help = 'Arma el resumen diario de visitas y contactos por proveedor.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=_fecha, default=None, help='Primer día a consolidar (AAAA-MM-DD).')
+        parser.add_argument('--hasta', type=_fecha, default=None, help='Último día a consolidar (default: hoy).')
+
+    def handle(self, *args, **options):
+        total = 0
+        for desde, hasta, filas in consolidar_pendiente(options['desde'], options['hasta']):
+            total += filas
+            self.stdout.write(f'{desde} a {hasta}: {filas} filas.')
+        self.stdout.write(self.style.SUCCESS(f'{total} filas consolidadas.'))
@@ -0,0 +1,85 @@
+# proveedor/management/commands/importar_catalogo.py
+
+"""
+Importación masiva de productos (ver proveedor/importacion.py).
+
+Sin argumentos procesa las importaciones subidas desde el panel que hayan
+quedado pendientes (p. ej. si el servidor se reinició antes de lanzarlas), y
+antes da por fallidas las que llevan demasiado tiempo procesando.
+Con un archivo, importa ese CSV local al catálogo del proveedor indicado.
+
+Uso:
+    python manage.py importar_catalogo
+    python manage.py importar_catalogo --tiempo-maximo 30
+    python manage.py importar_catalogo productos.csv --proveedor 12
+    python manage.py importar_catalogo productos.csv --proveedor 12 --imagenes fotos.zip --lote 1000
+"""
+
+import csv
+import zipfile
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from proveedor.importacion import (
+    ImportadorCatalogo, TAMANO_LOTE, TIEMPO_MAXIMO, procesar_pendientes, reclamar_colgadas,
+)
+from proveedor.models import ImportacionCatalogo, Proveedor
+
+
+class Command(BaseCommand):
+    help = 'Importa productos desde un CSV o procesa las importaciones pendientes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', nargs='?', help='CSV local a importar.')
+        parser.add_argument('--proveedor', type=int, help='Id del proveedor (obligatorio con un archivo).')
+        parser.add_argument('--imagenes', help='Zip con las imágenes de los productos.')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help=f'Filas por lote (default: {TAMANO_LOTE}).')
+        parser.add_argument(
+            '--tiempo-maximo', type=int, default=int(TIEMPO_MAXIMO.total_seconds() // 60),
+            help='Minutos procesando tras los cuales una importación se da por fallida.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['archivo']:
+            reclamadas = reclamar_colgadas(tiempo_maximo=timedelta(minutes=options['tiempo_maximo']))
+            if reclamadas:
+                self.stdout.write(self.style.WARNING(f'{reclamadas} importaciones interrumpidas marcadas como fallidas.'))
+            procesadas = 0
+            for importacion_id in procesar_pendientes():
+                procesadas += 1
+                estado = ImportacionCatalogo.objects.values_list('estado', flat=True).get(pk=importacion_id)
+                self.stdout.write(f'Importación {importacion_id}: {estado}.')
+            self.stdout.write(self.style.SUCCESS(f'{procesadas} importaciones procesadas.'))
+            return
+
+        if options['proveedor'] is None:
+            raise CommandError('Indica el proveedor con --proveedor.')
+        try:
+            proveedor = Proveedor.objects.get(pk=options['proveedor'])
+        except Proveedor.DoesNotExist:
+            raise CommandError(f'No existe el proveedor {options["proveedor"]}.')
+
+        def progreso(importador, bytes_leidos):
+            self.stdout.write(
+                f'{importador.filas_procesadas} filas: {importador.creados} creados, '
+                f'{importador.actualizados} actualizados, {importador.invalidos} inválidos.'
+            )
+
+        importador = ImportadorCatalogo(proveedor, progreso=progreso, tamano_lote=options['lote'])
+        try:
+            with ExitStack() as pila:
+                archivo = pila.enter_context(open(options['archivo'], 'rb'))
+                imagenes = pila.enter_context(zipfile.ZipFile(options['imagenes'])) if options['imagenes'] else None
+                importador.importar(archivo, imagenes)
+        except (ValueError, csv.Error, zipfile.BadZipFile, OSError) as e:
+            raise CommandError(f'La importación se detuvo: {e}')
+        finally:
+            for error in importador.errores:
+                self.stderr.write(error)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Importación terminada: {importador.creados} creados, '
+            f'{importador.actualizados} actualizados, {importador.invalidos} inválidos.'
+        ))
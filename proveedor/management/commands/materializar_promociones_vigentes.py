@@ -0,0 +1,36 @@
+# proveedor/management/commands/materializar_promociones_vigentes.py
+
+"""
+Arma el conjunto de promociones vigentes del día (PromocionVigente, ver
+proveedor/vigencia.py) y borra los días anteriores. Conviene programarlo
+apenas pasada la medianoche; si no corre, el primer acceso del día lo arma.
+
+Uso:
+    python manage.py materializar_promociones_vigentes
+    python manage.py materializar_promociones_vigentes --dia 2025-12-24
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from proveedor.vigencia import materializar
+
+
+class Command(BaseCommand):
+    help = 'Materializa las promociones vigentes del día.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dia', help='Día a materializar, AAAA-MM-DD (default: hoy).')
+
+    def handle(self, *args, **options):
+        dia = None
+        if options['dia']:
+            try:
+                dia = parse_date(options['dia'])
+            except ValueError:
+                dia = None
+            if dia is None:
+                raise CommandError(f'Fecha no válida: {options["dia"]}.')
+
+        total = materializar(dia)
+        self.stdout.write(self.style.SUCCESS(f'{total} promociones vigentes materializadas.'))
@@ -0,0 +1,74 @@
+# proveedor/management/commands/reconciliar_contadores.py
+
+"""
+Recalcula ContadoresProveedor contando en la base de datos y corrige las
+filas que se desviaron (cambios hechos sin señales, como QuerySet.update()).
+También crea las filas que falten. Procesa los proveedores por lotes de id.
+
+Uso:
+    python manage.py reconciliar_contadores
+    python manage.py reconciliar_contadores --lote 1000 --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from proveedor.contadores import CAMPOS, calcular
+from proveedor.models import ContadoresProveedor, Proveedor
+
+
+class Command(BaseCommand):
+    help = 'Corrige los contadores del panel de proveedores a partir de conteos reales.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Proveedores por lote (default: 500).')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informar, sin escribir.')
+
+    def handle(self, *args, **options):
+        tamano = max(1, options['lote'])
+        dry_run = options['dry_run']
+        hoy = timezone.localdate()
+        ultimo_id = 0
+        corregidos = creados = 0
+
+        while True:
+            ids = list(
+                Proveedor.objects.filter(pk__gt=ultimo_id).order_by('pk').values_list('pk', flat=True)[:tamano]
+            )
+            if not ids:
+                break
+            ultimo_id = ids[-1]
+
+            with transaction.atomic():
+                # Bloquea las filas del lote para que ninguna señal sume entre el conteo y la escritura.
+                existentes = {
+                    c.pk: c for c in ContadoresProveedor.objects.select_for_update().filter(proveedor_id__in=ids)
+                }
+                reales = calcular(ids, hoy)
+
+                nuevos, cambiados = [], []
+                for pid, valores in reales.items():
+                    contadores = existentes.get(pid)
+                    if contadores is None:
+                        nuevos.append(ContadoresProveedor(proveedor_id=pid, vigencia_al=hoy, **valores))
+                        continue
+                    if contadores.vigencia_al == hoy and all(getattr(contadores, c) == valores[c] for c in CAMPOS):
+                        continue
+                    for campo, valor in valores.items():
+                        if getattr(contadores, campo) != valor:
+                            self.stdout.write(
+                                f'Proveedor {pid}: {campo} {getattr(contadores, campo)} -> {valor}'
+                            )
+                        setattr(contadores, campo, valor)
+                    contadores.vigencia_al = hoy
+                    cambiados.append(contadores)
+
+                if not dry_run:
+                    ContadoresProveedor.objects.bulk_create(nuevos, ignore_conflicts=True)
+                    ContadoresProveedor.objects.bulk_update(cambiados, [*CAMPOS, 'vigencia_al'])
+            creados += len(nuevos)
+            corregidos += len(cambiados)
+
+        accion = 'a corregir' if dry_run else 'corregidos'
+        self.stdout.write(self.style.SUCCESS(f'{corregidos} contadores {accion}, {creados} nuevos.'))
@@ -0,0 +1,34 @@
+# proveedor/management/commands/reconstruir_cobertura.py
+
+"""
+Rehace la tabla de cobertura expandida (ZonaAtendida) por lotes de
+proveedores. Las señales la mantienen al día; esto es para la carga inicial o
+después de cambios masivos de geografía hechos sin señales.
+
+Uso:
+    python manage.py reconstruir_cobertura
+    python manage.py reconstruir_cobertura --lote 200
+"""
+
+from django.core.management.base import BaseCommand
+
+from proveedor.cobertura import reconstruir_por_lotes
+from proveedor.directorio import invalidar_facetas
+from proveedor.models import Proveedor
+
+
+class Command(BaseCommand):
+    help = 'Rehace la tabla de zonas atendidas por cada proveedor.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Proveedores por lote (default: 500).')
+
+    def handle(self, *args, **options):
+        filas = 0
+        for ultimo_id, escritas in reconstruir_por_lotes(Proveedor.objects.all(), max(1, options['lote'])):
+            filas += escritas
+            self.stdout.write(f'Hasta id {ultimo_id}: {filas} zonas.')
+
+        # Los conteos del directorio en caché de todos los procesos quedan viejos
+        invalidar_facetas()
+        self.stdout.write(self.style.SUCCESS(f'{filas} zonas atendidas escritas.'))
@@ -0,0 +1,27 @@
+# proveedor/management/commands/reindexar_listados.py
+
+"""
+Reconstruye los índices de búsqueda de las listas del panel (TerminoProducto
+y TerminoPromocion). Las señales y la importación los mantienen al día; esto
+es para la carga inicial o después de cambiar las reglas de normalización en
+proveedor/busqueda.py.
+
+Uso:
+    python manage.py reindexar_listados
+    python manage.py reindexar_listados --proveedor 12
+"""
+
+from django.core.management.base import BaseCommand
+
+from proveedor.listados import reindexar
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la búsqueda de productos y promociones del panel del proveedor.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--proveedor', type=int, action='append', help='Solo este proveedor (se puede repetir).')
+
+    def handle(self, *args, **options):
+        productos, promociones = reindexar(options['proveedor'])
+        self.stdout.write(self.style.SUCCESS(f'{productos} productos y {promociones} promociones indexados.'))
@@ -0,0 +1,44 @@
+# proveedor/management/commands/reindexar_proveedores.py
+
+"""
+Reconstruye el índice de búsqueda del directorio (TerminoBusqueda) por lotes
+de proveedores. Las señales lo mantienen al día; esto es para la carga inicial
+o después de cambiar las reglas de normalización en proveedor/busqueda.py.
+
+Uso:
+    python manage.py reindexar_proveedores
+    python manage.py reindexar_proveedores --lote 200
+"""
+
+from django.core.management.base import BaseCommand
+
+from proveedor.busqueda import indexar_proveedores
+from proveedor.directorio import invalidar_facetas
+from proveedor.models import Proveedor
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda del directorio de proveedores.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Proveedores por lote (default: 500).')
+
+    def handle(self, *args, **options):
+        tamano = max(1, options['lote'])
+        ultimo_id = 0
+        indexados = 0
+
+        while True:
+            ids = list(
+                Proveedor.objects.filter(pk__gt=ultimo_id).order_by('pk').values_list('pk', flat=True)[:tamano]
+            )
+            if not ids:
+                break
+            indexar_proveedores(ids)
+            ultimo_id = ids[-1]
+            indexados += len(ids)
+            self.stdout.write(f'Hasta id {ultimo_id}: {indexados} indexados.')
+
+        # Los conteos del directorio en caché de todos los procesos quedan viejos
+        invalidar_facetas()
+        self.stdout.write(self.style.SUCCESS(f'{indexados} proveedores indexados.'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0006_termino_busqueda'),
+        ('usuarios', '0012_comerciante_activo_comerciante_baja_solicitada'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proveedor',
+            index=models.Index(fields=['activo', '-destacado', '-fecha_registro', '-id'], name='proveedor_directorio_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0007_indice_directorio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('visitas', models.PositiveIntegerField(default=0)),
+                ('proveedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visitas_diarias', to='proveedor.proveedor')),
+            ],
+            options={
+                'verbose_name': 'Visitas del día',
+                'verbose_name_plural': 'Visitas diarias',
+                'db_table': 'proveedor_visita_diaria',
+                'constraints': [models.UniqueConstraint(fields=('proveedor', 'fecha'), name='visita_diaria_unica')],
+            },
+        ),
+    ]
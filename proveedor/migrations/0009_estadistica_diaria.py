@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0008_visita_diaria'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visitadiaria',
+            name='vistas_productos',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='visitadiaria',
+            name='vistas_promociones',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='EstadisticaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('visitas', models.PositiveIntegerField(default=0)),
+                ('contactos_enviados', models.PositiveIntegerField(default=0)),
+                ('contactos_aceptados', models.PositiveIntegerField(default=0)),
+                ('vistas_productos', models.PositiveIntegerField(default=0)),
+                ('vistas_promociones', models.PositiveIntegerField(default=0)),
+                ('proveedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='estadisticas_diarias', to='proveedor.proveedor')),
+            ],
+            options={
+                'verbose_name': 'Estadística diaria',
+                'verbose_name_plural': 'Estadísticas diarias',
+                'db_table': 'proveedor_estadistica_diaria',
+                'constraints': [models.UniqueConstraint(fields=('proveedor', 'fecha'), name='estadistica_diaria_unica')],
+            },
+        ),
+    ]
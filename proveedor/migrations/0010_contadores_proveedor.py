@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0009_estadistica_diaria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadoresProveedor',
+            fields=[
+                ('proveedor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='contadores', serialize=False, to='proveedor.proveedor')),
+                ('total_productos', models.IntegerField(default=0)),
+                ('promociones_vigentes', models.IntegerField(default=0)),
+                ('solicitudes_pendientes', models.IntegerField(default=0)),
+                ('vigencia_al', models.DateField()),
+            ],
+            options={
+                'verbose_name': 'Contadores del proveedor',
+                'verbose_name_plural': 'Contadores de proveedores',
+                'db_table': 'proveedor_contadores',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0011_ubicacion_cercania'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZonaAtendida',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nivel', models.CharField(choices=[('comuna', 'Comuna'), ('region', 'Región'), ('pais', 'País')], max_length=6)),
+                ('lugar_id', models.PositiveIntegerField()),
+                ('proveedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='zonas_atendidas', to='proveedor.proveedor')),
+            ],
+            options={
+                'verbose_name': 'Zona atendida',
+                'verbose_name_plural': 'Zonas atendidas',
+                'db_table': 'proveedor_zona_atendida',
+                'constraints': [models.UniqueConstraint(fields=('nivel', 'lugar_id', 'proveedor'), name='zona_atendida_unica')],
+            },
+        ),
+    ]
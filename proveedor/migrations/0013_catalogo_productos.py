@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0012_zona_atendida'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistogramaPrecio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(choices=[('ALIMENTOS', 'Alimentos y Comida'), ('BEBIDAS', 'Bebidas y Licores'), ('ROPA', 'Ropa y Accesorios'), ('HOGAR', 'Artículos para el Hogar'), ('SERVICIOS', 'Servicios Profesionales'), ('OTRO', 'Otro / Varios')], max_length=50)),
+                ('tramo', models.PositiveSmallIntegerField()),
+                ('desde', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('hasta', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Tramo de precios',
+                'verbose_name_plural': 'Histograma de precios',
+                'db_table': 'proveedor_histograma_precio',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='productoservicio',
+            index=models.Index(fields=['activo', 'categoria', 'precio_referencia', 'id'], name='producto_catalogo_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productoservicio',
+            index=models.Index(fields=['activo', 'precio_referencia', 'id'], name='producto_catalogo_precio_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='histogramaprecio',
+            constraint=models.UniqueConstraint(fields=('categoria', 'tramo'), name='histograma_precio_unico'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0013_catalogo_productos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportacionCatalogo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archivo', models.FileField(upload_to='importaciones/', verbose_name='Archivo CSV')),
+                ('imagenes', models.FileField(blank=True, null=True, upload_to='importaciones/', verbose_name='Imágenes (zip)')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('terminada', 'Terminada'), ('fallida', 'Fallida')], default='pendiente', max_length=20)),
+                ('tamano', models.PositiveBigIntegerField(default=0)),
+                ('bytes_leidos', models.PositiveBigIntegerField(default=0)),
+                ('filas_procesadas', models.PositiveIntegerField(default=0)),
+                ('creados', models.PositiveIntegerField(default=0)),
+                ('actualizados', models.PositiveIntegerField(default=0)),
+                ('invalidos', models.PositiveIntegerField(default=0)),
+                ('errores', models.TextField(blank=True, default='')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Importación de catálogo',
+                'verbose_name_plural': 'Importaciones de catálogo',
+                'db_table': 'proveedor_importacion_catalogo',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+        migrations.AddField(
+            model_name='productoservicio',
+            name='sku',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='SKU'),
+        ),
+        migrations.AddConstraint(
+            model_name='productoservicio',
+            constraint=models.UniqueConstraint(fields=('proveedor', 'sku'), name='producto_sku_unico'),
+        ),
+        migrations.AddField(
+            model_name='importacioncatalogo',
+            name='proveedor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='importaciones', to='proveedor.proveedor'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0014_importacion_catalogo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TerminoProducto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=50)),
+            ],
+            options={
+                'verbose_name': 'Término de producto',
+                'verbose_name_plural': 'Términos de productos',
+                'db_table': 'proveedor_termino_producto',
+            },
+        ),
+        migrations.CreateModel(
+            name='TerminoPromocion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=50)),
+            ],
+            options={
+                'verbose_name': 'Término de promoción',
+                'verbose_name_plural': 'Términos de promociones',
+                'db_table': 'proveedor_termino_promocion',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='productoservicio',
+            index=models.Index(fields=['proveedor', 'id'], name='producto_panel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productoservicio',
+            index=models.Index(fields=['proveedor', 'activo', 'id'], name='producto_panel_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productoservicio',
+            index=models.Index(fields=['proveedor', 'categoria', 'id'], name='producto_panel_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promocion',
+            index=models.Index(fields=['proveedor', 'fecha_inicio', 'id'], name='promocion_panel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promocion',
+            index=models.Index(fields=['proveedor', 'activo', 'fecha_inicio', 'id'], name='promocion_panel_estado_idx'),
+        ),
+        migrations.AddField(
+            model_name='terminoproducto',
+            name='producto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terminos', to='proveedor.productoservicio'),
+        ),
+        migrations.AddField(
+            model_name='terminoproducto',
+            name='proveedor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='proveedor.proveedor'),
+        ),
+        migrations.AddField(
+            model_name='terminopromocion',
+            name='promocion',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terminos', to='proveedor.promocion'),
+        ),
+        migrations.AddField(
+            model_name='terminopromocion',
+            name='proveedor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='proveedor.proveedor'),
+        ),
+        migrations.AddConstraint(
+            model_name='terminoproducto',
+            constraint=models.UniqueConstraint(fields=('proveedor', 'termino', 'producto'), name='termino_producto_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='terminopromocion',
+            constraint=models.UniqueConstraint(fields=('proveedor', 'termino', 'promocion'), name='termino_promocion_unico'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0015_listados_panel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromocionVigente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('fecha_inicio', models.DateField()),
+                ('promocion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vigencias', to='proveedor.promocion')),
+                ('proveedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='proveedor.proveedor')),
+            ],
+            options={
+                'verbose_name': 'Promoción vigente',
+                'verbose_name_plural': 'Promociones vigentes',
+                'db_table': 'promocion_vigente',
+                'indexes': [models.Index(fields=['dia', 'fecha_inicio', 'promocion'], name='promocion_vigente_feed_idx'), models.Index(fields=['dia', 'proveedor', 'fecha_inicio'], name='promocion_vigente_prov_idx')],
+                'constraints': [models.UniqueConstraint(fields=('dia', 'promocion'), name='promocion_vigente_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:05
+
+import re
+import unicodedata
+
+from django.db import migrations
+
+TAMANO_LOTE = 1000
+
+# Copia de la normalización de proveedor/busqueda.py al momento de la
+# migración: si esas reglas cambian, el índice se rehace con el comando
+# correspondiente, no reescribiendo esta migración.
+LARGO_MAXIMO_TERMINO = 50
+
+STOPWORDS = frozenset('''
+    a al ante con de del desde e el en entre es esta este la las lo los mas muy
+    o para pero por que se sin sobre su sus tu un una uno unos unas y ya
+'''.split())
+
+PLURALES = (('ces', 'z'), ('es', ''), ('s', ''))
+SUFIJOS = (
+    'amiento', 'imiento', 'acion', 'icion', 'mente', 'ancia', 'encia',
+    'idad', 'ista', 'ismo', 'ible', 'able', 'ador', 'dora', 'eria', 'ero', 'era',
+)
+VOCALES_FINALES = 'aeo'
+LARGO_MINIMO_RAIZ = 4
+
+_PALABRA = re.compile(r'[a-z0-9]+')
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize('NFKD', (texto or '').lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def raiz(palabra):
+    for sufijo, reemplazo in PLURALES:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= 2:
+            palabra = palabra[:-len(sufijo)] + reemplazo
+            break
+    for sufijo in SUFIJOS:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= LARGO_MINIMO_RAIZ:
+            palabra = palabra[:-len(sufijo)]
+            break
+    if len(palabra) > 3 and palabra[-1] in VOCALES_FINALES:
+        palabra = palabra[:-1]
+    return palabra[:LARGO_MAXIMO_TERMINO]
+
+
+def terminos(texto):
+    vistos = {}
+    for palabra in _PALABRA.findall(normalizar(texto)):
+        if palabra in STOPWORDS or len(palabra) < 2:
+            continue
+        vistos.setdefault(raiz(palabra), None)
+    return list(vistos)
+
+
+def _terminos_documento(*textos):
+    vistos = {}
+    for texto in textos:
+        for termino in terminos(texto):
+            vistos.setdefault(termino, None)
+    return list(vistos)
+
+
+def _indexar(modelo, terminos_modelo, campo, textos):
+    # Mismo recorrido que listados.reindexar(), sobre los modelos históricos
+    lote = []
+    filas = modelo.objects.order_by('pk').values_list('pk', 'proveedor_id', *textos).iterator(chunk_size=TAMANO_LOTE)
+    for pk, proveedor_id, *valores in filas:
+        lote += [
+            terminos_modelo(proveedor_id=proveedor_id, termino=termino, **{f'{campo}_id': pk})
+            for termino in _terminos_documento(*valores)
+        ]
+        if len(lote) >= TAMANO_LOTE:
+            terminos_modelo.objects.bulk_create(lote, batch_size=TAMANO_LOTE, ignore_conflicts=True)
+            lote = []
+    terminos_modelo.objects.bulk_create(lote, batch_size=TAMANO_LOTE, ignore_conflicts=True)
+
+
+def indexar_listados(apps, schema_editor):
+    _indexar(
+        apps.get_model('proveedor', 'ProductoServicio'), apps.get_model('proveedor', 'TerminoProducto'),
+        'producto', ('nombre', 'descripcion'),
+    )
+    _indexar(
+        apps.get_model('proveedor', 'Promocion'), apps.get_model('proveedor', 'TerminoPromocion'),
+        'promocion', ('titulo', 'descripcion'),
+    )
+
+
+def vaciar_listados(apps, schema_editor):
+    apps.get_model('proveedor', 'TerminoProducto').objects.all().delete()
+    apps.get_model('proveedor', 'TerminoPromocion').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0017_version_datos'),
+    ]
+
+    operations = [
+        migrations.RunPython(indexar_listados, vaciar_listados),
+    ]
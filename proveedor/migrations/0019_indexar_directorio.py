@@ -0,0 +1,122 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:12
+
+import re
+import unicodedata
+
+from django.db import migrations
+
+TAMANO_LOTE = 500
+
+# Copia de la normalización de proveedor/busqueda.py al momento de la
+# migración: si esas reglas cambian, el índice se rehace con el comando
+# correspondiente, no reescribiendo esta migración.
+LARGO_MAXIMO_TERMINO = 50
+
+STOPWORDS = frozenset('''
+    a al ante con de del desde e el en entre es esta este la las lo los mas muy
+    o para pero por que se sin sobre su sus tu un una uno unos unas y ya
+'''.split())
+
+PLURALES = (('ces', 'z'), ('es', ''), ('s', ''))
+SUFIJOS = (
+    'amiento', 'imiento', 'acion', 'icion', 'mente', 'ancia', 'encia',
+    'idad', 'ista', 'ismo', 'ible', 'able', 'ador', 'dora', 'eria', 'ero', 'era',
+)
+VOCALES_FINALES = 'aeo'
+LARGO_MINIMO_RAIZ = 4
+
+_PALABRA = re.compile(r'[a-z0-9]+')
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize('NFKD', (texto or '').lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def raiz(palabra):
+    for sufijo, reemplazo in PLURALES:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= 2:
+            palabra = palabra[:-len(sufijo)] + reemplazo
+            break
+    for sufijo in SUFIJOS:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= LARGO_MINIMO_RAIZ:
+            palabra = palabra[:-len(sufijo)]
+            break
+    if len(palabra) > 3 and palabra[-1] in VOCALES_FINALES:
+        palabra = palabra[:-1]
+    return palabra[:LARGO_MAXIMO_TERMINO]
+
+
+def terminos(texto):
+    vistos = {}
+    for palabra in _PALABRA.findall(normalizar(texto)):
+        if palabra in STOPWORDS or len(palabra) < 2:
+            continue
+        vistos.setdefault(raiz(palabra), None)
+    return list(vistos)
+
+
+PESO_NOMBRE = 8
+PESO_CATEGORIA = 4
+PESO_PRODUCTO = 3
+PESO_DESCRIPCION = 1
+
+
+def terminos_proveedor(nombre, descripcion, categorias=(), productos=()):
+    pesos = {}
+    fuentes = [(nombre, PESO_NOMBRE), (descripcion, PESO_DESCRIPCION)]
+    fuentes += [(c, PESO_CATEGORIA) for c in categorias]
+    fuentes += [(p, PESO_PRODUCTO) for p in productos]
+    for texto, peso in fuentes:
+        for termino in terminos(texto):
+            if pesos.get(termino, 0) < peso:
+                pesos[termino] = peso
+    return pesos
+
+
+def indexar_directorio(apps, schema_editor):
+    # Mismo armado que busqueda.indexar_proveedores(), sobre los modelos históricos y por lotes de proveedores
+    Proveedor = apps.get_model('proveedor', 'Proveedor')
+    ProductoServicio = apps.get_model('proveedor', 'ProductoServicio')
+    TerminoBusqueda = apps.get_model('proveedor', 'TerminoBusqueda')
+
+    ultimo_id = 0
+    while True:
+        filas = list(
+            Proveedor.objects.filter(pk__gt=ultimo_id).order_by('pk')
+            .values_list('pk', 'nombre_empresa', 'descripcion')[:TAMANO_LOTE]
+        )
+        if not filas:
+            return
+        ids = [fila[0] for fila in filas]
+        ultimo_id = ids[-1]
+
+        categorias = {}
+        for pid, nombre in Proveedor.categorias.through.objects.filter(
+            proveedor_id__in=ids
+        ).values_list('proveedor_id', 'categoriaproveedor__nombre'):
+            categorias.setdefault(pid, []).append(nombre)
+
+        productos = {}
+        for pid, nombre in ProductoServicio.objects.filter(
+            proveedor_id__in=ids, activo=True
+        ).values_list('proveedor_id', 'nombre'):
+            productos.setdefault(pid, []).append(nombre)
+
+        nuevos = []
+        for pid, nombre, descripcion in filas:
+            pesos = terminos_proveedor(nombre, descripcion, categorias.get(pid, ()), productos.get(pid, ()))
+            nuevos += [TerminoBusqueda(proveedor_id=pid, termino=t, peso=p) for t, p in pesos.items()]
+        TerminoBusqueda.objects.filter(proveedor_id__in=ids).delete()
+        TerminoBusqueda.objects.bulk_create(nuevos, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0018_indexar_listados'),
+    ]
+
+    operations = [
+        migrations.RunPython(indexar_directorio, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:20
+
+from django.db import migrations
+
+TAMANO_LOTE = 500
+
+# Copia de proveedor/cobertura.py al momento de la migración, sobre un árbol
+# país → región → comuna armado con los modelos históricos.
+CAMPOS_ZONA = ('cobertura', 'pais_id', 'region_id', 'comuna_id')
+
+
+def _geografia(apps):
+    Region = apps.get_model('proveedor', 'Region')
+    Comuna = apps.get_model('proveedor', 'Comuna')
+    Pais = apps.get_model('proveedor', 'Pais')
+
+    region_de_comuna = {}
+    comunas_por_region = {}
+    for pk, region_id in Comuna.objects.values_list('pk', 'region_id'):
+        region_de_comuna[pk] = region_id
+        comunas_por_region.setdefault(region_id, []).append(pk)
+
+    pais_de_region = {}
+    regiones_por_pais = {}
+    for pk, pais_id in Region.objects.values_list('pk', 'pais_id'):
+        pais_de_region[pk] = pais_id
+        regiones_por_pais.setdefault(pais_id, []).append(pk)
+
+    paises = list(Pais.objects.values_list('pk', flat=True))
+    return region_de_comuna, comunas_por_region, pais_de_region, regiones_por_pais, paises
+
+
+def zonas_de(cobertura, pais_id, region_id, comuna_id, geografia):
+    region_de_comuna, comunas_por_region, pais_de_region, regiones_por_pais, paises = geografia
+
+    def region_completa(region):
+        return [('region', region)] + [('comuna', c) for c in comunas_por_region.get(region, ())]
+
+    def pais_completo(pais):
+        zonas = [('pais', pais)]
+        for region in regiones_por_pais.get(pais, ()):
+            zonas += region_completa(region)
+        return zonas
+
+    # Completar hacia arriba desde el dato más preciso
+    comuna = comuna_id if comuna_id in region_de_comuna else None
+    if comuna is not None:
+        region_id = region_de_comuna[comuna]
+    region = region_id if region_id in pais_de_region else None
+    if region is not None:
+        pais_id = pais_de_region[region]
+
+    if cobertura == 'internacional':
+        zonas = []
+        for pais in paises:
+            zonas += pais_completo(pais)
+        return zonas
+    if cobertura == 'nacional' and pais_id in paises:
+        return pais_completo(pais_id)
+    if cobertura in ('regional', 'nacional') and region is not None:
+        return region_completa(region)
+    return [('comuna', comuna)] if comuna is not None else []
+
+
+def expandir_zonas(apps, schema_editor):
+    Proveedor = apps.get_model('proveedor', 'Proveedor')
+    ZonaAtendida = apps.get_model('proveedor', 'ZonaAtendida')
+    geografia = _geografia(apps)
+
+    ultimo_id = 0
+    while True:
+        filas = list(
+            Proveedor.objects.filter(pk__gt=ultimo_id).order_by('pk')
+            .values_list('pk', *CAMPOS_ZONA)[:TAMANO_LOTE]
+        )
+        if not filas:
+            return
+        ids = [fila[0] for fila in filas]
+        ultimo_id = ids[-1]
+        nuevas = [
+            ZonaAtendida(proveedor_id=pk, nivel=nivel, lugar_id=lugar_id)
+            for pk, *zona in filas
+            for nivel, lugar_id in zonas_de(*zona, geografia)
+        ]
+        ZonaAtendida.objects.filter(proveedor_id__in=ids).delete()
+        ZonaAtendida.objects.bulk_create(nuevas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0019_indexar_directorio'),
+    ]
+
+    operations = [
+        migrations.RunPython(expandir_zonas, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,7 @@
 
 from django.db import models
 from django.contrib.auth.models import User
-from django.core.validators import RegexValidator
+from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from usuarios.models import Comerciante
 
 class Pais(models.Model):
@@ -33,6 +33,9 @@ class Region(models.Model):
 class Comuna(models.Model):
     nombre = models.CharField(max_length=100)
     region = models.ForeignKey(Region, on_delete=models.CASCADE, related_name='comunas')
+    # Centro aproximado (ver datos/comunas_coordenadas.csv y cargar_coordenadas_comunas)
+    latitud = models.FloatField(blank=True, null=True)
+    longitud = models.FloatField(blank=True, null=True)
     
     class Meta:
         db_table = 'comuna'
@@ -98,6 +101,17 @@ class Proveedor(models.Model):
     ]
     cobertura = models.CharField(max_length=20, choices=COBERTURA_CHOICES, default='local', verbose_name='Zona geográfica')
     
+    # Ubicación exacta opcional; si falta se usa el centro de la comuna
+    latitud = models.FloatField(
+        blank=True, null=True, validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitud = models.FloatField(
+        blank=True, null=True, validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    # Ubicación efectiva para "cerca de mí" (la mantiene signals.py, ver cercania.py)
+    ubicacion_lat = models.FloatField(blank=True, null=True, editable=False)
+    ubicacion_lon = models.FloatField(blank=True, null=True, editable=False)
+    
     # Datos de contacto
     telefono_regex = RegexValidator(
         regex=r'^\+?1?\d{9,15}$',
@@ -133,13 +147,20 @@ class Proveedor(models.Model):
         verbose_name = 'Proveedor'
         verbose_name_plural = 'Proveedores'
         ordering = ['-fecha_registro']
+        indexes = [
+            # Orden del directorio; lo usa la paginación por cursor
+            models.Index(fields=['activo', '-destacado', '-fecha_registro', '-id'], name='proveedor_directorio_idx'),
+            # Prefiltro por rectángulo de la búsqueda por cercanía
+            models.Index(fields=['ubicacion_lat', 'ubicacion_lon'], name='proveedor_ubicacion_idx'),
+        ]
     
     def __str__(self):
         return self.nombre_empresa
     
     def incrementar_visitas(self):
-        self.visitas += 1
-        self.save(update_fields=['visitas'])
+        # Se acumula en memoria y se escribe por lotes (ver visitas.py)
+        from .visitas import registrar_visita
+        registrar_visita(self.pk)
     
     def tasa_aceptacion(self):
         """Calcula el porcentaje de contactos aceptados"""
@@ -212,6 +233,8 @@ class ProductoServicio(models.Model):
     )
     
     proveedor = models.ForeignKey('Proveedor', on_delete=models.CASCADE, related_name='productos_servicios')
+    # Código propio del proveedor; identifica el producto en las importaciones
+    sku = models.CharField(max_length=64, blank=True, null=True, verbose_name='SKU')
     nombre = models.CharField(max_length=200)
     descripcion = models.TextField()
     precio_referencia = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
@@ -234,6 +257,18 @@ class ProductoServicio(models.Model):
         db_table = 'producto_servicio'
         verbose_name = 'Producto/Servicio'
         verbose_name_plural = 'Productos/Servicios'
+        indexes = [
+            # Catálogo público ordenado por precio (ver catalogo.py), con y sin categoría
+            models.Index(fields=['activo', 'categoria', 'precio_referencia', 'id'], name='producto_catalogo_cat_idx'),
+            models.Index(fields=['activo', 'precio_referencia', 'id'], name='producto_catalogo_precio_idx'),
+            # Lista del panel (más recientes primero), sin filtro, por estado o por categoría
+            models.Index(fields=['proveedor', 'id'], name='producto_panel_idx'),
+            models.Index(fields=['proveedor', 'activo', 'id'], name='producto_panel_estado_idx'),
+            models.Index(fields=['proveedor', 'categoria', 'id'], name='producto_panel_cat_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['proveedor', 'sku'], name='producto_sku_unico'),
+        ]
     
     def __str__(self):
         return f"{self.nombre} - {self.proveedor.nombre_empresa}"
@@ -260,11 +295,296 @@ class Promocion(models.Model):
         verbose_name = 'Promoción'
         verbose_name_plural = 'Promociones'
         ordering = ['-fecha_inicio']
+        indexes = [
+            # Lista del panel (fecha de inicio descendente), sin filtro o por estado
+            models.Index(fields=['proveedor', 'fecha_inicio', 'id'], name='promocion_panel_idx'),
+            models.Index(fields=['proveedor', 'activo', 'fecha_inicio', 'id'], name='promocion_panel_estado_idx'),
+        ]
     
     def __str__(self):
         return self.titulo
     
     def esta_vigente(self):
-        from django.utils import timezone
-        hoy = timezone.now().date()
-        return self.fecha_inicio <= hoy <= self.fecha_fin and self.activo
\ No newline at end of file
+        # Se consulta el conjunto de promociones vigentes del día (ver vigencia.py);
+        # los listados lo precargan para todas sus filas con vigencia.marcar().
+        if not hasattr(self, '_vigente'):
+            from .vigencia import ids_vigentes
+            self._vigente = self.pk in ids_vigentes([self.pk])
+        return self._vigente
+
+class PromocionVigente(models.Model):
+    """
+    Conjunto materializado de las promociones vigentes en un día (activas y
+    dentro de sus fechas). Lo arma proveedor/vigencia.py al empezar el día y
+    lo corrige cada vez que se guarda una promoción. fecha_inicio se copia
+    para ordenar y paginar sin ir a la tabla de promociones.
+    """
+    dia = models.DateField()
+    promocion = models.ForeignKey(Promocion, on_delete=models.CASCADE, related_name='vigencias')
+    proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE, related_name='+')
+    fecha_inicio = models.DateField()
+
+    class Meta:
+        db_table = 'promocion_vigente'
+        verbose_name = 'Promoción vigente'
+        verbose_name_plural = 'Promociones vigentes'
+        constraints = [
+            models.UniqueConstraint(fields=['dia', 'promocion'], name='promocion_vigente_unica'),
+        ]
+        indexes = [
+            # Feed público y promociones de un proveedor, más recientes primero
+            models.Index(fields=['dia', 'fecha_inicio', 'promocion'], name='promocion_vigente_feed_idx'),
+            models.Index(fields=['dia', 'proveedor', 'fecha_inicio'], name='promocion_vigente_prov_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.promocion_id} ({self.dia})"
+
+
+class TerminoBusqueda(models.Model):
+    """
+    Índice invertido del directorio: un término normalizado de un proveedor y
+    su peso según de dónde viene (nombre, rubro, producto o descripción).
+    Lo mantiene proveedor/busqueda.py.
+    """
+    proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE, related_name='terminos_busqueda')
+    termino = models.CharField(max_length=50)
+    peso = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        db_table = 'proveedor_termino_busqueda'
+        verbose_name = 'Término de búsqueda'
+        verbose_name_plural = 'Términos de búsqueda'
+        constraints = [
+            models.UniqueConstraint(fields=['termino', 'proveedor'], name='termino_busqueda_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.termino} ({self.peso})"
+
+
+class TerminoProducto(models.Model):
+    """
+    Índice de la búsqueda del panel: un término normalizado del nombre o la
+    descripción de un producto, con el proveedor para buscar solo en su
+    catálogo. Lo mantiene proveedor/listados.py.
+    """
+    proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE, related_name='+')
+    producto = models.ForeignKey(ProductoServicio, on_delete=models.CASCADE, related_name='terminos')
+    termino = models.CharField(max_length=50)
+
+    class Meta:
+        db_table = 'proveedor_termino_producto'
+        verbose_name = 'Término de producto'
+        verbose_name_plural = 'Términos de productos'
+        constraints = [
+            models.UniqueConstraint(fields=['proveedor', 'termino', 'producto'], name='termino_producto_unico'),
+        ]
+
+    def __str__(self):
+        return self.termino
+
+
+class TerminoPromocion(models.Model):
+    """Como TerminoProducto, para el título y la descripción de las promociones."""
+    proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE, related_name='+')
+    promocion = models.ForeignKey(Promocion, on_delete=models.CASCADE, related_name='terminos')
+    termino = models.CharField(max_length=50)
+
+    class Meta:
+        db_table = 'proveedor_termino_promocion'
+        verbose_name = 'Término de promoción'
+        verbose_name_plural = 'Términos de promociones'
+        constraints = [
+            models.UniqueConstraint(fields=['proveedor', 'termino', 'promocion'], name='termino_promocion_unico'),
+        ]
+
+    def __str__(self):
+        return self.termino
+
+
+class VisitaDiaria(models.Model):
+    """
+    Visitas al perfil público de un proveedor en un día. Se escribe por
+    lotes desde el búfer de proveedor/visitas.py.
+    """
+    proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE, related_name='visitas_diarias')
+    fecha = models.DateField()
+    visitas = models.PositiveIntegerField(default=0)
+    vistas_productos = models.PositiveIntegerField(default=0)
+    vistas_promociones = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'proveedor_visita_diaria'
+        verbose_name = 'Visitas del día'
+        verbose_name_plural = 'Visitas diarias'
+        constraints = [
+            models.UniqueConstraint(fields=['proveedor', 'fecha'], name='visita_diaria_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.proveedor_id} {self.fecha}: {self.visitas}"
+
+
+class EstadisticaDiaria(models.Model):
+    """
+    Resumen diario por proveedor para los gráficos del panel. Lo arma el
+    comando consolidar_estadisticas a partir de VisitaDiaria y de las
+    solicitudes de contacto; el panel lee solo esta tabla.
+    """
+    proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE, related_name='estadisticas_diarias')
+    fecha = models.DateField()
+    visitas = models.PositiveIntegerField(default=0)
+    contactos_enviados = models.PositiveIntegerField(default=0)
+    contactos_aceptados = models.PositiveIntegerField(default=0)
+    vistas_productos = models.PositiveIntegerField(default=0)
+    vistas_promociones = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'proveedor_estadistica_diaria'
+        verbose_name = 'Estadística diaria'
+        verbose_name_plural = 'Estadísticas diarias'
+        constraints = [
+            models.UniqueConstraint(fields=['proveedor', 'fecha'], name='estadistica_diaria_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.proveedor_id} {self.fecha}"
+
+
+class ContadoresProveedor(models.Model):
+    """
+    Totales del panel del proveedor, mantenidos con señales (ver
+    proveedor/contadores.py) para no contar en cada carga del panel.
+    promociones_vigentes vale para el día 'vigencia_al'; otro día se recalcula.
+    """
+    proveedor = models.OneToOneField(Proveedor, on_delete=models.CASCADE, primary_key=True, related_name='contadores')
+    total_productos = models.IntegerField(default=0)
+    promociones_vigentes = models.IntegerField(default=0)
+    solicitudes_pendientes = models.IntegerField(default=0)
+    vigencia_al = models.DateField()
+
+    class Meta:
+        db_table = 'proveedor_contadores'
+        verbose_name = 'Contadores del proveedor'
+        verbose_name_plural = 'Contadores de proveedores'
+
+    def __str__(self):
+        return f"Contadores de {self.proveedor_id}"
+
+
+class ZonaAtendida(models.Model):
+    """
+    Cobertura expandida: una fila por cada comuna, región y país que atiende
+    un proveedor según su 'cobertura' y su ubicación. Un proveedor regional
+    tiene una fila por cada comuna de su región, más la de la región; uno
+    nacional, todas las de su país. La mantiene proveedor/cobertura.py.
+    """
+    NIVEL_CHOICES = [
+        ('comuna', 'Comuna'),
+        ('region', 'Región'),
+        ('pais', 'País'),
+    ]
+    proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE, related_name='zonas_atendidas')
+    nivel = models.CharField(max_length=6, choices=NIVEL_CHOICES)
+    lugar_id = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = 'proveedor_zona_atendida'
+        verbose_name = 'Zona atendida'
+        verbose_name_plural = 'Zonas atendidas'
+        constraints = [
+            # También es el índice de "quién atiende la comuna X"
+            models.UniqueConstraint(fields=['nivel', 'lugar_id', 'proveedor'], name='zona_atendida_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.proveedor_id} → {self.nivel} {self.lugar_id}"
+
+
+class HistogramaPrecio(models.Model):
+    """
+    Un tramo del histograma de precios de una categoría del catálogo: cuántos
+    productos activos tienen precio entre 'desde' y 'hasta'. Lo recalcula el
+    comando calcular_histogramas (ver proveedor/catalogo.py).
+    """
+    categoria = models.CharField(max_length=50, choices=ProductoServicio.CATEGORIA_CHOICES)
+    tramo = models.PositiveSmallIntegerField()
+    desde = models.DecimalField(max_digits=10, decimal_places=2)
+    hasta = models.DecimalField(max_digits=10, decimal_places=2)
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'proveedor_histograma_precio'
+        verbose_name = 'Tramo de precios'
+        verbose_name_plural = 'Histograma de precios'
+        constraints = [
+            models.UniqueConstraint(fields=['categoria', 'tramo'], name='histograma_precio_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.categoria} {self.desde}-{self.hasta}: {self.total}"
+
+
+class ImportacionCatalogo(models.Model):
+    """
+    Carga masiva de productos desde un CSV (y opcionalmente un zip con las
+    imágenes). Se procesa en segundo plano con proveedor/importacion.py, que
+    va dejando aquí el avance.
+    """
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('terminada', 'Terminada'),
+        ('fallida', 'Fallida'),
+    ]
+    proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE, related_name='importaciones')
+    archivo = models.FileField(upload_to='importaciones/', verbose_name='Archivo CSV')
+    imagenes = models.FileField(upload_to='importaciones/', blank=True, null=True, verbose_name='Imágenes (zip)')
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente')
+
+    # Avance
+    tamano = models.PositiveBigIntegerField(default=0)
+    bytes_leidos = models.PositiveBigIntegerField(default=0)
+    filas_procesadas = models.PositiveIntegerField(default=0)
+    creados = models.PositiveIntegerField(default=0)
+    actualizados = models.PositiveIntegerField(default=0)
+    invalidos = models.PositiveIntegerField(default=0)
+    errores = models.TextField(blank=True, default='')
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(blank=True, null=True)
+    fecha_fin = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'proveedor_importacion_catalogo'
+        verbose_name = 'Importación de catálogo'
+        verbose_name_plural = 'Importaciones de catálogo'
+        ordering = ['-fecha_creacion']
+
+    def __str__(self):
+        return f"Importación {self.pk} de {self.proveedor_id} ({self.estado})"
+
+    def porcentaje(self):
+        """Avance aproximado según los bytes del CSV ya leídos"""
+        if self.estado == 'terminada':
+            return 100
+        return min(99, self.bytes_leidos * 100 // self.tamano) if self.tamano else 0
+
+
+class VersionDatos(models.Model):
+    """
+    Número de versión de un conjunto de datos que los procesos guardan en
+    memoria o en caché (ver proveedor/versiones.py).
+    Vive en la base de datos para que todos los procesos vean el mismo valor.
+    """
+    clave = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        db_table = 'proveedor_version_datos'
+        verbose_name = 'Versión de datos'
+        verbose_name_plural = 'Versiones de datos'
+
+    def __str__(self):
+        return f"{self.clave} v{self.version}"
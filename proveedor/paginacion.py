@@ -0,0 +1,136 @@
+# proveedor/paginacion.py
+
+"""
+Paginación por cursor (keyset) para listados largos.
+
+En lugar de COUNT(*) + OFFSET, cada página se pide "después de" (o "antes de")
+la última fila vista, con un WHERE sobre las mismas columnas del ORDER BY. Con
+un índice que siga ese orden, la página 500 cuesta lo mismo que la primera.
+El cursor es la tupla de valores de esas columnas, codificada en base64 para
+viajar en la URL.
+"""
+
+import base64
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+POR_PAGINA = 12
+
+
+class Pagina:
+    """Una página de resultados y los cursores para moverse desde ella."""
+
+    def __init__(self, objetos, cursor_siguiente=None, cursor_anterior=None):
+        self.object_list = objetos
+        self.cursor_siguiente = cursor_siguiente
+        self.cursor_anterior = cursor_anterior
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def _a_json(valor):
+    # isoformat() completo: DjangoJSONEncoder recorta a milisegundos y el
+    # cursor tiene que ser exacto para comparar por igualdad.
+    if isinstance(valor, (datetime.date, datetime.time)):
+        return valor.isoformat()
+    return str(valor)
+
+
+def codificar_cursor(valores):
+    datos = json.dumps(valores, default=_a_json, separators=(',', ':'))
+    return base64.urlsafe_b64encode(datos.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, queryset, campos):
+    """Valores del cursor convertidos al tipo de cada campo, o None si no es válido."""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(valores, list) or len(valores) != len(campos):
+        return None
+
+    convertidos = []
+    for campo, valor in zip(campos, valores):
+        if campo in queryset.query.annotations:
+            convertidos.append(valor)
+            continue
+        try:
+            convertidos.append(queryset.model._meta.get_field(campo).to_python(valor))
+        except (FieldDoesNotExist, ValidationError):
+            return None
+    return convertidos
+
+
+def _despues_de(orden, valores, invertir=False):
+    """Q de las filas que van después de 'valores' en 'orden' (o antes, si invertir)."""
+    condiciones = []
+    for i, campo in enumerate(orden):
+        nombre = campo.lstrip('-')
+        descendente = campo.startswith('-') != invertir
+        iguales = {o.lstrip('-'): v for o, v in zip(orden[:i], valores[:i])}
+        condiciones.append(Q(**iguales, **{f'{nombre}__{"lt" if descendente else "gt"}': valores[i]}))
+    return reduce(or_, condiciones)
+
+
+def _invertir(campo):
+    return campo[1:] if campo.startswith('-') else f'-{campo}'
+
+
+def paginar(queryset, orden, cursor=None, hacia_atras=False, por_pagina=POR_PAGINA):
+    """
+    Página de 'queryset' ordenado por 'orden' (el último campo debe ser único,
+    p. ej. 'id'). 'cursor' es el de la página a partir de la cual se avanza; con
+    hacia_atras=True se retrocede desde ella. Un cursor inválido vuelve a la
+    primera página.
+    """
+    campos = [c.lstrip('-') for c in orden]
+    valores = decodificar_cursor(cursor, queryset, campos) if cursor else None
+    if valores is None:
+        hacia_atras = False
+
+    if hacia_atras:
+        consulta = queryset.filter(_despues_de(orden, valores, invertir=True)).order_by(*map(_invertir, orden))
+    elif valores is not None:
+        consulta = queryset.filter(_despues_de(orden, valores)).order_by(*orden)
+    else:
+        consulta = queryset.order_by(*orden)
+
+    # Una fila de más indica si hay otra página en esa dirección.
+    objetos = list(consulta[:por_pagina + 1])
+    hay_mas = len(objetos) > por_pagina
+    objetos = objetos[:por_pagina]
+    if hacia_atras:
+        objetos.reverse()
+
+    if not objetos:
+        return Pagina([])
+
+    def cursor_de(objeto):
+        return codificar_cursor([getattr(objeto, c) for c in campos])
+
+    if hacia_atras:
+        siguiente, anterior = cursor_de(objetos[-1]), (cursor_de(objetos[0]) if hay_mas else None)
+    else:
+        siguiente = cursor_de(objetos[-1]) if hay_mas else None
+        anterior = cursor_de(objetos[0]) if valores is not None else None
+    return Pagina(objetos, cursor_siguiente=siguiente, cursor_anterior=anterior)
@@ -0,0 +1,92 @@
+# proveedor/referencias.py
+
+"""
+Datos de referencia en memoria: países, regiones, comunas y rubros.
+
+Casi nunca cambian, así que cada proceso los carga una vez (cuatro consultas)
+en estructuras inmutables y los reutiliza en formularios, filtros y el AJAX de
+comunas. La versión es compartida (proveedor/versiones.py): al editar
+cualquiera de estos modelos (signals) sube la versión y cada proceso recarga
+en su próximo uso. Se vuelve a leer como mucho cada SEGUNDOS_VERSION segundos,
+así que con los datos cargados una petición no consulta nada. La versión
+también sirve de ETag para las respuestas que dependen de estos datos.
+"""
+
+from collections import namedtuple
+from types import MappingProxyType
+
+from . import versiones
+
+CLAVE_VERSION = 'referencias'
+
+PaisRef = namedtuple('PaisRef', 'id nombre codigo regiones')
+RegionRef = namedtuple('RegionRef', 'id nombre pais_id comunas')
+ComunaRef = namedtuple('ComunaRef', 'id nombre region_id latitud longitud')
+CategoriaRef = namedtuple('CategoriaRef', 'id nombre icono activo')
+Referencias = namedtuple('Referencias', 'version paises regiones comunas categorias')
+
+_datos = None
+
+
+def version():
+    return versiones.version(CLAVE_VERSION)
+
+
+def invalidar_referencias():
+    versiones.invalidar(CLAVE_VERSION)
+
+
+def _cargar(numero_version):
+    from .models import Pais, Region, Comuna, CategoriaProveedor
+
+    comunas_por_region = {}
+    comunas = {}
+    for fila in Comuna.objects.order_by('nombre').values_list('pk', 'nombre', 'region_id', 'latitud', 'longitud'):
+        comuna = ComunaRef(*fila)
+        comunas[comuna.id] = comuna
+        comunas_por_region.setdefault(comuna.region_id, []).append(comuna)
+
+    regiones_por_pais = {}
+    regiones = {}
+    for pk, nombre, pais_id in Region.objects.order_by('nombre').values_list('pk', 'nombre', 'pais_id'):
+        region = RegionRef(pk, nombre, pais_id, tuple(comunas_por_region.get(pk, ())))
+        regiones[pk] = region
+        regiones_por_pais.setdefault(pais_id, []).append(region)
+
+    paises = tuple(
+        PaisRef(pk, nombre, codigo, tuple(regiones_por_pais.get(pk, ())))
+        for pk, nombre, codigo in Pais.objects.order_by('nombre').values_list('pk', 'nombre', 'codigo')
+    )
+    categorias = tuple(
+        CategoriaRef(*fila)
+        for fila in CategoriaProveedor.objects.order_by('nombre').values_list('pk', 'nombre', 'icono', 'activo')
+    )
+    return Referencias(
+        numero_version, paises, MappingProxyType(regiones), MappingProxyType(comunas), categorias,
+    )
+
+
+def obtener_referencias():
+    """Árbol país → región → comuna y rubros, recargado solo si cambió la versión."""
+    global _datos
+    numero_version = version()
+    datos = _datos
+    if datos is None or datos.version != numero_version:
+        datos = _datos = _cargar(numero_version)
+    return datos
+
+
+def _id(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def comunas_de_region(region_id):
+    region = obtener_referencias().regiones.get(_id(region_id))
+    return region.comunas if region else ()
+
+
+def categorias_activas():
+    return tuple(c for c in obtener_referencias().categorias if c.activo)
@@ -0,0 +1,214 @@
+# proveedor/signals.py
+
+from django.db.models.signals import post_save, pre_save, post_delete, pre_delete, m2m_changed
+from django.db import transaction
+from django.dispatch import receiver
+
+from .models import Proveedor, ProductoServicio, CategoriaProveedor, Promocion, SolicitudContacto, Pais, Region, Comuna
+from .busqueda import programar_indexacion
+from .directorio import invalidar_facetas
+from . import contadores
+from .cercania import fijar_ubicacion, propagar_ubicacion_comuna
+from .referencias import invalidar_referencias
+from . import cobertura
+from .listados import indexar_productos, indexar_promociones
+from . import vigencia
+
+
+# --- ÍNDICE DE BÚSQUEDA DEL DIRECTORIO ---
+
+@receiver(post_save, sender=Proveedor)
+def indexar_proveedor(sender, instance, **kwargs):
+    programar_indexacion([instance.pk])
+
+
+@receiver(m2m_changed, sender=Proveedor.categorias.through)
+def indexar_categorias_proveedor(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            programar_indexacion([instance.pk])
+    # Cambio hecho desde la categoría (categoria.proveedores.add/remove/clear).
+    elif action in ('post_add', 'post_remove'):
+        programar_indexacion(pk_set)
+    elif action == 'pre_clear':
+        programar_indexacion(instance.proveedores.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=ProductoServicio)
+@receiver(post_delete, sender=ProductoServicio)
+def indexar_productos_proveedor(sender, instance, **kwargs):
+    programar_indexacion([instance.proveedor_id])
+
+
+@receiver(post_save, sender=CategoriaProveedor)
+@receiver(pre_delete, sender=CategoriaProveedor)
+def indexar_proveedores_categoria(sender, instance, **kwargs):
+    # En pre_delete todavía existen las filas de la relación; el reindexado corre al confirmar.
+    if not kwargs.get('created'):
+        programar_indexacion(instance.proveedores.values_list('pk', flat=True))
+
+
+# --- CONTEOS POR FACETA DEL DIRECTORIO ---
+
+@receiver(post_save, sender=Proveedor)
+@receiver(post_delete, sender=Proveedor)
+@receiver(post_save, sender=CategoriaProveedor)
+@receiver(post_delete, sender=CategoriaProveedor)
+@receiver(m2m_changed, sender=Proveedor.categorias.through)
+def invalidar_facetas_directorio(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'):
+        transaction.on_commit(invalidar_facetas)
+
+
+# --- CONTADORES DEL PANEL ---
+
+@receiver(post_save, sender=ProductoServicio)
+def contar_producto_creado(sender, instance, created, **kwargs):
+    if created:
+        contadores.sumar(instance.proveedor_id, 'total_productos', 1)
+
+
+@receiver(post_delete, sender=ProductoServicio)
+def descontar_producto_borrado(sender, instance, **kwargs):
+    contadores.sumar(instance.proveedor_id, 'total_productos', -1)
+
+
+@receiver(pre_save, sender=Promocion)
+def guardar_vigencia_anterior(sender, instance, **kwargs):
+    anterior = Promocion.objects.filter(pk=instance.pk).first() if instance.pk else None
+    instance._vigente_anterior = bool(anterior and vigencia.promocion_vigente(anterior))
+
+
+@receiver(post_save, sender=Promocion)
+def contar_promocion(sender, instance, **kwargs):
+    diferencia = vigencia.promocion_vigente(instance) - instance._vigente_anterior
+    contadores.sumar(instance.proveedor_id, 'promociones_vigentes', diferencia)
+
+
+@receiver(post_delete, sender=Promocion)
+def descontar_promocion_borrada(sender, instance, **kwargs):
+    if vigencia.promocion_vigente(instance):
+        contadores.sumar(instance.proveedor_id, 'promociones_vigentes', -1)
+
+
+@receiver(pre_save, sender=SolicitudContacto)
+def guardar_estado_anterior(sender, instance, **kwargs):
+    instance._estado_anterior = (
+        SolicitudContacto.objects.filter(pk=instance.pk).values_list('estado', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=SolicitudContacto)
+def contar_solicitud(sender, instance, **kwargs):
+    diferencia = (instance.estado == 'pendiente') - (instance._estado_anterior == 'pendiente')
+    contadores.sumar(instance.proveedor_id, 'solicitudes_pendientes', diferencia)
+
+
+@receiver(post_delete, sender=SolicitudContacto)
+def descontar_solicitud_borrada(sender, instance, **kwargs):
+    if instance.estado == 'pendiente':
+        contadores.sumar(instance.proveedor_id, 'solicitudes_pendientes', -1)
+
+
+# --- UBICACIÓN PARA LA BÚSQUEDA POR CERCANÍA ---
+
+@receiver(pre_save, sender=Proveedor)
+def actualizar_ubicacion_proveedor(sender, instance, **kwargs):
+    fijar_ubicacion(instance)
+
+
+@receiver(post_save, sender=Comuna)
+def propagar_coordenadas_comuna(sender, instance, created, **kwargs):
+    if not created:
+        propagar_ubicacion_comuna(instance.pk, instance.latitud, instance.longitud)
+
+
+# --- DATOS DE REFERENCIA EN MEMORIA ---
+
+@receiver(post_save, sender=Pais)
+@receiver(post_delete, sender=Pais)
+@receiver(post_save, sender=Region)
+@receiver(post_delete, sender=Region)
+@receiver(post_save, sender=Comuna)
+@receiver(post_delete, sender=Comuna)
+@receiver(post_save, sender=CategoriaProveedor)
+@receiver(post_delete, sender=CategoriaProveedor)
+def invalidar_datos_referencia(sender, **kwargs):
+    transaction.on_commit(invalidar_referencias)
+
+
+# --- COBERTURA EXPANDIDA (ZonaAtendida) ---
+# Va después de la invalidación de referencias: sus on_commit corren en orden
+# y la reconstrucción tiene que leer la geografía ya recargada.
+
+@receiver(pre_save, sender=Proveedor)
+def guardar_zona_anterior(sender, instance, **kwargs):
+    instance._zona_anterior = (
+        Proveedor.objects.filter(pk=instance.pk).values_list(*cobertura.CAMPOS_ZONA).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Proveedor)
+def actualizar_cobertura_proveedor(sender, instance, **kwargs):
+    zona = tuple(getattr(instance, campo) for campo in cobertura.CAMPOS_ZONA)
+    if zona != instance._zona_anterior:
+        cobertura.reconstruir_cobertura([instance.pk])
+
+
+PADRES_GEOGRAFIA = {Region: 'pais_id', Comuna: 'region_id'}
+
+
+@receiver(pre_save, sender=Region)
+@receiver(pre_save, sender=Comuna)
+def guardar_padre_anterior(sender, instance, **kwargs):
+    campo = PADRES_GEOGRAFIA[sender]
+    instance._padre_anterior = (
+        sender.objects.filter(pk=instance.pk).values_list(campo, flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Pais)
+@receiver(post_save, sender=Region)
+@receiver(post_save, sender=Comuna)
+def actualizar_cobertura_geografia(sender, instance, created, **kwargs):
+    # Un lugar nuevo o que cambió de región/país cambia lo que atienden los de cobertura amplia
+    campo = PADRES_GEOGRAFIA.get(sender)
+    if created or (campo and getattr(instance, campo) != instance._padre_anterior):
+        transaction.on_commit(cobertura.reconstruir_amplios)
+        transaction.on_commit(invalidar_facetas)
+
+
+@receiver(post_delete, sender=Pais)
+@receiver(post_delete, sender=Region)
+@receiver(post_delete, sender=Comuna)
+def quitar_lugar_cobertura(sender, instance, **kwargs):
+    cobertura.quitar_lugar(sender._meta.model_name, instance.pk)
+
+
+# --- BÚSQUEDA EN LAS LISTAS DEL PANEL ---
+# Los términos se borran en cascada con el producto o la promoción.
+
+def _cambio_texto(update_fields, campos):
+    return update_fields is None or not campos.isdisjoint(update_fields)
+
+
+@receiver(post_save, sender=ProductoServicio)
+def indexar_producto_panel(sender, instance, update_fields=None, **kwargs):
+    if _cambio_texto(update_fields, {'nombre', 'descripcion'}):
+        indexar_productos([instance])
+
+
+@receiver(post_save, sender=Promocion)
+def indexar_promocion_panel(sender, instance, update_fields=None, **kwargs):
+    if _cambio_texto(update_fields, {'titulo', 'descripcion'}):
+        indexar_promociones([instance])
+
+
+# --- PROMOCIONES VIGENTES DEL DÍA ---
+# Al borrar una promoción su fila de PromocionVigente se va en cascada.
+
+@receiver(post_save, sender=Promocion)
+def actualizar_promociones_vigentes(sender, instance, **kwargs):
+    vigencia.actualizar(instance)
@@ -18,6 +18,12 @@ urlpatterns = [
     # Detalle público de un proveedor
     path('<int:proveedor_id>/', views.detalle_proveedor, name='detalle_proveedor'),
     
+    # Promociones vigentes hoy de todos los proveedores
+    path('promociones/', views.promociones_vigentes, name='promociones_vigentes'),
+    
+    # Catálogo público de productos de todos los proveedores
+    path('catalogo/', views.catalogo_productos, name='catalogo_productos'),
+    
     
     # ==================== PANEL DEL PROVEEDOR ====================
     
@@ -39,6 +45,16 @@ urlpatterns = [
     # Crear nuevo producto/servicio
     path('panel/productos/crear/', views.crear_producto, name='crear_producto'),
     
+    # Importación masiva desde CSV
+    path('panel/productos/importar/', views.importar_productos, name='importar_productos'),
+    path('panel/productos/importar/<int:importacion_id>/estado/', views.estado_importacion, name='estado_importacion'),
+    
+    # Acciones masivas sobre los productos marcados
+    path('panel/productos/acciones/', views.acciones_productos, name='acciones_productos'),
+    
+    # Exportación del catálogo (productos o promociones)
+    path('panel/exportar/', views.exportar_catalogo, name='exportar_catalogo'),
+    
     # Editar producto/servicio
     path('panel/productos/<int:producto_id>/editar/', views.editar_producto, name='editar_producto'),
     
@@ -0,0 +1,43 @@
+# proveedor/versiones.py
+
+"""
+Versiones compartidas de los datos que los procesos guardan en memoria o en
+caché (referencias, facetas del directorio, catálogo de beneficios).
+
+La versión vive en la base de datos (VersionDatos), así que un cambio hecho en
+cualquier proceso, incluidos los comandos de gestión, llega a todos. Para no
+leer la fila en cada uso, cada proceso recuerda la última versión leída por
+SEGUNDOS_VERSION segundos: un cambio tarda a lo sumo eso en verse en los demás
+procesos, y en el que lo hizo se ve de inmediato.
+"""
+
+import time
+
+from django.db.models import F
+
+SEGUNDOS_VERSION = 5
+
+# clave: (versión, momento de la lectura)
+_leidas = {}
+
+
+def version(clave):
+    leida = _leidas.get(clave)
+    ahora = time.monotonic()
+    if leida is not None and ahora - leida[1] < SEGUNDOS_VERSION:
+        return leida[0]
+
+    from .models import VersionDatos
+
+    numero = VersionDatos.objects.filter(clave=clave).values_list('version', flat=True).first() or 1
+    _leidas[clave] = (numero, ahora)
+    return numero
+
+
+def invalidar(clave):
+    from .models import VersionDatos
+
+    # UPDATE atómico; la primera vez se crea la fila ya en la versión 2
+    if not VersionDatos.objects.filter(clave=clave).update(version=F('version') + 1):
+        VersionDatos.objects.get_or_create(clave=clave, defaults={'version': 2})
+    _leidas.pop(clave, None)
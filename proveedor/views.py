@@ -1,9 +1,11 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
-from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.db.models import Case, Value, When
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag, require_POST
 from django.utils import timezone
 from .models import (
     Proveedor, 
@@ -13,15 +15,31 @@ from .models import (
     CategoriaProveedor,
     Pais,   
     Region,
-    Comuna
+    Comuna,
+    ImportacionCatalogo
 )
 from .forms import (
     ProveedorForm, 
     ProductoServicioForm, 
     PromocionForm,
     SolicitudContactoForm,
-    ConfiguracionForm
+    ConfiguracionForm,
+    ImportacionCatalogoForm
 )
+from .busqueda import buscar_proveedores
+from .directorio import filtros_de_request, aplicar_filtros, contar_facetas, total_proveedores
+from .paginacion import paginar, Pagina
+from .cercania import cercanos, punto_de_request
+from . import catalogo
+from .importacion import iniciar_en_segundo_plano, reclamar_colgadas
+from .listados import filtrar_productos, filtrar_promociones, ORDEN_PRODUCTOS, ORDEN_PROMOCIONES
+from . import exportacion
+from . import acciones
+from . import vigencia
+from .visitas import registrar_visita
+from .estadisticas import serie, RANGO_POR_DEFECTO
+from .contadores import obtener_contadores
+from .referencias import comunas_de_region, obtener_referencias, version as version_referencias
 
 
 
@@ -42,51 +60,138 @@ def directorio_proveedores(request):
     comuna_id = request.GET.get('comuna')
     cobertura = request.GET.get('cobertura')
     busqueda = request.GET.get('q')
+    orden_seleccionado = request.GET.get('orden')
     
-    if categoria_id:
-        proveedores = proveedores.filter(categorias__id=categoria_id)
+    filtros = filtros_de_request(request.GET)
+    filtros_sin_texto = {k: v for k, v in filtros.items() if k != 'q'}
+    proveedores = aplicar_filtros(proveedores, filtros_sin_texto)
     
-    if region_id:
-        proveedores = proveedores.filter(region_id=region_id)
+    if busqueda:
+        # Índice de términos (ver busqueda.py); ordena por relevancia
+        proveedores = buscar_proveedores(proveedores, busqueda)
     
-    if comuna_id:
-        proveedores = proveedores.filter(comuna_id=comuna_id)
+    # Ordenar: destacados primero, luego por fecha (el id desempata para el cursor)
+    if busqueda:
+        orden = ['-relevancia', '-destacado', '-fecha_registro', '-id']
+    else:
+        orden = ['-destacado', '-fecha_registro', '-id']
     
-    if cobertura:
-        proveedores = proveedores.filter(cobertura=cobertura)
+    # "Cerca de mí": los 12 más cercanos, sin paginar (ver cercania.py)
+    punto = punto_de_request(request) if orden_seleccionado == 'cercania' else None
+    if orden_seleccionado == 'cercania' and punto is None:
+        messages.info(request, 'Permite el acceso a tu ubicación o inicia sesión para ver los proveedores más cercanos.')
     
-    if busqueda:
-        proveedores = proveedores.filter(
-            Q(nombre_empresa__icontains=busqueda) |
-            Q(descripcion__icontains=busqueda)
+    if punto:
+        page_obj = Pagina(cercanos(proveedores, *punto))
+    else:
+        # Paginación por cursor: sin COUNT(*) ni OFFSET, toda página cuesta lo mismo
+        page_obj = paginar(
+            proveedores,
+            orden,
+            cursor=request.GET.get('cursor'),
+            hacia_atras=request.GET.get('dir') == 'anterior',
+            por_pagina=12,
         )
     
-    # Ordenar: destacados primero, luego por fecha
-    proveedores = proveedores.order_by('-destacado', '-fecha_registro')
-    
-    # Paginación
-    paginator = Paginator(proveedores, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Datos para filtros: solo opciones con resultados, con su conteo (en caché)
+    facetas = contar_facetas(filtros)
+    total = total_proveedores(filtros, facetas)
     
-    # Datos para filtros
-    categorias = CategoriaProveedor.objects.filter(activo=True)
-    regiones = Region.objects.all()
+    # Parámetros actuales sin el cursor, para los enlaces de paginación
+    parametros = request.GET.copy()
+    for clave in ('cursor', 'dir', 'page'):
+        parametros.pop(clave, None)
     
     context = {
         'page_obj': page_obj,
-        'categorias': categorias,
-        'regiones': regiones,
+        'total': total,
+        'parametros': parametros.urlencode(),
+        'categorias': facetas['categoria'],
+        'regiones': facetas['region'],
+        'comunas': facetas['comuna'],
+        'coberturas': facetas['cobertura'],
+        'zonas_atencion': obtener_referencias().regiones.values(),
         'categoria_seleccionada': categoria_id,
         'region_seleccionada': region_id,
         'comuna_seleccionada': comuna_id,
         'cobertura_seleccionada': cobertura,
+        'atiende_seleccionada': request.GET.get('atiende'),
+        'orden_seleccionado': orden_seleccionado,
         'busqueda': busqueda,
     }
     
     return render(request, 'proveedores/directorio.html', context)
 
 
+def promociones_vigentes(request):
+    """
+    Feed público de las promociones vigentes hoy de todos los proveedores
+    """
+    # Paginación por cursor sobre el conjunto del día, índice (dia, fecha_inicio, promocion)
+    page_obj = paginar(
+        vigencia.feed(),
+        vigencia.ORDEN_FEED,
+        cursor=request.GET.get('cursor'),
+        hacia_atras=request.GET.get('dir') == 'anterior',
+        por_pagina=vigencia.POR_PAGINA,
+    )
+    
+    context = {
+        'page_obj': page_obj,
+        'hoy': timezone.localdate(),
+    }
+    
+    return render(request, 'proveedores/promociones_vigentes.html', context)
+
+
+def catalogo_productos(request):
+    """
+    Catálogo público de productos de todos los proveedores, por precio
+    """
+    filtros = catalogo.filtros_de_request(request.GET)
+    orden = request.GET.get('orden')
+    if orden not in catalogo.ORDENES:
+        orden = catalogo.ORDEN_POR_DEFECTO
+    
+    # Paginación por cursor sobre los índices (activo, categoria, precio_referencia, id)
+    page_obj = paginar(
+        catalogo.productos_catalogo(filtros),
+        catalogo.ORDENES[orden],
+        cursor=request.GET.get('cursor'),
+        hacia_atras=request.GET.get('dir') == 'anterior',
+        por_pagina=catalogo.POR_PAGINA,
+    )
+    
+    # Totales por categoría e histograma de precios: precalculados
+    histogramas = catalogo.histogramas()
+    
+    parametros = request.GET.copy()
+    for clave in ('cursor', 'dir'):
+        parametros.pop(clave, None)
+    # Los tramos del histograma reemplazan el rango de precios actual
+    parametros_tramo = parametros.copy()
+    for clave in ('precio_min', 'precio_max'):
+        parametros_tramo.pop(clave, None)
+    
+    context = {
+        'page_obj': page_obj,
+        'filtros': filtros,
+        'orden': orden,
+        'parametros': parametros.urlencode(),
+        'parametros_tramo': parametros_tramo.urlencode(),
+        'categorias': [
+            {'id': codigo, 'nombre': nombre, 'total': histogramas.get(codigo, {}).get('total', 0)}
+            for codigo, nombre in ProductoServicio.CATEGORIA_CHOICES
+        ],
+        'histograma': histogramas.get(filtros.get('categoria')),
+        'regiones': obtener_referencias().regiones.values(),
+        'precio_min': request.GET.get('precio_min', ''),
+        'precio_max': request.GET.get('precio_max', ''),
+    }
+    
+    return render(request, 'proveedores/catalogo.html', context)
+
+
 def detalle_proveedor(request, proveedor_id):
     """
     Vista del perfil público del proveedor
@@ -97,23 +202,17 @@ def detalle_proveedor(request, proveedor_id):
         activo=True
     )
     
-    # Incrementar visitas
-    proveedor.incrementar_visitas()
-    
     # Productos y servicios del proveedor
-    productos = ProductoServicio.objects.filter(
+    productos = list(ProductoServicio.objects.filter(
         proveedor=proveedor, 
         activo=True
-    ).order_by('-destacado', '-fecha_creacion')
+    ).order_by('-destacado', '-fecha_creacion'))
+    
+    # Promociones vigentes: del conjunto materializado del día (ver vigencia.py)
+    promociones = list(vigencia.promociones_de(proveedor).order_by('-fecha_inicio'))
     
-    # Promociones vigentes
-    hoy = timezone.now().date()
-    promociones = Promocion.objects.filter(
-        proveedor=proveedor,
-        activo=True,
-        fecha_inicio__lte=hoy,
-        fecha_fin__gte=hoy
-    ).order_by('-fecha_inicio')
+    # Contar la visita y lo que se mostró (en memoria; se escribe por lotes, ver visitas.py)
+    registrar_visita(proveedor.pk, productos=len(productos), promociones=len(promociones))
     
     context = {
         'proveedor': proveedor,
@@ -151,29 +250,21 @@ def perfil_proveedor(request):
     # LÓGICA DE ESTADÍSTICAS (Solo si el perfil existe)
     # ----------------------------------------------------
     
-    # Total de productos y servicios
-    total_productos = ProductoServicio.objects.filter(proveedor=proveedor).count()
+    # Totales del panel: una sola fila mantenida por señales (ver contadores.py)
+    contadores = obtener_contadores(proveedor)
     
-    # Promociones activas (usando el proveedor encontrado)
-    hoy = timezone.now().date()
-    promociones_activas = Promocion.objects.filter(
-        proveedor=proveedor,
-        activo=True,
-        fecha_inicio__lte=hoy,
-        fecha_fin__gte=hoy
-    ).count()
-    
-    # Solicitudes de contacto pendientes
-    solicitudes_pendientes = SolicitudContacto.objects.filter(
-        proveedor=proveedor,
-        estado='pendiente'
-    ).count()
+    # Gráficos de 7/30/90 días desde el resumen diario (a lo sumo 90 filas)
+    estadisticas = None
+    if proveedor.mostrar_estadisticas:
+        rango = request.GET.get('rango', '')
+        estadisticas = serie(proveedor, int(rango) if rango.isdigit() else RANGO_POR_DEFECTO)
     
     context = {
         'proveedor': proveedor,
-        'total_productos': total_productos,
-        'promociones_activas': promociones_activas,
-        'solicitudes_pendientes': solicitudes_pendientes,
+        'total_productos': contadores.total_productos,
+        'promociones_activas': contadores.promociones_vigentes,
+        'solicitudes_pendientes': contadores.solicitudes_pendientes,
+        'estadisticas': estadisticas,
     }
     
     return render(request, 'proveedores/perfil.html', context)
@@ -245,48 +336,41 @@ def lista_productos(request):
         messages.error(request, 'Debes crear primero un perfil de proveedor.')
         return redirect('proveedores:crear_perfil_proveedor')
     
-    # 1. INICIAR LA CONSULTA BASE: Obtener TODOS los productos del proveedor
-    # ESTO ES CRUCIAL: No aplicar ningún filtro de 'activo' aquí.
-    productos = ProductoServicio.objects.filter(proveedor=proveedor)
-    
     # Obtener CHOICES para el template (solo para referencia, no afecta la consulta)
     categoria_choices = ProductoServicio.CATEGORIA_CHOICES 
     
-    # 2. ✅ FILTRO POR CATEGORÍA
-    # El valor del GET puede ser 'comida', 'bebida', o vacío si seleccionó "Todas las categorías"
+    # 1. ✅ FILTROS sobre TODOS los productos del proveedor (categoría, estado y
+    # búsqueda por índice de términos; los mismos de la exportación)
+    productos = filtrar_productos(proveedor, request.GET)
     categoria_actual = request.GET.get('categoria', '')
-    if categoria_actual:
-        productos = productos.filter(categoria=categoria_actual)
-    
-    # 3. ✅ FILTRO POR ESTADO (activo/inactivo)
-    # El valor del GET debe ser 'activo', 'inactivo', o 'todos' (si es tu opción por defecto)
-    estado_actual = request.GET.get('estado', '') # 'todos' o vacío si no se selecciona
-    if estado_actual == 'activo':
-        productos = productos.filter(activo=True)
-    elif estado_actual == 'inactivo':
-        productos = productos.filter(activo=False)
-    # Si estado_actual es 'todos' o está vacío, no se aplica ningún filtro de activo/inactivo, mostrando ambos.
-    
-    # 4. ✅ FILTRO POR BÚSQUEDA
+    estado_actual = request.GET.get('estado', '')
     buscar_actual = request.GET.get('buscar', '')
-    if buscar_actual:
-        from django.db.models import Q
-        productos = productos.filter(
-            Q(nombre__icontains=buscar_actual) | 
-            Q(descripcion__icontains=buscar_actual)
-        )
     
-    # 5. Ordenar por más reciente
-    productos = productos.order_by('-id')
+    # 2. Más recientes primero, paginado por cursor sobre (proveedor, [filtro,] id)
+    page_obj = paginar(
+        productos,
+        ORDEN_PRODUCTOS,
+        cursor=request.GET.get('cursor'),
+        hacia_atras=request.GET.get('dir') == 'anterior',
+        por_pagina=24,
+    )
+    
+    # Parámetros actuales sin el cursor, para los enlaces de paginación
+    parametros = request.GET.copy()
+    for clave in ('cursor', 'dir'):
+        parametros.pop(clave, None)
     
-    # 6. Preparar el contexto
+    # 3. Preparar el contexto
     context = {
         'proveedor': proveedor,
-        'productos': productos,
+        'productos': page_obj,
+        'page_obj': page_obj,
+        'parametros': parametros.urlencode(),
         'categoria_actual': categoria_actual, # Usar el nombre limpio
         'estado_actual': estado_actual, # Usar el nombre limpio
         'buscar_actual': buscar_actual, # Usar el nombre limpio
         'opciones_categoria': categoria_choices, # Renombrado para coincidir con la sugerencia anterior
+        'acciones_masivas': acciones.ACCIONES.items(),
     }
     
     return render(request, 'proveedores/productos/lista.html', context)
@@ -304,7 +388,7 @@ def crear_producto(request):
     proveedor = request.user.proveedor
     
     if request.method == 'POST':
-        form = ProductoServicioForm(request.POST, request.FILES)
+        form = ProductoServicioForm(request.POST, request.FILES, proveedor=proveedor)
         if form.is_valid():
             producto = form.save(commit=False)
             producto.proveedor = proveedor
@@ -312,7 +396,7 @@ def crear_producto(request):
             messages.success(request, '✅ Producto/servicio creado exitosamente.')
             return redirect('proveedores:lista_productos')
     else:
-        form = ProductoServicioForm()
+        form = ProductoServicioForm(proveedor=proveedor)
     
     context = {
         'form': form,
@@ -320,6 +404,101 @@ def crear_producto(request):
     }
     return render(request, 'proveedores/productos/crear.html', context)
 
+@login_required
+def importar_productos(request):
+    """
+    Importación masiva de productos desde un CSV (se procesa en segundo plano)
+    """
+    try:
+        proveedor = request.user.proveedor
+    except Proveedor.DoesNotExist:
+        messages.error(request, 'Debes crear primero un perfil de proveedor.')
+        return redirect('proveedores:crear_perfil_proveedor')
+    
+    # Una importación a la vez por proveedor: los SKU se cruzan por lote.
+    # Las que quedaron colgadas (el proceso murió) no bloquean para siempre.
+    reclamar_colgadas(proveedor=proveedor)
+    en_curso = proveedor.importaciones.filter(estado__in=('pendiente', 'procesando')).exists()
+    
+    if request.method == 'POST':
+        form = ImportacionCatalogoForm(request.POST, request.FILES)
+        if en_curso:
+            messages.error(request, 'Ya tienes una importación en curso. Espera a que termine.')
+        elif form.is_valid():
+            importacion = form.save(commit=False)
+            importacion.proveedor = proveedor
+            importacion.tamano = form.cleaned_data['archivo'].size
+            importacion.save()
+            iniciar_en_segundo_plano(importacion)
+            messages.success(request, '📥 Importación iniciada. Puedes seguir su avance aquí.')
+            return redirect('proveedores:importar_productos')
+    else:
+        form = ImportacionCatalogoForm()
+    
+    context = {
+        'form': form,
+        'proveedor': proveedor,
+        'en_curso': en_curso,
+        'importaciones': proveedor.importaciones.all()[:10],
+    }
+    return render(request, 'proveedores/productos/importar.html', context)
+
+
+@login_required
+def estado_importacion(request, importacion_id):
+    """
+    Avance de una importación (JSON, para refrescar la página sin recargarla)
+    """
+    importacion = get_object_or_404(
+        ImportacionCatalogo,
+        id=importacion_id,
+        proveedor__usuario=request.user
+    )
+    return JsonResponse({
+        'estado': importacion.estado,
+        'estado_display': importacion.get_estado_display(),
+        'porcentaje': importacion.porcentaje(),
+        'filas_procesadas': importacion.filas_procesadas,
+        'creados': importacion.creados,
+        'actualizados': importacion.actualizados,
+        'invalidos': importacion.invalidos,
+    })
+
+
+@login_required
+def exportar_catalogo(request):
+    """
+    Descarga de productos o promociones (CSV o JSON Lines, con o sin gzip)
+    con los mismos filtros de la lista del panel
+    """
+    try:
+        proveedor = request.user.proveedor
+    except Proveedor.DoesNotExist:
+        messages.error(request, 'Debes crear primero un perfil de proveedor.')
+        return redirect('proveedores:crear_perfil_proveedor')
+    
+    tipo = request.GET.get('tipo', 'productos')
+    formato = request.GET.get('formato', 'csv')
+    if tipo not in exportacion.CAMPOS or formato not in exportacion.FORMATOS:
+        messages.error(request, 'Formato de exportación no válido.')
+        return redirect('proveedores:lista_productos')
+    comprimir = request.GET.get('gzip') == '1'
+    
+    # Se genera mientras se descarga (ver exportacion.py)
+    queryset = exportacion.queryset_exportacion(proveedor, tipo, request.GET)
+    content_type, extension = exportacion.FORMATOS[formato]
+    response = StreamingHttpResponse(
+        exportacion.generar_exportacion(queryset, tipo, formato, comprimir),
+        content_type='application/gzip' if comprimir else content_type,
+    )
+    fecha = timezone.localdate().isoformat()
+    nombre = f'{tipo}_{fecha}.{extension}' + ('.gz' if comprimir else '')
+    response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+    # Que un proxy (nginx) no junte la respuesta antes de reenviarla
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def editar_producto(request, producto_id):
     proveedor = get_object_or_404(Proveedor, usuario=request.user)  # ✅
@@ -330,13 +509,13 @@ def editar_producto(request, producto_id):
     )
     
     if request.method == 'POST':
-        form = ProductoServicioForm(request.POST, request.FILES, instance=producto)
+        form = ProductoServicioForm(request.POST, request.FILES, instance=producto, proveedor=proveedor)
         if form.is_valid():
             form.save()
             messages.success(request, 'Producto/servicio actualizado exitosamente.')
             return redirect('proveedores:lista_productos')
     else:
-        form = ProductoServicioForm(instance=producto)
+        form = ProductoServicioForm(instance=producto, proveedor=proveedor)
     
     context = {'form': form, 'producto': producto}
     return render(request, 'proveedores/productos/editar.html', context)
@@ -359,6 +538,40 @@ def eliminar_producto(request, producto_id):
     context = {'producto': producto}
     return render(request, 'proveedores/productos/eliminar.html', context)
 
+
+@login_required
+@require_POST
+def acciones_productos(request):
+    """
+    Acción masiva sobre los productos marcados en la lista (o todos los filtrados)
+    """
+    try:
+        proveedor = request.user.proveedor
+    except Proveedor.DoesNotExist:
+        messages.error(request, 'Debes crear primero un perfil de proveedor.')
+        return redirect('proveedores:crear_perfil_proveedor')
+    
+    # Volver a la lista con los mismos filtros
+    volver = reverse('proveedores:lista_productos')
+    filtros = request.POST.get('filtros', '')
+    if filtros:
+        volver += '?' + filtros
+    
+    accion = request.POST.get('accion', '')
+    if request.POST.get('todos') != '1' and not request.POST.getlist('productos'):
+        messages.error(request, 'Selecciona al menos un producto.')
+        return redirect(volver)
+    
+    productos = acciones.seleccion(proveedor, request.POST)
+    try:
+        total = acciones.aplicar(proveedor, productos, accion, request.POST.get('nueva_categoria'))
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect(volver)
+    
+    messages.success(request, f'✅ {acciones.ACCIONES[accion]}: {total} producto(s).')
+    return redirect(volver)
+
 # ==================== GESTIÓN DE PROMOCIONES ====================
 
 
@@ -373,62 +586,38 @@ def lista_promociones(request):
         messages.error(request, 'Debes crear primero un perfil de proveedor.')
         return redirect('proveedores:crear_perfil_proveedor')
     
-    # Obtener TODAS las promociones del proveedor
-    promociones = Promocion.objects.filter(proveedor=proveedor)
-    
-    # ✅ FILTRO POR ESTADO
+    # ✅ FILTROS sobre TODAS las promociones del proveedor (estado, vigencia,
+    # búsqueda y fechas; los mismos de la exportación)
+    promociones = filtrar_promociones(proveedor, request.GET)
     estado = request.GET.get('estado', '')
-    if estado == 'activas':
-        promociones = promociones.filter(activo=True)
-    elif estado == 'inactivas':
-        promociones = promociones.filter(activo=False)
-    # Si estado está vacío, muestra todas
-    
-    # ✅ FILTRO POR VIGENCIA
-    vigencia = request.GET.get('vigencia', '')
-    hoy = timezone.now().date()
-    
-    if vigencia == 'vigentes':
-        promociones = promociones.filter(
-            activo=True,
-            fecha_inicio__lte=hoy,
-            fecha_fin__gte=hoy
-        )
-    elif vigencia == 'programadas':
-        promociones = promociones.filter(
-            activo=True,
-            fecha_inicio__gt=hoy
-        )
-    elif vigencia == 'vencidas':
-        promociones = promociones.filter(fecha_fin__lt=hoy)
-    
-    # ✅ FILTRO POR BÚSQUEDA (título y descripción)
+    vigencia_actual = request.GET.get('vigencia', '')
     buscar = request.GET.get('buscar', '')
-    if buscar:
-        from django.db.models import Q
-        promociones = promociones.filter(
-            Q(titulo__icontains=buscar) | 
-            Q(descripcion__icontains=buscar)
-        )
-    
-    # ✅ FILTRO POR FECHAS
     fecha_desde = request.GET.get('fecha_desde', '')
     fecha_hasta = request.GET.get('fecha_hasta', '')
     
-    if fecha_desde:
-        promociones = promociones.filter(fecha_inicio__gte=fecha_desde)
+    # Más recientes primero, paginado por cursor sobre (proveedor, [activo,] fecha_inicio, id)
+    page_obj = paginar(
+        promociones,
+        ORDEN_PROMOCIONES,
+        cursor=request.GET.get('cursor'),
+        hacia_atras=request.GET.get('dir') == 'anterior',
+        por_pagina=24,
+    )
     
-    if fecha_hasta:
-        promociones = promociones.filter(fecha_fin__lte=fecha_hasta)
+    # Estado "Vigente" de la página con una sola consulta al conjunto del día
+    vigencia.marcar(page_obj)
     
-    # Ordenar por más reciente
-    promociones = promociones.order_by('-fecha_inicio')
+    parametros = request.GET.copy()
+    for clave in ('cursor', 'dir'):
+        parametros.pop(clave, None)
     
     context = {
-        'promociones': promociones,
+        'promociones': page_obj,
+        'page_obj': page_obj,
+        'parametros': parametros.urlencode(),
         'proveedor': proveedor,
         'estado_actual': estado,
-        'vigencia_actual': vigencia,
+        'vigencia_actual': vigencia_actual,
         'buscar_actual': buscar,
         'fecha_desde_actual': fecha_desde,
         'fecha_hasta_actual': fecha_hasta,
@@ -589,14 +778,23 @@ def mis_solicitudes(request):
 
 # ==================== VISTAS AJAX ====================
 
+def _etag_comunas(request):
+    return f'comunas-{version_referencias()}-{request.GET.get("region_id", "")}'
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@etag(_etag_comunas)
 def get_comunas_ajax(request):
     """
-    Obtener comunas de una región (para filtros dinámicos)
+    Obtener comunas de una región (para filtros dinámicos).
+    Sale de los datos de referencia en memoria; el ETag cambia solo cuando
+    se editan las comunas. El navegador revalida en cada uso (no_cache) y,
+    si no cambiaron, recibe un 304 sin cuerpo.
     """
     region_id = request.GET.get('region_id')
-    comunas = Comuna.objects.filter(region_id=region_id).values('id', 'nombre')
-    return JsonResponse(list(comunas), safe=False)
+    comunas = [{'id': c.id, 'nombre': c.nombre} for c in comunas_de_region(region_id)]
+    return JsonResponse(comunas, safe=False)
 
 
 @login_required
@@ -604,18 +802,18 @@ def toggle_destacado_producto(request, producto_id):
     """
     Activar/desactivar producto destacado
     """
-    producto = get_object_or_404(
-        ProductoServicio, 
-        id=producto_id, 
-        proveedor__usuario=request.user
-    )
+    producto = ProductoServicio.objects.filter(id=producto_id, proveedor__usuario=request.user)
     
-    producto.destacado = not producto.destacado
-    producto.save()
+    # Se invierte en la base de datos: un UPDATE de una columna, sin leer ni reescribir la fila
+    if not producto.update(
+        destacado=Case(When(destacado=True, then=Value(False)), default=Value(True)),
+        fecha_actualizacion=timezone.now(),
+    ):
+        raise Http404('Producto no encontrado')
     
     return JsonResponse({
         'success': True, 
-        'destacado': producto.destacado
+        'destacado': producto.values_list('destacado', flat=True).get()
     })
 
 # ==================== La configuracion ====================
@@ -0,0 +1,118 @@
+# proveedor/vigencia.py
+
+"""
+Promociones vigentes del día (PromocionVigente).
+
+Una promoción está vigente si está activa y hoy cae entre su fecha de inicio
+y su fecha de fin. En vez de que cada página repita esa condición (y de que
+la vigencia cambie sola con la fecha), el conjunto de cada día se materializa
+una vez: el comando materializar_promociones_vigentes lo arma pasada la
+medianoche y borra los días anteriores, y las señales de Promocion lo
+corrigen al guardar (al borrar, la fila se va en cascada). Si el comando no
+corrió, el primer acceso del día lo arma.
+
+Lo leen la página del proveedor, los contadores del panel, la lista de
+promociones del panel, Promocion.esta_vigente() y el feed público de
+promociones vigentes.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Subquery
+from django.utils import timezone
+
+from .models import Promocion, PromocionVigente
+
+TAMANO_LOTE = 1000
+POR_PAGINA = 24
+CLAVE_DIA = 'promociones_vigentes:{dia}'
+
+# Feed público: más recientes primero; el id de la promoción desempata para el cursor
+ORDEN_FEED = ['-fecha_inicio', '-promocion_id']
+
+
+def _fecha(promocion, campo):
+    # Las fechas pueden venir como texto si se asignaron a mano antes de guardar.
+    return Promocion._meta.get_field(campo).to_python(getattr(promocion, campo))
+
+
+def promocion_vigente(promocion, hoy=None):
+    """Vigencia de una instancia en memoria (sirve antes de guardarla)."""
+    hoy = hoy or timezone.localdate()
+    return bool(promocion.activo and _fecha(promocion, 'fecha_inicio') <= hoy <= _fecha(promocion, 'fecha_fin'))
+
+
+def materializar(dia=None):
+    """Rehace el conjunto de 'dia' (hoy por defecto) y borra los días pasados. Devuelve su tamaño."""
+    dia = dia or timezone.localdate()
+    vigentes = Promocion.objects.filter(activo=True, fecha_inicio__lte=dia, fecha_fin__gte=dia)
+    filas = [
+        PromocionVigente(dia=dia, promocion_id=pk, proveedor_id=proveedor_id, fecha_inicio=fecha_inicio)
+        for pk, proveedor_id, fecha_inicio in vigentes.values_list(
+            'pk', 'proveedor_id', 'fecha_inicio',
+        ).iterator(chunk_size=TAMANO_LOTE)
+    ]
+    with transaction.atomic():
+        PromocionVigente.objects.filter(dia=dia).delete()
+        # ignore_conflicts: una promoción guardada a la vez pudo haber escrito su fila
+        PromocionVigente.objects.bulk_create(filas, batch_size=TAMANO_LOTE, ignore_conflicts=True)
+        PromocionVigente.objects.filter(dia__lt=min(dia, timezone.localdate())).delete()
+    cache.set(CLAVE_DIA.format(dia=dia), True, 60 * 60 * 24)
+    return len(filas)
+
+
+def asegurar(dia=None):
+    """Arma el conjunto de 'dia' si todavía no existe y devuelve el día."""
+    dia = dia or timezone.localdate()
+    clave = CLAVE_DIA.format(dia=dia)
+    if cache.get(clave):
+        return dia
+    if PromocionVigente.objects.filter(dia=dia).exists():
+        cache.set(clave, True, 60 * 60 * 24)
+    else:
+        # Un día sin promociones vigentes se vuelve a armar hasta que quede la marca en caché
+        materializar(dia)
+    return dia
+
+
+def del_dia(dia=None):
+    """Queryset de PromocionVigente del día (hoy por defecto)."""
+    return PromocionVigente.objects.filter(dia=asegurar(dia))
+
+
+def ids_vigentes(promocion_ids, dia=None):
+    """Los ids vigentes entre los indicados, con una consulta."""
+    return set(del_dia(dia).filter(promocion_id__in=list(promocion_ids)).values_list('promocion_id', flat=True))
+
+
+def marcar(promociones):
+    """Precarga esta_vigente() de las promociones (una consulta para todas)."""
+    promociones = list(promociones)
+    vigentes = ids_vigentes(p.pk for p in promociones)
+    for promocion in promociones:
+        promocion._vigente = promocion.pk in vigentes
+    return promociones
+
+
+def promociones_de(proveedor):
+    """Promociones vigentes hoy del proveedor (queryset de Promocion, sin ordenar)."""
+    return Promocion.objects.filter(pk__in=Subquery(del_dia().filter(proveedor=proveedor).values('promocion_id')))
+
+
+def feed():
+    """Promociones vigentes hoy de los proveedores activos, para paginar con ORDEN_FEED."""
+    return del_dia().filter(proveedor__activo=True).select_related(
+        'promocion', 'proveedor', 'proveedor__comuna',
+    )
+
+
+def actualizar(promocion):
+    """Corrige el conjunto de hoy después de guardar una promoción."""
+    dia = asegurar()
+    if promocion_vigente(promocion, dia):
+        PromocionVigente.objects.update_or_create(
+            dia=dia, promocion=promocion,
+            defaults={'proveedor_id': promocion.proveedor_id, 'fecha_inicio': _fecha(promocion, 'fecha_inicio')},
+        )
+    else:
+        PromocionVigente.objects.filter(dia=dia, promocion=promocion).delete()
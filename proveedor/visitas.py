@@ -0,0 +1,133 @@
+# proveedor/visitas.py
+
+"""
+Conteo de visitas a perfiles públicos con escritura diferida.
+
+registrar_visita() solo suma en un contador en memoria del proceso (la visita
+y cuántos productos y promociones se mostraron), así que ver un perfil no
+escribe en la base de datos. Un hilo en segundo plano vacía
+el contador cada INTERVALO_SEGUNDOS (y al terminar el proceso) con un UPDATE
+por lote, visitas = visitas + CASE ..., y suma las mismas visitas en
+VisitaDiaria. Como los incrementos son relativos, varios procesos pueden
+vaciar sus contadores a la vez sin perder visitas.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+INTERVALO_SEGUNDOS = 30
+
+logger = logging.getLogger(__name__)
+
+CAMPOS = ('visitas', 'vistas_productos', 'vistas_promociones')
+
+_pendientes = Counter()  # (proveedor_id, fecha, campo) -> cantidad
+_lock = threading.Lock()
+_hilo_pid = None
+
+
+def registrar_visita(proveedor_id, productos=0, promociones=0):
+    """Una visita al perfil en la que se mostraron 'productos' y 'promociones'."""
+    hoy = timezone.localdate()
+    with _lock:
+        _pendientes[(proveedor_id, hoy, 'visitas')] += 1
+        if productos:
+            _pendientes[(proveedor_id, hoy, 'vistas_productos')] += productos
+        if promociones:
+            _pendientes[(proveedor_id, hoy, 'vistas_promociones')] += promociones
+    _asegurar_hilo()
+
+
+def _sumar(queryset, columna, incrementos):
+    """
+    UPDATE campo = campo + CASE columna WHEN ... para cada campo de
+    'incrementos' ({campo: {valor de columna: cantidad}}), en una sola consulta.
+    """
+    claves = {clave for por_clave in incrementos.values() for clave in por_clave}
+    queryset.filter(**{f'{columna}__in': list(claves)}).update(**{
+        campo: F(campo) + Case(
+            *[When(**{columna: clave}, then=Value(n)) for clave, n in por_clave.items()],
+            default=Value(0),
+        )
+        for campo, por_clave in incrementos.items()
+    })
+
+
+def _escribir(pendientes):
+    from .models import Proveedor, VisitaDiaria
+
+    totales = Counter()
+    por_fecha = {}  # fecha -> campo -> proveedor_id -> cantidad
+    for (pid, fecha, campo), n in pendientes.items():
+        if campo == 'visitas':
+            totales[pid] += n
+        por_fecha.setdefault(fecha, {}).setdefault(campo, {})[pid] = n
+
+    with transaction.atomic():
+        if totales:
+            _sumar(Proveedor.objects.all(), 'pk', {'visitas': totales})
+        # Un proveedor puede haberse borrado desde que se contó su visita.
+        ids = {pid for pid, _, _ in pendientes}
+        existentes = set(Proveedor.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        for fecha, incrementos in por_fecha.items():
+            incrementos = {
+                campo: {pid: n for pid, n in por_proveedor.items() if pid in existentes}
+                for campo, por_proveedor in incrementos.items()
+            }
+            del_dia = {pid for por_proveedor in incrementos.values() for pid in por_proveedor}
+            if not del_dia:
+                continue
+            # Crea las filas del día que falten y luego suma sobre todas.
+            VisitaDiaria.objects.bulk_create(
+                [VisitaDiaria(proveedor_id=pid, fecha=fecha) for pid in del_dia],
+                ignore_conflicts=True,
+            )
+            _sumar(VisitaDiaria.objects.filter(fecha=fecha), 'proveedor_id', incrementos)
+
+
+def vaciar_visitas():
+    """Escribe en la base de datos lo acumulado. Devuelve cuántas visitas eran."""
+    global _pendientes
+    with _lock:
+        pendientes, _pendientes = _pendientes, Counter()
+    if not pendientes:
+        return 0
+    try:
+        _escribir(pendientes)
+    except DatabaseError:
+        # Se devuelven al contador para el próximo intento.
+        logger.exception('No se pudieron guardar las visitas de %s proveedores', len({k[0] for k in pendientes}))
+        with _lock:
+            _pendientes.update(pendientes)
+        return 0
+    return sum(n for (_, _, campo), n in pendientes.items() if campo == 'visitas')
+
+
+def _ciclo():
+    while True:
+        time.sleep(INTERVALO_SEGUNDOS)
+        close_old_connections()
+        vaciar_visitas()
+
+
+def _asegurar_hilo():
+    # Un hilo por proceso; tras un fork (gunicorn, etc.) el proceso hijo arranca el suyo.
+    global _hilo_pid
+    if _hilo_pid == os.getpid():
+        return
+    with _lock:
+        if _hilo_pid == os.getpid():
+            return
+        _hilo_pid = os.getpid()
+    threading.Thread(target=_ciclo, name='vaciar-visitas', daemon=True).start()
+
+
+atexit.register(vaciar_visitas)
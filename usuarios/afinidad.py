@@ -0,0 +1,75 @@
+# usuarios/afinidad.py
+
+"""
+"Comerciantes afines": ranking por intereses en común.
+
+Los intereses son una máscara de bits (Comerciante.intereses_mask), así que la
+coincidencia entre dos comerciantes es intereses_mask & mi_mascara y el
+puntaje es la cantidad de bits encendidos (popcount). Todo se calcula en la
+base de datos: MySQL usa BIT_COUNT(); en otros motores se usa una suma de
+desplazamientos equivalente.
+
+Para no recorrer la tabla entera en cada perfil, los candidatos son primero
+los comerciantes de la misma comuna y, si no alcanzan, los del mismo tipo de
+negocio; cada búsqueda usa su índice (comuna o tipo_negocio, puntos). El
+resultado de cada comerciante se guarda en caché unos minutos.
+"""
+
+from django.core.cache import cache
+from django.db.models import F, Func, IntegerField, Value
+
+from .models import Comerciante, INTERESES_BITS
+
+SUGERENCIAS_POR_DEFECTO = 6
+TTL_SEGUNDOS = 60 * 10
+CLAVE_AFINES = 'afines:{pk}:{mascara}:{limite}'
+
+
+class BitCount(Func):
+    """Cantidad de bits en 1 de una expresión entera."""
+    function = 'BIT_COUNT'
+    output_field = IntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # Suma portable de cada bit: ((x >> 0) & 1) + ((x >> 1) & 1) + ...
+        expresion = self.source_expressions[0]
+        suma = Value(0)
+        for i in range(len(INTERESES_BITS)):
+            suma = suma + expresion.bitrightshift(i).bitand(1)
+        return compiler.compile(suma)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, **extra_context)
+
+
+def _afines_en(grupo, mascara, excluir, limite):
+    return list(
+        Comerciante.objects.filter(activo=True, **grupo).exclude(pk__in=excluir)
+        .annotate(coincidencia=F('intereses_mask').bitand(mascara))
+        .filter(coincidencia__gt=0)
+        .annotate(intereses_comunes=BitCount(F('coincidencia')))
+        .order_by('-intereses_comunes', '-puntos', 'pk')
+        .only('pk', 'nombre_apellido', 'nombre_negocio', 'comuna', 'tipo_negocio', 'foto_perfil', 'puntos')[:limite]
+    )
+
+
+def comerciantes_afines(comerciante, limite=SUGERENCIAS_POR_DEFECTO):
+    """
+    Comerciantes que comparten intereses con el dado: primero los de su comuna y
+    luego los de su tipo de negocio, cada grupo ordenado por cantidad de
+    intereses en común (y luego por puntos). Cada uno trae 'intereses_comunes'.
+    """
+    mascara = comerciante.intereses_mask
+    if not mascara:
+        return []
+
+    # La máscara va en la clave: al cambiar los intereses no se ve el resultado anterior
+    clave = CLAVE_AFINES.format(pk=comerciante.pk, mascara=mascara, limite=limite)
+    afines = cache.get(clave)
+    if afines is None:
+        afines = _afines_en({'comuna': comerciante.comuna}, mascara, [comerciante.pk], limite)
+        if len(afines) < limite:
+            excluir = [comerciante.pk] + [afin.pk for afin in afines]
+            afines += _afines_en({'tipo_negocio': comerciante.tipo_negocio}, mascara, excluir, limite - len(afines))
+        cache.set(clave, afines, TTL_SEGUNDOS)
+    return afines
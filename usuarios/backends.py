@@ -12,9 +12,9 @@ class ComercianteBackend(BaseBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         # El username aquí es el email que pasa Django
         try:
-            comerciante = Comerciante.objects.get(email=username)
+            comerciante = Comerciante.objects.get(email=username, activo=True)
         except Comerciante.DoesNotExist:
-            return None # Usuario no encontrado
+            return None # Usuario no encontrado (o cuenta dada de baja)
 
         # Usa tu lógica actual de verificación de contraseña
         if check_password(password, comerciante.password_hash):
@@ -29,6 +29,6 @@ class ComercianteBackend(BaseBackend):
     def get_user(self, user_id):
         """Requerido por Django para reconstruir el usuario a partir de la sesión."""
         try:
-            return Comerciante.objects.get(pk=user_id)
+            return Comerciante.objects.get(pk=user_id, activo=True)
         except Comerciante.DoesNotExist:
             return None
\ No newline at end of file
@@ -0,0 +1,114 @@
+# usuarios/bajas.py
+
+"""
+Baja de cuentas de comerciantes.
+
+solicitar_baja() desactiva la cuenta al instante (no puede iniciar sesión, sale
+de los rankings y su perfil de proveedor deja de ser público). El borrado real
+lo hace el comando procesar_bajas con procesar_baja(): elimina los datos
+dependientes por lotes acotados, de las hojas hacia la raíz, para que ningún
+DELETE tenga que reunir en memoria toda la cascada ni mantenga bloqueos largos.
+Los archivos subidos se borran del storage después de confirmar cada lote.
+"""
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from proveedor.models import ImportacionCatalogo, Proveedor, ProductoServicio, Promocion, SolicitudContacto
+from .models import Comerciante, Post, Comentario, Like, Canje, MovimientoPuntos
+from . import rankings
+
+TAMANO_LOTE = 500
+IMAGEN_POR_DEFECTO = 'usuarios/img/default_profile.png'
+
+
+def solicitar_baja(comerciante):
+    """Desactiva la cuenta de inmediato; el borrado queda para procesar_bajas."""
+    with transaction.atomic():
+        # Los tableros se corrigen con los datos de la fila, no con los de la sesión
+        actual = (
+            Comerciante.objects.select_for_update()
+            .only('pk', 'puntos', 'comuna', 'tipo_negocio', 'activo')
+            .get(pk=comerciante.pk)
+        )
+        Comerciante.objects.filter(pk=comerciante.pk).update(activo=False, baja_solicitada=timezone.now())
+        Proveedor.objects.filter(usuario_id=comerciante.pk).update(activo=False, perfil_publico=False)
+        if actual.activo:
+            rankings.registrar_baja_comerciante(actual)
+    comerciante.activo = False
+
+
+def nombre_en_storage(valor):
+    """Nombre del archivo en el storage, o None si no es un archivo propio."""
+    if not valor:
+        return None
+    nombre = str(valor)
+    # Post.imagen_url guarda la URL (p. ej. /media/posts/x.png), no el nombre.
+    media_url = settings.MEDIA_URL.lstrip('/')
+    nombre_sin_barra = nombre.lstrip('/')
+    if '://' in nombre:
+        return None
+    if nombre_sin_barra.startswith(media_url):
+        nombre = nombre_sin_barra[len(media_url):]
+    if nombre == IMAGEN_POR_DEFECTO:
+        return None
+    return nombre
+
+
+def _borrar_archivos(nombres):
+    for nombre in nombres:
+        try:
+            if default_storage.exists(nombre):
+                default_storage.delete(nombre)
+        except OSError:
+            # Un archivo que no se pudo borrar no debe detener la baja.
+            pass
+
+
+def _borrar_por_lotes(queryset, lote, campos_archivo=()):
+    """
+    Borra el queryset en lotes de 'lote' filas (cada uno en su transacción) y
+    luego sus archivos. Genera la cantidad acumulada de filas borradas.
+    """
+    modelo = queryset.model
+    total = 0
+    while True:
+        filas = list(queryset.order_by('pk').values('pk', *campos_archivo)[:lote])
+        if not filas:
+            break
+        with transaction.atomic():
+            modelo.objects.filter(pk__in=[f['pk'] for f in filas]).delete()
+        _borrar_archivos(
+            nombre for f in filas for campo in campos_archivo
+            if (nombre := nombre_en_storage(f[campo]))
+        )
+        total += len(filas)
+        yield total
+
+
+def procesar_baja(comerciante_id, lote=TAMANO_LOTE):
+    """
+    Borra todo lo del comerciante por lotes. Genera (paso, filas_borradas)
+    para informar el avance; el último paso es la propia cuenta.
+    """
+    pasos = [
+        ('likes dados', Like.objects.filter(comerciante_id=comerciante_id), ()),
+        ('comentarios dados', Comentario.objects.filter(comerciante_id=comerciante_id), ()),
+        ('likes en sus posts', Like.objects.filter(post__comerciante_id=comerciante_id), ()),
+        ('comentarios en sus posts', Comentario.objects.filter(post__comerciante_id=comerciante_id), ()),
+        ('posts', Post.objects.filter(comerciante_id=comerciante_id), ('imagen_url',)),
+        ('canjes', Canje.objects.filter(comerciante_id=comerciante_id), ()),
+        ('movimientos de puntos', MovimientoPuntos.objects.filter(comerciante_id=comerciante_id), ()),
+        ('productos', ProductoServicio.objects.filter(proveedor__usuario_id=comerciante_id), ('imagen',)),
+        ('promociones', Promocion.objects.filter(proveedor__usuario_id=comerciante_id), ('imagen',)),
+        ('solicitudes de contacto', SolicitudContacto.objects.filter(proveedor__usuario_id=comerciante_id), ()),
+        ('importaciones de catálogo', ImportacionCatalogo.objects.filter(proveedor__usuario_id=comerciante_id),
+         ('archivo', 'imagenes')),
+        ('perfil de proveedor', Proveedor.objects.filter(usuario_id=comerciante_id), ('foto', 'foto_perfil')),
+        ('cuenta', Comerciante.objects.filter(pk=comerciante_id), ('foto_perfil',)),
+    ]
+    for paso, queryset, campos_archivo in pasos:
+        for total in _borrar_por_lotes(queryset, lote, campos_archivo):
+            yield paso, total
@@ -0,0 +1,93 @@
+# usuarios/canjes.py
+
+"""
+Canje de beneficios con puntos.
+
+canjear_beneficio() descuenta los puntos, baja el stock y registra el Canje en
+una sola transacción. Es seguro ante canjes simultáneos:
+
+1. Se bloquea la fila del comerciante (SELECT ... FOR UPDATE): sus propios
+   canjes se serializan, así el límite por comerciante y el saldo no se
+   pueden saltar. Comerciantes distintos no se bloquean entre sí.
+2. El stock se descuenta con un UPDATE condicional (stock > 0). No se lee
+   antes, por lo que la fila del beneficio (la más disputada) solo queda
+   bloqueada desde ese UPDATE hasta el commit, al final de la transacción.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Beneficio, Canje, Comerciante, MovimientoPuntos
+from .catalogo import invalidar_catalogo
+from .puntos import actualizar_niveles
+from . import rankings
+
+
+class CanjeError(Exception):
+    """El canje no se pudo realizar; el mensaje es apto para mostrar al usuario."""
+
+
+def canjear_beneficio(comerciante_id, beneficio_id):
+    """Canjea el beneficio para el comerciante. Devuelve el Canje o lanza CanjeError."""
+    hoy = timezone.now().date()
+
+    with transaction.atomic():
+        comerciante = (
+            Comerciante.objects.select_for_update()
+            .only('pk', 'puntos')
+            .get(pk=comerciante_id)
+        )
+
+        beneficio = (
+            Beneficio.objects.filter(pk=beneficio_id)
+            .only('pk', 'titulo', 'estado', 'vence', 'puntos_requeridos', 'stock', 'limite_por_comerciante')
+            .first()
+        )
+        if beneficio is None or beneficio.estado != 'ACTIVO':
+            raise CanjeError('Este beneficio ya no está disponible.')
+        if beneficio.vence and beneficio.vence < hoy:
+            raise CanjeError('Este beneficio está vencido.')
+
+        costo = beneficio.puntos_requeridos
+        if comerciante.puntos < costo:
+            raise CanjeError(f'Necesitas {costo} puntos para canjear este beneficio.')
+
+        if beneficio.limite_por_comerciante:
+            canjes_previos = Canje.objects.filter(
+                comerciante_id=comerciante_id, beneficio_id=beneficio_id
+            ).count()
+            if canjes_previos >= beneficio.limite_por_comerciante:
+                raise CanjeError('Ya alcanzaste el máximo de canjes para este beneficio.')
+
+        if costo:
+            Comerciante.objects.filter(pk=comerciante_id).update(puntos=F('puntos') - costo)
+
+        # Último paso antes de insertar: el bloqueo sobre el beneficio dura lo mínimo.
+        if beneficio.stock is not None:
+            disponibles = Beneficio.objects.filter(
+                pk=beneficio_id, estado='ACTIVO', stock__gt=0
+            ).update(stock=F('stock') - 1)
+            if not disponibles:
+                # Revierte también el descuento de puntos.
+                raise CanjeError('Se agotó el stock de este beneficio.')
+            if not Beneficio.objects.filter(pk=beneficio_id, stock__gt=0).exists():
+                # Último disponible: el catálogo en caché debe mostrarlo agotado.
+                transaction.on_commit(invalidar_catalogo)
+
+        canje = Canje.objects.create(
+            beneficio_id=beneficio_id,
+            comerciante_id=comerciante_id,
+            puntos=costo,
+        )
+        if costo:
+            MovimientoPuntos.objects.create(
+                comerciante_id=comerciante_id,
+                puntos=-costo,
+                motivo='CANJE',
+                clave_evento=f'canje:{canje.pk}',
+            )
+            actualizar_niveles(Comerciante.objects.filter(pk=comerciante_id))
+            rankings.registrar_cambio_puntos(comerciante_id, -costo)
+
+    return canje
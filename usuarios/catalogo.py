@@ -0,0 +1,58 @@
+# usuarios/catalogo.py
+
+"""
+Catálogo de beneficios en caché, por categoría y orden.
+
+Cada combinación (categoría, orden) se resuelve con una sola consulta y se
+guarda en la caché; con la caché caliente la página de beneficios no consulta
+la tabla. Guardar o borrar un Beneficio (signals) o agotar su stock
+(usuarios/canjes.py) cambia la versión y descarta todas las combinaciones. La
+versión es compartida entre procesos (proveedor/versiones.py), así que un
+beneficio agotado deja de ofrecerse en todos en pocos segundos.
+
+La vista "solo alcanzables" depende de los puntos de cada comerciante, así que
+no se guarda en caché: es una consulta con puntos_requeridos <= puntos sobre
+los índices (puntos_requeridos) y (categoria, puntos_requeridos).
+"""
+
+from django.core.cache import cache
+
+from proveedor import versiones
+from .models import Beneficio
+
+CLAVE_VERSION = 'beneficios'
+TTL_SEGUNDOS = 60 * 60
+
+ORDEN_POR_DEFECTO = '-fecha_creacion'
+ORDENES_VALIDOS = ['vence', '-vence', 'puntos_requeridos', '-puntos_requeridos', '-fecha_creacion']
+
+
+def invalidar_catalogo():
+    versiones.invalidar(CLAVE_VERSION)
+
+
+def _consulta(categoria, orden):
+    if orden not in ORDENES_VALIDOS:
+        orden = ORDEN_POR_DEFECTO
+    queryset = Beneficio.objects.all()
+    if categoria and categoria != 'TODOS':
+        queryset = queryset.filter(categoria=categoria)
+    return queryset.order_by(orden)
+
+
+def obtener_catalogo(categoria, orden):
+    """Lista de beneficios de la categoría ('TODOS' = todas) en el orden pedido."""
+    if orden not in ORDENES_VALIDOS:
+        orden = ORDEN_POR_DEFECTO
+
+    clave = f'beneficios:{versiones.version(CLAVE_VERSION)}:{categoria or "TODOS"}:{orden}'
+    beneficios = cache.get(clave)
+    if beneficios is None:
+        beneficios = list(_consulta(categoria, orden))
+        cache.set(clave, beneficios, TTL_SEGUNDOS)
+    return beneficios
+
+
+def beneficios_alcanzables(categoria, orden, puntos):
+    """Los beneficios de la categoría que el comerciante puede pagar con sus puntos, filtrados en SQL."""
+    return list(_consulta(categoria, orden).filter(puntos_requeridos__lte=puntos))
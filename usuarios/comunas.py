@@ -0,0 +1,50 @@
+# usuarios/comunas.py
+
+"""
+Asocia la comuna en texto libre de un comerciante con proveedor.Comuna.
+
+Se normaliza el texto (mayúsculas, sin tildes, '_' como espacio) y se busca
+primero una coincidencia exacta y luego una aproximada con difflib, para
+tolerar errores de tipeo ("Valparaizo", "Estacion central").
+"""
+
+import difflib
+import unicodedata
+
+SIMILITUD_MINIMA = 0.85
+
+_indice = None
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.replace('_', ' ').replace('-', ' ').upper().split())
+
+
+def _indice_comunas():
+    """{nombre normalizado: id} de todas las comunas, cargado una vez por proceso."""
+    global _indice
+    if _indice is None:
+        from proveedor.models import Comuna
+        _indice = {normalizar(nombre): pk for pk, nombre in Comuna.objects.values_list('pk', 'nombre')}
+    return _indice
+
+
+def reiniciar_indice():
+    global _indice
+    _indice = None
+
+
+def buscar_comuna_id(texto):
+    """Id de la Comuna que corresponde al texto, o None si no hay una suficientemente parecida."""
+    clave = normalizar(texto)
+    if not clave:
+        return None
+
+    indice = _indice_comunas()
+    if clave in indice:
+        return indice[clave]
+
+    parecidas = difflib.get_close_matches(clave, indice.keys(), n=1, cutoff=SIMILITUD_MINIMA)
+    return indice[parecidas[0]] if parecidas else None
@@ -0,0 +1,118 @@
+# usuarios/exportacion.py
+
+"""
+Exportación de los datos personales de un comerciante en un .zip.
+
+El archivo se arma mientras se envía: zipfile escribe sobre un búfer que solo
+acumula lo producido desde la última vez que se vació, y cada tabla se recorre
+con iterator() y se escribe fila a fila como JSON Lines. Las imágenes se copian
+desde el storage por trozos. Así nunca se tiene en memoria (ni en disco) ni el
+zip completo ni un queryset completo, por grande que sea la cuenta.
+"""
+
+import json
+import zipfile
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+
+from proveedor.models import Proveedor, ProductoServicio, Promocion, SolicitudContacto
+from .models import Comerciante, Post, Comentario, Like, Canje, MovimientoPuntos
+from .bajas import nombre_en_storage
+
+TAMANO_CHUNK = 500
+
+
+class _BufferSalida:
+    """
+    Destino de escritura para zipfile. No admite seek(), así que zipfile escribe
+    en modo secuencial (con descriptores de datos) y nunca vuelve atrás.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        if self._partes:
+            datos = b''.join(self._partes)
+            self._partes.clear()
+            yield datos
+
+
+def _tablas(comerciante_id):
+    """(nombre del archivo, queryset de diccionarios, campos con archivos)."""
+    return [
+        ('perfil.jsonl', Comerciante.objects.filter(pk=comerciante_id).values(
+            'id', 'nombre_apellido', 'email', 'whatsapp', 'relacion_negocio', 'tipo_negocio',
+            'comuna', 'nombre_negocio', 'foto_perfil', 'intereses_mask', 'puntos', 'nivel_actual',
+            'fecha_registro', 'last_login'), ('foto_perfil',)),
+        ('posts.jsonl', Post.objects.filter(comerciante_id=comerciante_id).values(
+            'id', 'titulo', 'contenido', 'categoria', 'imagen_url', 'etiquetas', 'fecha_publicacion'),
+            ('imagen_url',)),
+        ('comentarios.jsonl', Comentario.objects.filter(comerciante_id=comerciante_id).values(
+            'id', 'post_id', 'contenido', 'fecha_creacion'), ()),
+        ('likes.jsonl', Like.objects.filter(comerciante_id=comerciante_id).values(
+            'id', 'post_id', 'post__titulo'), ()),
+        ('movimientos_puntos.jsonl', MovimientoPuntos.objects.filter(comerciante_id=comerciante_id).values(
+            'puntos', 'motivo', 'fecha'), ()),
+        ('canjes.jsonl', Canje.objects.filter(comerciante_id=comerciante_id).values(
+            'beneficio_id', 'beneficio__titulo', 'puntos', 'fecha'), ()),
+        ('proveedor/perfil.jsonl', Proveedor.objects.filter(usuario_id=comerciante_id).values(
+            'id', 'nombre_empresa', 'descripcion', 'foto', 'foto_perfil', 'pais__nombre',
+            'region__nombre', 'comuna__nombre', 'direccion', 'cobertura', 'telefono', 'whatsapp',
+            'email', 'sitio_web', 'facebook', 'instagram', 'twitter', 'linkedin', 'fecha_registro'),
+            ('foto', 'foto_perfil')),
+        ('proveedor/productos.jsonl', ProductoServicio.objects.filter(proveedor__usuario_id=comerciante_id).values(
+            'id', 'nombre', 'descripcion', 'precio_referencia', 'imagen', 'categoria',
+            'activo', 'destacado', 'fecha_creacion'), ('imagen',)),
+        ('proveedor/promociones.jsonl', Promocion.objects.filter(proveedor__usuario_id=comerciante_id).values(
+            'id', 'titulo', 'descripcion', 'imagen', 'fecha_inicio', 'fecha_fin', 'activo',
+            'fecha_creacion'), ('imagen',)),
+        ('proveedor/solicitudes_contacto.jsonl', SolicitudContacto.objects.filter(
+            proveedor__usuario_id=comerciante_id).values(
+            'id', 'mensaje', 'estado', 'fecha_solicitud', 'fecha_respuesta'), ()),
+    ]
+
+
+def generar_zip_datos(comerciante_id, chunk_size=TAMANO_CHUNK):
+    """Genera los bytes del .zip con los datos y archivos del comerciante."""
+    salida = _BufferSalida()
+    archivos = []
+
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for nombre, queryset, campos_archivo in _tablas(comerciante_id):
+            with zf.open(nombre, 'w', force_zip64=True) as destino:
+                for fila in queryset.order_by('pk').iterator(chunk_size=chunk_size):
+                    destino.write(json.dumps(fila, cls=DjangoJSONEncoder, ensure_ascii=False).encode() + b'\n')
+                    archivos.extend(
+                        n for campo in campos_archivo if (n := nombre_en_storage(fila[campo]))
+                    )
+                    yield from salida.vaciar()
+            yield from salida.vaciar()
+
+        # Solo se guardaron los nombres; el contenido se lee del storage por trozos.
+        for nombre in archivos:
+            try:
+                origen = default_storage.open(nombre, 'rb')
+            except OSError:
+                continue
+            with origen, zf.open(f'archivos/{nombre}', 'w', force_zip64=True) as destino:
+                for trozo in origen.chunks():
+                    destino.write(trozo)
+                    yield from salida.vaciar()
+            yield from salida.vaciar()
+
+    # Al cerrar, zipfile escribe el directorio central.
+    yield from salida.vaciar()
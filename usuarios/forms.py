@@ -6,6 +6,7 @@ from .models import (
     RELACION_NEGOCIO_CHOICES, TIPO_NEGOCIO_CHOICES, 
     CATEGORIA_POST_CHOICES, INTERESTS_CHOICES
 ) 
+from .comunas import buscar_comuna_id
 # Opciones de comuna
 COMUNA_CHOICES = [
     ('', 'Selecciona tu comuna'),
@@ -61,6 +62,7 @@ class RegistroComercianteForm(forms.ModelForm):
 
         comuna = cleaned_data.get('comuna_select')
         cleaned_data['comuna'] = comuna
+        cleaned_data['comuna_normalizada_id'] = buscar_comuna_id(comuna)
 
         return cleaned_data
 
@@ -176,6 +178,15 @@ class BusinessDataForm(forms.ModelForm):
             'nombre_negocio': forms.TextInput(attrs={'class': 'w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-primary focus:border-primary dark:bg-gray-700 dark:text-white', 'placeholder': 'Ej: Minimarket El Sol'}),
         }
 
+    def save(self, commit=True):
+        """Guarda solo los campos del formulario más la comuna normalizada."""
+        comerciante = super().save(commit=False)
+        comerciante.comuna_normalizada_id = buscar_comuna_id(comerciante.comuna)
+        if commit:
+            # Puntos y nivel se escriben desde el libro: no se tocan aquí.
+            comerciante.save(update_fields=self.Meta.fields + ['comuna_normalizada'])
+        return comerciante
+
 class ContactInfoForm(forms.ModelForm):
     """Formulario para actualizar el email y WhatsApp."""
     class Meta:
@@ -0,0 +1,24 @@
+# usuarios/management/commands/_hashing.py
+
+"""
+Funciones que se ejecutan dentro de los procesos del pool de hashing.
+
+Este módulo no importa modelos a nivel de módulo para que los procesos hijos
+(incluso con el método 'spawn' de Windows/macOS) puedan cargarlo sin tener
+las apps de Django inicializadas.
+"""
+
+import os
+
+
+def inicializar_worker():
+    """Configura Django en el proceso hijo (solo se necesita settings)."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'proyect.settings')
+    import django
+    django.setup()
+
+
+def hashear_lote(passwords):
+    """Devuelve el hash de cada contraseña, en el mismo orden."""
+    from django.contrib.auth.hashers import make_password
+    return [make_password(p) for p in passwords]
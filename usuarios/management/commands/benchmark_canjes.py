@@ -0,0 +1,118 @@
+# usuarios/management/commands/benchmark_canjes.py
+
+"""
+Benchmark de contención para usuarios/canjes.py.
+
+Crea un beneficio con stock limitado y N comerciantes con puntos, lanza todos
+los canjes a la vez desde un pool de hilos (Django abre una conexión por hilo)
+y verifica que no haya sobreventa ni puntos perdidos. Al terminar borra los
+datos de prueba.
+
+Debe ejecutarse contra la base de datos real (MySQL): SQLite serializa todas
+las escrituras y no sirve para medir contención.
+
+Uso:
+    python manage.py benchmark_canjes
+    python manage.py benchmark_canjes --comerciantes 500 --stock 100 --hilos 64
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Sum
+
+from usuarios.canjes import canjear_beneficio, CanjeError
+from usuarios.models import Beneficio, Canje, Comerciante, MovimientoPuntos
+
+
+class Command(BaseCommand):
+    help = 'Mide canjes simultáneos sobre un mismo beneficio y verifica stock, límites y saldos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comerciantes', type=int, default=300)
+        parser.add_argument('--stock', type=int, default=100)
+        parser.add_argument('--intentos', type=int, default=2, help='Canjes que intenta cada comerciante.')
+        parser.add_argument('--hilos', type=int, default=32)
+        parser.add_argument('--costo', type=int, default=50, help='Puntos requeridos por canje.')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            raise CommandError('SQLite no soporta escrituras concurrentes; usa la base de datos MySQL.')
+
+        n = options['comerciantes']
+        stock = options['stock']
+        costo = options['costo']
+        intentos = options['intentos']
+        marca = f'benchmark-canjes-{int(time.time())}'
+
+        beneficio = Beneficio.objects.create(
+            titulo=marca, descripcion=marca, puntos_requeridos=costo,
+            stock=stock, limite_por_comerciante=1,
+        )
+        Comerciante.objects.bulk_create([
+            Comerciante(
+                nombre_apellido=f'Benchmark {i}', email=f'{marca}-{i}@benchmark.local',
+                password_hash='!', relacion_negocio='DUEÑO', tipo_negocio='ALMACEN',
+                comuna='BENCHMARK', puntos=costo * 10,
+            )
+            for i in range(n)
+        ])
+        ids = list(Comerciante.objects.filter(email__startswith=marca).values_list('pk', flat=True))
+
+        resultados = {'ok': 0, 'rechazados': 0}
+        lock = threading.Lock()
+
+        def intentar(comerciante_id):
+            try:
+                canjear_beneficio(comerciante_id, beneficio.pk)
+                clave = 'ok'
+            except CanjeError:
+                clave = 'rechazados'
+            with lock:
+                resultados[clave] += 1
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['hilos']) as pool:
+            list(pool.map(intentar, ids * intentos))
+        duracion = time.perf_counter() - inicio
+
+        try:
+            self._verificar(beneficio, ids, stock, costo, resultados)
+        finally:
+            MovimientoPuntos.objects.filter(comerciante_id__in=ids).delete()
+            Canje.objects.filter(beneficio=beneficio).delete()
+            Comerciante.objects.filter(pk__in=ids).delete()
+            beneficio.delete()
+
+        total = len(ids) * intentos
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} intentos en {duracion:.2f}s ({total / duracion:.0f} canjes/s): '
+            f'{resultados["ok"]} aceptados, {resultados["rechazados"]} rechazados.'
+        ))
+
+    def _verificar(self, beneficio, ids, stock, costo, resultados):
+        beneficio.refresh_from_db()
+        canjes = Canje.objects.filter(beneficio=beneficio)
+        esperados = min(stock, len(ids))
+        errores = []
+
+        if canjes.count() != esperados or resultados['ok'] != esperados:
+            errores.append(f'Se esperaban {esperados} canjes y hay {canjes.count()} (aceptados: {resultados["ok"]}).')
+        if beneficio.stock != stock - esperados:
+            errores.append(f'Stock final {beneficio.stock}, se esperaba {stock - esperados}.')
+        repetidos = canjes.values('comerciante_id').annotate(n=Count('id')).filter(n__gt=1).count()
+        if repetidos:
+            errores.append(f'{repetidos} comerciantes superaron el límite por comerciante.')
+        descontado = Comerciante.objects.filter(pk__in=ids).aggregate(t=Sum('puntos'))['t']
+        if descontado != len(ids) * costo * 10 - esperados * costo:
+            errores.append('La suma de saldos no coincide con los canjes registrados.')
+        libro = MovimientoPuntos.objects.filter(comerciante_id__in=ids, motivo='CANJE').aggregate(t=Sum('puntos'))['t'] or 0
+        if libro != -esperados * costo:
+            errores.append('El libro de puntos no coincide con los canjes registrados.')
+
+        if errores:
+            raise CommandError('\n'.join(errores))
+        self.stdout.write('Verificación OK: sin sobreventa, límites respetados y saldos consistentes.')
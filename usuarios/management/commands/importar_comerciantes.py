@@ -0,0 +1,172 @@
+# usuarios/management/commands/importar_comerciantes.py
+
+"""
+Importación masiva de comerciantes desde un CSV.
+
+Columnas esperadas (encabezado obligatorio):
+    nombre_apellido, email, whatsapp, relacion_negocio, tipo_negocio, comuna, password
+
+Uso:
+    python manage.py importar_comerciantes socios.csv
+    python manage.py importar_comerciantes socios.csv --reanudar
+"""
+
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from usuarios.forms import RegistroComercianteForm
+from usuarios.models import Comerciante
+from usuarios.rankings import reconstruir_rankings
+from ._hashing import inicializar_worker, hashear_lote
+
+
+class FilaComercianteForm(RegistroComercianteForm):
+    """
+    Mismas reglas que el registro, pero sin la consulta de email único por fila:
+    la unicidad se verifica por lote en el comando.
+    """
+    def validate_unique(self):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Importa comerciantes desde un CSV en lotes, hasheando contraseñas en paralelo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del CSV a importar.')
+        parser.add_argument('--lote', type=int, default=1000, help='Filas por bulk_create (default: 1000).')
+        parser.add_argument('--procesos', type=int, default=None, help='Procesos para el hashing (default: CPUs).')
+        parser.add_argument('--reanudar', action='store_true', help='Continuar desde el último lote confirmado.')
+        parser.add_argument('--checkpoint', default=None, help='Archivo de avance (default: <archivo>.checkpoint).')
+        parser.add_argument('--encoding', default='utf-8-sig')
+
+    def handle(self, *args, **options):
+        archivo = options['archivo']
+        if not os.path.exists(archivo):
+            raise CommandError(f'No existe el archivo "{archivo}".')
+
+        self.tamano_lote = max(1, options['lote'])
+        self.checkpoint = options['checkpoint'] or f'{archivo}.checkpoint'
+        self.procesos = options['procesos'] or os.cpu_count() or 1
+
+        desde_fila = self._leer_checkpoint() if options['reanudar'] else 0
+        if desde_fila:
+            self.stdout.write(f'Reanudando desde la fila {desde_fila + 1}.')
+
+        self.creados = 0
+        self.duplicados = 0
+        self.invalidos = 0
+        self.emails_vistos = set()
+
+        with open(archivo, newline='', encoding=options['encoding']) as f, \
+                ProcessPoolExecutor(max_workers=self.procesos, initializer=inicializar_worker) as pool:
+            lector = csv.DictReader(f)
+            lote = []
+            ultima_fila = desde_fila
+
+            for numero_fila, fila in enumerate(lector, start=1):
+                if numero_fila <= desde_fila:
+                    continue
+                ultima_fila = numero_fila
+
+                datos = self._validar_fila(numero_fila, fila)
+                if datos is not None:
+                    lote.append(datos)
+
+                if len(lote) >= self.tamano_lote:
+                    self._guardar_lote(pool, lote, ultima_fila)
+                    lote = []
+
+            self._guardar_lote(pool, lote, ultima_fila)
+
+        if self.creados:
+            reconstruir_rankings()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Importación terminada: {self.creados} creados, '
+            f'{self.duplicados} duplicados, {self.invalidos} inválidos.'
+        ))
+
+    # ------------------------------------------------------------------
+
+    def _validar_fila(self, numero_fila, fila):
+        password = (fila.get('password') or '').strip()
+        form = FilaComercianteForm(data={
+            'nombre_apellido': (fila.get('nombre_apellido') or '').strip(),
+            'email': (fila.get('email') or '').strip(),
+            'whatsapp': (fila.get('whatsapp') or '').strip(),
+            'relacion_negocio': (fila.get('relacion_negocio') or '').strip(),
+            'tipo_negocio': (fila.get('tipo_negocio') or '').strip(),
+            'comuna_select': (fila.get('comuna') or '').strip(),
+            'password': password,
+            'confirm_password': password,
+        })
+
+        if not form.is_valid():
+            self.invalidos += 1
+            self.stderr.write(f'Fila {numero_fila}: {form.errors.as_text()}')
+            return None
+
+        datos = form.cleaned_data
+        if datos['email'] in self.emails_vistos:
+            self.duplicados += 1
+            return None
+        self.emails_vistos.add(datos['email'])
+        return datos
+
+    def _guardar_lote(self, pool, lote, ultima_fila):
+        if lote:
+            existentes = set(Comerciante.objects.filter(
+                email__in=[d['email'] for d in lote]
+            ).values_list('email', flat=True))
+            nuevos = [d for d in lote if d['email'] not in existentes]
+            self.duplicados += len(lote) - len(nuevos)
+
+            chunksize = max(1, len(nuevos) // (self.procesos * 4))
+            hashes = pool.map(hashear_lote, _partir([d['password'] for d in nuevos], chunksize))
+            hashes = [h for parte in hashes for h in parte]
+
+            comerciantes = [
+                Comerciante(
+                    nombre_apellido=d['nombre_apellido'],
+                    email=d['email'],
+                    whatsapp=d['whatsapp'] or None,
+                    relacion_negocio=d['relacion_negocio'],
+                    tipo_negocio=d['tipo_negocio'],
+                    comuna=d['comuna'],
+                    comuna_normalizada_id=d['comuna_normalizada_id'],
+                    password_hash=password_hash,
+                    puntos=0,
+                    nivel_actual='BRONCE',
+                )
+                for d, password_hash in zip(nuevos, hashes)
+            ]
+
+            with transaction.atomic():
+                Comerciante.objects.bulk_create(comerciantes, batch_size=self.tamano_lote)
+            self.creados += len(comerciantes)
+
+        self._escribir_checkpoint(ultima_fila)
+        self.stdout.write(f'Fila {ultima_fila}: {self.creados} comerciantes creados.')
+
+    def _leer_checkpoint(self):
+        try:
+            with open(self.checkpoint, encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _escribir_checkpoint(self, fila):
+        temporal = f'{self.checkpoint}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(str(fila))
+        os.replace(temporal, self.checkpoint)
+
+
+def _partir(items, tamano):
+    for i in range(0, len(items), tamano):
+        yield items[i:i + tamano]
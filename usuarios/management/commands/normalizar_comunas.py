@@ -0,0 +1,65 @@
+# usuarios/management/commands/normalizar_comunas.py
+
+"""
+Completa Comerciante.comuna_normalizada a partir del texto de Comerciante.comuna.
+
+Procesa por lotes de id solo a los comerciantes que aún no tienen comuna
+normalizada, así que se puede interrumpir y volver a ejecutar: retoma donde
+quedó. Los textos sin una comuna parecida se informan y quedan en NULL.
+
+Uso:
+    python manage.py normalizar_comunas
+    python manage.py normalizar_comunas --lote 2000 --dry-run
+"""
+
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from usuarios.comunas import buscar_comuna_id
+from usuarios.models import Comerciante
+
+
+class Command(BaseCommand):
+    help = 'Asocia la comuna en texto de cada comerciante con la tabla de comunas, por lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Comerciantes por lote (default: 1000).')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informar, sin escribir.')
+
+    def handle(self, *args, **options):
+        tamano = max(1, options['lote'])
+        dry_run = options['dry_run']
+        pendientes = Comerciante.objects.filter(comuna_normalizada__isnull=True).exclude(comuna='')
+        ultimo_id = 0
+        asociados = 0
+        sin_coincidencia = Counter()
+
+        while True:
+            lote = list(
+                pendientes.filter(pk__gt=ultimo_id).order_by('pk').only('pk', 'comuna')[:tamano]
+            )
+            if not lote:
+                break
+            ultimo_id = lote[-1].pk
+
+            cambiados = []
+            for comerciante in lote:
+                comuna_id = buscar_comuna_id(comerciante.comuna)
+                if comuna_id is None:
+                    sin_coincidencia[comerciante.comuna] += 1
+                    continue
+                comerciante.comuna_normalizada_id = comuna_id
+                cambiados.append(comerciante)
+
+            if cambiados and not dry_run:
+                Comerciante.objects.bulk_update(cambiados, ['comuna_normalizada'])
+            asociados += len(cambiados)
+            self.stdout.write(f'Hasta id {ultimo_id}: {asociados} asociados.')
+
+        for texto, cantidad in sin_coincidencia.most_common():
+            self.stderr.write(f'Sin coincidencia: "{texto}" ({cantidad})')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{asociados} comerciantes asociados, {sum(sin_coincidencia.values())} sin coincidencia.'
+        ))
@@ -0,0 +1,39 @@
+# usuarios/management/commands/procesar_bajas.py
+
+"""
+Borra por lotes las cuentas de comerciantes con baja solicitada.
+
+Pensado para ejecutarse periódicamente (cron). Si se interrumpe, la próxima
+ejecución continúa: cada lote ya borrado queda confirmado.
+
+Uso:
+    python manage.py procesar_bajas
+    python manage.py procesar_bajas --lote 200 --comerciante 42
+"""
+
+from django.core.management.base import BaseCommand
+
+from usuarios.bajas import procesar_baja, TAMANO_LOTE
+from usuarios.models import Comerciante
+
+
+class Command(BaseCommand):
+    help = 'Elimina por lotes los datos de las cuentas dadas de baja.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help=f'Filas por DELETE (default: {TAMANO_LOTE}).')
+        parser.add_argument('--comerciante', type=int, default=None, help='Procesar solo esta cuenta.')
+
+    def handle(self, *args, **options):
+        lote = max(1, options['lote'])
+        pendientes = Comerciante.objects.filter(activo=False, baja_solicitada__isnull=False)
+        if options['comerciante']:
+            pendientes = pendientes.filter(pk=options['comerciante'])
+
+        ids = list(pendientes.order_by('baja_solicitada').values_list('pk', flat=True))
+        for comerciante_id in ids:
+            self.stdout.write(f'Comerciante {comerciante_id}:')
+            for paso, total in procesar_baja(comerciante_id, lote):
+                self.stdout.write(f'  {paso}: {total} borrados')
+
+        self.stdout.write(self.style.SUCCESS(f'{len(ids)} cuentas eliminadas.'))
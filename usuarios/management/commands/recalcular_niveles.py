@@ -0,0 +1,37 @@
+# usuarios/management/commands/recalcular_niveles.py
+
+"""
+Recalcula Comerciante.nivel_actual a partir de los puntos, por rangos de id.
+
+Cada bloque es un único UPDATE ... CASE (ver usuarios/puntos.py) que solo
+escribe las filas cuyo nivel cambió.
+
+Uso:
+    python manage.py recalcular_niveles
+    python manage.py recalcular_niveles --bloque 5000
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from usuarios.models import Comerciante
+from usuarios.puntos import actualizar_niveles
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el nivel de todos los comerciantes con UPDATE ... CASE por bloques.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bloque', type=int, default=5000, help='Rango de ids por UPDATE (default: 5000).')
+
+    def handle(self, *args, **options):
+        tamano = max(1, options['bloque'])
+        max_id = Comerciante.objects.aggregate(max_id=Max('pk'))['max_id'] or 0
+        actualizados = 0
+
+        for desde in range(0, max_id, tamano):
+            actualizados += actualizar_niveles(
+                Comerciante.objects.filter(pk__gt=desde, pk__lte=desde + tamano)
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'{actualizados} comerciantes cambiaron de nivel.'))
@@ -0,0 +1,76 @@
+# usuarios/management/commands/reconciliar_puntos.py
+
+"""
+Recalcula Comerciante.puntos a partir del libro MovimientoPuntos.
+
+Recorre los comerciantes por rangos de id; cada bloque se bloquea, se suma su
+libro con una sola consulta agrupada y solo se escriben los saldos distintos.
+
+Uso:
+    python manage.py reconciliar_puntos
+    python manage.py reconciliar_puntos --bloque 2000 --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from usuarios.models import Comerciante, MovimientoPuntos
+from usuarios.puntos import actualizar_niveles
+from usuarios.rankings import reconstruir_rankings
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los saldos de puntos desde el libro de movimientos, por bloques.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bloque', type=int, default=1000, help='Comerciantes por bloque (default: 1000).')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informar diferencias, sin escribir.')
+
+    def handle(self, *args, **options):
+        tamano = max(1, options['bloque'])
+        dry_run = options['dry_run']
+        ultimo_id = 0
+        revisados = 0
+        corregidos = 0
+
+        while True:
+            with transaction.atomic():
+                bloque = list(
+                    Comerciante.objects.select_for_update()
+                    .filter(pk__gt=ultimo_id)
+                    .order_by('pk')
+                    .only('pk', 'puntos')[:tamano]
+                )
+                if not bloque:
+                    break
+
+                ids = [c.pk for c in bloque]
+                saldos = dict(
+                    MovimientoPuntos.objects.filter(comerciante_id__in=ids)
+                    .values('comerciante_id')
+                    .annotate(total=Sum('puntos'))
+                    .values_list('comerciante_id', 'total')
+                )
+
+                cambiados = []
+                for comerciante in bloque:
+                    saldo = saldos.get(comerciante.pk) or 0
+                    if comerciante.puntos != saldo:
+                        self.stdout.write(f'Comerciante {comerciante.pk}: {comerciante.puntos} -> {saldo}')
+                        comerciante.puntos = saldo
+                        cambiados.append(comerciante)
+
+                if cambiados and not dry_run:
+                    Comerciante.objects.bulk_update(cambiados, ['puntos'])
+                    actualizar_niveles(Comerciante.objects.filter(pk__in=[c.pk for c in cambiados]))
+
+            revisados += len(bloque)
+            corregidos += len(cambiados)
+            ultimo_id = bloque[-1].pk
+
+        if corregidos and not dry_run:
+            reconstruir_rankings()
+
+        accion = 'con diferencias' if dry_run else 'corregidos'
+        self.stdout.write(self.style.SUCCESS(f'{revisados} comerciantes revisados, {corregidos} {accion}.'))
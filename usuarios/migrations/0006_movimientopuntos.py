@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def registrar_saldos_iniciales(apps, schema_editor):
+    """Deja en el libro los puntos que ya tenían los comerciantes."""
+    Comerciante = apps.get_model('usuarios', 'Comerciante')
+    MovimientoPuntos = apps.get_model('usuarios', 'MovimientoPuntos')
+    movimientos = (
+        MovimientoPuntos(
+            comerciante_id=pk,
+            puntos=puntos,
+            motivo='SALDO_INICIAL',
+            clave_evento=f'saldo_inicial:{pk}',
+        )
+        for pk, puntos in Comerciante.objects.exclude(puntos=0).values_list('pk', 'puntos').iterator()
+    )
+    MovimientoPuntos.objects.bulk_create(movimientos, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0005_comerciante_last_login_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoPuntos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('puntos', models.IntegerField(verbose_name='Puntos')),
+                ('motivo', models.CharField(choices=[('SALDO_INICIAL', 'Saldo inicial'), ('POST', 'Publicación en el foro'), ('COMENTARIO', 'Comentario'), ('LIKE_RECIBIDO', 'Like recibido'), ('AJUSTE', 'Ajuste manual')], max_length=30, verbose_name='Motivo')),
+                ('clave_evento', models.CharField(max_length=100, unique=True, verbose_name='Clave del evento')),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha')),
+                ('comerciante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos_puntos', to='usuarios.comerciante', verbose_name='Comerciante')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de Puntos',
+                'verbose_name_plural': 'Movimientos de Puntos',
+                'ordering': ['-fecha'],
+            },
+        ),
+        migrations.RunPython(registrar_saldos_iniciales, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0006_movimientopuntos'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comerciante',
+            index=models.Index(fields=['-puntos'], name='comerciante_puntos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comerciante',
+            index=models.Index(fields=['comuna', '-puntos'], name='comerciante_comuna_pts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comerciante',
+            index=models.Index(fields=['tipo_negocio', '-puntos'], name='comerciante_tipo_pts_idx'),
+        ),
+    ]
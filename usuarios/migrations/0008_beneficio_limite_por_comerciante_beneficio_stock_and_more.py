@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0007_comerciante_comerciante_puntos_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='beneficio',
+            name='limite_por_comerciante',
+            field=models.PositiveIntegerField(default=0, help_text='0 = sin límite.', verbose_name='Canjes por comerciante'),
+        ),
+        migrations.AddField(
+            model_name='beneficio',
+            name='stock',
+            field=models.PositiveIntegerField(blank=True, help_text='Vacío = sin límite.', null=True, verbose_name='Stock disponible'),
+        ),
+        migrations.AlterField(
+            model_name='movimientopuntos',
+            name='motivo',
+            field=models.CharField(choices=[('SALDO_INICIAL', 'Saldo inicial'), ('POST', 'Publicación en el foro'), ('COMENTARIO', 'Comentario'), ('LIKE_RECIBIDO', 'Like recibido'), ('CANJE', 'Canje de beneficio'), ('AJUSTE', 'Ajuste manual')], max_length=30, verbose_name='Motivo'),
+        ),
+        migrations.CreateModel(
+            name='Canje',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('puntos', models.IntegerField(verbose_name='Puntos descontados')),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha del canje')),
+                ('beneficio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='canjes', to='usuarios.beneficio', verbose_name='Beneficio')),
+                ('comerciante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='canjes', to='usuarios.comerciante', verbose_name='Comerciante')),
+            ],
+            options={
+                'verbose_name': 'Canje',
+                'verbose_name_plural': 'Canjes',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['comerciante', 'beneficio'], name='canje_comerciante_benef_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0008_beneficio_limite_por_comerciante_beneficio_stock_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='beneficio',
+            index=models.Index(fields=['puntos_requeridos'], name='beneficio_puntos_req_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='beneficio',
+            index=models.Index(fields=['categoria', 'puntos_requeridos'], name='beneficio_cat_puntos_idx'),
+        ),
+    ]
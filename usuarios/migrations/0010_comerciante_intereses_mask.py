@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:53
+
+from django.db import migrations, models
+
+# Orden de INTERESTS_CHOICES al momento de la migración: el bit i es el interés i.
+CODIGOS_INTERESES = [
+    'MARKETING', 'INVENTARIO', 'PROVEEDORES', 'FINANZAS', 'CLIENTES', 'LEYES',
+    'TECNOLOGIA', 'REDES_SOCIALES', 'VENTAS', 'CREDITOS', 'IMPUESTOS', 'DECORACION',
+    'SOSTENIBILIDAD', 'SEGURIDAD', 'LOGISTICA', 'INNOVACION', 'EMPRENDIMIENTO', 'SEGUROS',
+]
+BITS = {codigo: 1 << i for i, codigo in enumerate(CODIGOS_INTERESES)}
+TAMANO_LOTE = 1000
+
+
+def csv_a_mascara(apps, schema_editor):
+    Comerciante = apps.get_model('usuarios', 'Comerciante')
+    lote = []
+    filas = Comerciante.objects.exclude(intereses='').only('pk', 'intereses').iterator(chunk_size=TAMANO_LOTE)
+    for comerciante in filas:
+        mascara = 0
+        for codigo in comerciante.intereses.split(','):
+            mascara |= BITS.get(codigo.strip(), 0)
+        comerciante.intereses_mask = mascara
+        lote.append(comerciante)
+        if len(lote) >= TAMANO_LOTE:
+            Comerciante.objects.bulk_update(lote, ['intereses_mask'])
+            lote = []
+    if lote:
+        Comerciante.objects.bulk_update(lote, ['intereses_mask'])
+
+
+def mascara_a_csv(apps, schema_editor):
+    Comerciante = apps.get_model('usuarios', 'Comerciante')
+    lote = []
+    filas = Comerciante.objects.exclude(intereses_mask=0).only('pk', 'intereses_mask').iterator(chunk_size=TAMANO_LOTE)
+    for comerciante in filas:
+        comerciante.intereses = ','.join(c for c, bit in BITS.items() if comerciante.intereses_mask & bit)
+        lote.append(comerciante)
+        if len(lote) >= TAMANO_LOTE:
+            Comerciante.objects.bulk_update(lote, ['intereses'])
+            lote = []
+    if lote:
+        Comerciante.objects.bulk_update(lote, ['intereses'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0009_beneficio_beneficio_puntos_req_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comerciante',
+            name='intereses_mask',
+            field=models.PositiveIntegerField(default=0, help_text='Máscara de bits de INTERESTS_CHOICES (ver INTERESES_BITS).', verbose_name='Intereses'),
+        ),
+        migrations.RunPython(csv_a_mascara, mascara_a_csv),
+        migrations.RemoveField(
+            model_name='comerciante',
+            name='intereses',
+        ),
+    ]
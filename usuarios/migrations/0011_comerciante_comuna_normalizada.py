@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0005_productoservicio_categoria'),
+        ('usuarios', '0010_comerciante_intereses_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comerciante',
+            name='comuna_normalizada',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='comerciantes', to='proveedor.comuna', verbose_name='Comuna (normalizada)'),
+        ),
+    ]
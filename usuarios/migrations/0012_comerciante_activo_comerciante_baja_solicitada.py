@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0011_comerciante_comuna_normalizada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comerciante',
+            name='activo',
+            field=models.BooleanField(default=True, verbose_name='Cuenta activa'),
+        ),
+        migrations.AddField(
+            model_name='comerciante',
+            name='baja_solicitada',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Baja solicitada'),
+        ),
+    ]
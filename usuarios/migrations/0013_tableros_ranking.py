@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+TOP_N = 10
+TAMANO_LOTE = 1000
+
+
+def armar_tableros(apps, schema_editor):
+    Comerciante = apps.get_model('usuarios', 'Comerciante')
+    TableroRanking = apps.get_model('usuarios', 'TableroRanking')
+    PosicionRanking = apps.get_model('usuarios', 'PosicionRanking')
+    activos = Comerciante.objects.filter(activo=True)
+
+    for tablero, campo in (('global', None), ('comuna', 'comuna'), ('tipo', 'tipo_negocio')):
+        campos = [campo] if campo else []
+        grupos = {}
+        filas = activos.values(*campos, 'puntos').annotate(cantidad=Count('pk')).order_by(*campos, '-puntos')
+        for fila in filas:
+            grupos.setdefault(fila[campo] if campo else '', []).append((fila['puntos'], fila['cantidad']))
+
+        posiciones = []
+        for valor, puntajes in grupos.items():
+            miembros = activos.filter(**{campo: valor}) if campo else activos
+            top = [
+                {'id': f['pk'], 'nombre': f['nombre_apellido'], 'negocio': f['nombre_negocio'],
+                 'comuna': f['comuna'], 'puntos': f['puntos']}
+                for f in miembros.order_by('-puntos', 'pk')
+                .values('pk', 'nombre_apellido', 'nombre_negocio', 'comuna', 'puntos')[:TOP_N]
+            ]
+            registro = TableroRanking.objects.create(
+                tablero=tablero, valor=valor, total=sum(c for _, c in puntajes), top=top,
+            )
+            posicion = 1
+            for puntos, cantidad in puntajes:
+                posiciones.append(PosicionRanking(tablero=registro, puntos=puntos, cantidad=cantidad, posicion=posicion))
+                posicion += cantidad
+        PosicionRanking.objects.bulk_create(posiciones, batch_size=TAMANO_LOTE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0012_comerciante_activo_comerciante_baja_solicitada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableroRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tablero', models.CharField(choices=[('global', 'Global'), ('comuna', 'Comuna'), ('tipo', 'Tipo de negocio')], max_length=10)),
+                ('valor', models.CharField(blank=True, default='', help_text='Comuna o tipo de negocio; vacío en el global.', max_length=50)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('top', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'verbose_name': 'Tablero de ranking',
+                'verbose_name_plural': 'Tableros de ranking',
+                'constraints': [models.UniqueConstraint(fields=('tablero', 'valor'), name='tablero_ranking_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PosicionRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('puntos', models.IntegerField()),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('posicion', models.PositiveIntegerField(default=1)),
+                ('tablero', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posiciones', to='usuarios.tableroranking')),
+            ],
+            options={
+                'verbose_name': 'Posición de ranking',
+                'verbose_name_plural': 'Posiciones de ranking',
+                'constraints': [models.UniqueConstraint(fields=('tablero', 'puntos'), name='posicion_ranking_unica')],
+            },
+        ),
+        migrations.RunPython(armar_tableros, migrations.RunPython.noop),
+    ]
@@ -49,6 +49,23 @@ INTERESTS_CHOICES = [
     ('SEGUROS', 'Seguros para Negocios'),
 ]
 
+# Cada interés es un bit de Comerciante.intereses_mask, según su posición en
+# INTERESTS_CHOICES. Nuevos intereses se agregan SIEMPRE al final de la lista.
+INTERESES_BITS = {codigo: 1 << i for i, (codigo, _) in enumerate(INTERESTS_CHOICES)}
+
+
+def intereses_a_mascara(codigos):
+    """['MARKETING', 'VENTAS'] -> entero con esos bits encendidos."""
+    mascara = 0
+    for codigo in codigos:
+        mascara |= INTERESES_BITS.get(codigo, 0)
+    return mascara
+
+
+def mascara_a_intereses(mascara):
+    """Entero -> lista de códigos, en el orden de INTERESTS_CHOICES."""
+    return [codigo for codigo, bit in INTERESES_BITS.items() if mascara & bit]
+
 # Categorías para publicaciones del foro (ESTADO RESTAURADO)
 CATEGORIA_POST_CHOICES = [
     ('DUDA', 'Duda / Pregunta'),
@@ -110,6 +127,15 @@ class Comerciante(models.Model):
     relacion_negocio = models.CharField(max_length=10, choices=RELACION_NEGOCIO_CHOICES)
     tipo_negocio = models.CharField(max_length=20, choices=TIPO_NEGOCIO_CHOICES)
     comuna = models.CharField(max_length=50) 
+    # Comuna normalizada (ver usuarios/comunas.py): permite cruzar con proveedores por id
+    comuna_normalizada = models.ForeignKey(
+        'proveedor.Comuna',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='comerciantes',
+        verbose_name='Comuna (normalizada)'
+    )
     nombre_negocio = models.CharField(max_length=100, default='Mi Negocio Local', blank=True)
 
     # ----------------------------------------------------
@@ -121,11 +147,10 @@ class Comerciante(models.Model):
         blank=True, 
         null=True
     )
-    intereses = models.CharField(
-        max_length=512, 
-        default='', 
-        blank=True, 
-        help_text="Códigos de intereses separados por coma."
+    intereses_mask = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Intereses',
+        help_text="Máscara de bits de INTERESTS_CHOICES (ver INTERESES_BITS)."
     )
     
     puntos = models.IntegerField(default=0, verbose_name='Puntos Acumulados')
@@ -146,6 +171,10 @@ class Comerciante(models.Model):
     # Tu campo de conexión personalizado (eliminar la duplicación y usar auto_now)
     ultima_conexion = models.DateTimeField(auto_now=True)
 
+    # Baja de cuenta (ver usuarios/bajas.py): se desactiva al instante y se borra por lotes después
+    activo = models.BooleanField(default=True, verbose_name='Cuenta activa')
+    baja_solicitada = models.DateTimeField(null=True, blank=True, verbose_name='Baja solicitada')
+
     # ====================================================
     # 5. MÉTODOS Y PROPIEDADES DE AUTENTICACIÓN (Requeridos)
     # ====================================================
@@ -158,7 +187,7 @@ class Comerciante(models.Model):
     @property
     def is_active(self):
         """Requerido para verificación de estado."""
-        return True
+        return self.activo
 
     @property
     def is_anonymous(self):
@@ -182,10 +211,20 @@ class Comerciante(models.Model):
     class Meta:
         verbose_name = 'Comerciante'
         verbose_name_plural = 'Comerciantes'
+        indexes = [
+            # Rankings (usuarios/rankings.py)
+            models.Index(fields=['-puntos'], name='comerciante_puntos_idx'),
+            models.Index(fields=['comuna', '-puntos'], name='comerciante_comuna_pts_idx'),
+            models.Index(fields=['tipo_negocio', '-puntos'], name='comerciante_tipo_pts_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nombre_apellido} ({self.email})"
 
+    @property
+    def intereses_codigos(self):
+        return mascara_a_intereses(self.intereses_mask)
+
     def get_profile_picture_url(self):
         DEFAULT_IMAGE_PATH = 'usuarios/img/default_profile.png'
         if self.foto_perfil and self.foto_perfil.name and self.foto_perfil.name != DEFAULT_IMAGE_PATH:
@@ -281,6 +320,10 @@ class Beneficio(models.Model):
     puntos_requeridos = models.IntegerField(default=0, verbose_name="Puntos Requeridos")
     estado = models.CharField(max_length=30, choices=ESTADO_BENEFICIO, default='ACTIVO')
     
+    # Canjes (ver usuarios/canjes.py)
+    stock = models.PositiveIntegerField(null=True, blank=True, verbose_name="Stock disponible", help_text="Vacío = sin límite.")
+    limite_por_comerciante = models.PositiveIntegerField(default=0, verbose_name="Canjes por comerciante", help_text="0 = sin límite.")
+    
     # Campo para registrar quién subió el beneficio
     creado_por = models.ForeignKey(
         User,
@@ -295,6 +338,125 @@ class Beneficio(models.Model):
         verbose_name = 'Beneficio y Promoción'
         verbose_name_plural = 'Beneficios y Promociones'
         ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['puntos_requeridos'], name='beneficio_puntos_req_idx'),
+            models.Index(fields=['categoria', 'puntos_requeridos'], name='beneficio_cat_puntos_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.get_categoria_display()}] {self.titulo}"
+
+# --- LIBRO DE PUNTOS (solo inserción) ---
+
+MOTIVO_MOVIMIENTO_CHOICES = [
+    ('SALDO_INICIAL', 'Saldo inicial'),
+    ('POST', 'Publicación en el foro'),
+    ('COMENTARIO', 'Comentario'),
+    ('LIKE_RECIBIDO', 'Like recibido'),
+    ('CANJE', 'Canje de beneficio'),
+    ('AJUSTE', 'Ajuste manual'),
+]
+
+
+class MovimientoPuntos(models.Model):
+    """
+    Cada cambio de puntos de un comerciante queda registrado aquí.
+    'clave_evento' es única: el mismo evento nunca otorga puntos dos veces.
+    Comerciante.puntos es la suma de estos movimientos.
+    """
+    comerciante = models.ForeignKey(
+        Comerciante,
+        on_delete=models.CASCADE,
+        related_name='movimientos_puntos',
+        verbose_name='Comerciante'
+    )
+    puntos = models.IntegerField(verbose_name='Puntos')
+    motivo = models.CharField(max_length=30, choices=MOTIVO_MOVIMIENTO_CHOICES, verbose_name='Motivo')
+    clave_evento = models.CharField(max_length=100, unique=True, verbose_name='Clave del evento')
+    fecha = models.DateTimeField(default=timezone.now, verbose_name='Fecha')
+
+    class Meta:
+        verbose_name = 'Movimiento de Puntos'
+        verbose_name_plural = 'Movimientos de Puntos'
+        ordering = ['-fecha']
+
+    def __str__(self):
+        return f"{self.puntos:+d} a {self.comerciante.nombre_apellido} ({self.get_motivo_display()})"
+
+
+class Canje(models.Model):
+    """Registro de cada beneficio canjeado por un comerciante."""
+    beneficio = models.ForeignKey(
+        Beneficio,
+        on_delete=models.CASCADE,
+        related_name='canjes',
+        verbose_name='Beneficio'
+    )
+    comerciante = models.ForeignKey(
+        Comerciante,
+        on_delete=models.CASCADE,
+        related_name='canjes',
+        verbose_name='Comerciante'
+    )
+    puntos = models.IntegerField(verbose_name='Puntos descontados')
+    fecha = models.DateTimeField(default=timezone.now, verbose_name='Fecha del canje')
+
+    class Meta:
+        verbose_name = 'Canje'
+        verbose_name_plural = 'Canjes'
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['comerciante', 'beneficio'], name='canje_comerciante_benef_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.comerciante.nombre_apellido} canjeó {self.beneficio.titulo}"
+
+
+class TableroRanking(models.Model):
+    """
+    Un tablero de ranking: el global, el de una comuna o el de un tipo de
+    negocio. Guarda su total de miembros y su top ya armado. Lo mantiene
+    usuarios/rankings.py.
+    """
+    TABLERO_CHOICES = [
+        ('global', 'Global'),
+        ('comuna', 'Comuna'),
+        ('tipo', 'Tipo de negocio'),
+    ]
+    tablero = models.CharField(max_length=10, choices=TABLERO_CHOICES)
+    valor = models.CharField(max_length=50, blank=True, default='', help_text='Comuna o tipo de negocio; vacío en el global.')
+    total = models.PositiveIntegerField(default=0)
+    top = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        verbose_name = 'Tablero de ranking'
+        verbose_name_plural = 'Tableros de ranking'
+        constraints = [
+            models.UniqueConstraint(fields=['tablero', 'valor'], name='tablero_ranking_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tablero_display()} {self.valor}".strip()
+
+
+class PosicionRanking(models.Model):
+    """
+    Posición de un puntaje dentro de un tablero: 'posicion' es 1 + la cantidad
+    de comerciantes con más puntos y 'cantidad', cuántos tienen exactamente
+    esos puntos. Los empatados comparten la posición.
+    """
+    tablero = models.ForeignKey(TableroRanking, on_delete=models.CASCADE, related_name='posiciones')
+    puntos = models.IntegerField()
+    cantidad = models.PositiveIntegerField(default=0)
+    posicion = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        verbose_name = 'Posición de ranking'
+        verbose_name_plural = 'Posiciones de ranking'
+        constraints = [
+            models.UniqueConstraint(fields=['tablero', 'puntos'], name='posicion_ranking_unica'),
+        ]
 
     def __str__(self):
-        return f"[{self.get_categoria_display()}] {self.titulo}"
\ No newline at end of file
+        return f"{self.tablero}: {self.puntos} puntos, posición {self.posicion}"
@@ -0,0 +1,98 @@
+# usuarios/puntos.py
+
+"""
+Motor de reglas de puntos.
+
+Todos los cambios de Comerciante.puntos pasan por otorgar_puntos(): primero se
+inserta el movimiento en el libro (MovimientoPuntos) y luego se incrementa el
+saldo con un UPDATE atómico (F('puntos') + n), sin leer-modificar-escribir.
+En la misma transacción se recalcula nivel_actual con un UPDATE ... CASE y se
+corren las posiciones en los tableros de rankings (usuarios/rankings.py).
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+
+from .models import Comerciante, MovimientoPuntos, NIVELES
+from . import rankings
+
+# Puntos que otorga cada tipo de evento
+REGLAS_PUNTOS = {
+    'POST': 10,
+    'COMENTARIO': 2,
+    'LIKE_RECIBIDO': 1,
+}
+
+# Cada nivel abarca UMBRAL_PUNTOS_NIVEL puntos: 0-99 BRONCE, 100-199 PLATA, ...
+UMBRAL_PUNTOS_NIVEL = 100
+
+
+def expresion_nivel():
+    """CASE que asigna el nivel según los puntos, evaluado por la base de datos."""
+    codigos = [codigo for codigo, _ in NIVELES]
+    return Case(
+        *[
+            When(puntos__lt=(i + 1) * UMBRAL_PUNTOS_NIVEL, then=Value(codigo))
+            for i, codigo in enumerate(codigos[:-1])
+        ],
+        default=Value(codigos[-1]),
+    )
+
+
+def actualizar_niveles(queryset=None):
+    """
+    Recalcula nivel_actual con un único UPDATE ... CASE sobre el queryset
+    (por defecto todos), escribiendo solo las filas cuyo nivel cambió.
+    Devuelve la cantidad de filas actualizadas.
+    """
+    if queryset is None:
+        queryset = Comerciante.objects.all()
+    nivel = expresion_nivel()
+    return queryset.exclude(nivel_actual=nivel).update(nivel_actual=nivel)
+
+
+def otorgar_puntos(comerciante_id, motivo, clave_evento, puntos=None):
+    """
+    Registra el movimiento y actualiza el saldo en una sola transacción.
+    Devuelve False si el evento ya había sido otorgado (idempotente).
+    """
+    if puntos is None:
+        puntos = REGLAS_PUNTOS[motivo]
+    if not puntos:
+        return False
+
+    try:
+        with transaction.atomic():
+            MovimientoPuntos.objects.create(
+                comerciante_id=comerciante_id,
+                puntos=puntos,
+                motivo=motivo,
+                clave_evento=clave_evento,
+            )
+            Comerciante.objects.filter(pk=comerciante_id).update(puntos=F('puntos') + puntos)
+            actualizar_niveles(Comerciante.objects.filter(pk=comerciante_id))
+            rankings.registrar_cambio_puntos(comerciante_id, puntos)
+    except IntegrityError:
+        # La clave del evento ya existe: los puntos ya fueron otorgados.
+        return False
+
+    return True
+
+
+# --- Reglas por evento ---
+
+def puntos_por_post(post):
+    return otorgar_puntos(post.comerciante_id, 'POST', f'post:{post.pk}')
+
+
+def puntos_por_comentario(comentario):
+    return otorgar_puntos(comentario.comerciante_id, 'COMENTARIO', f'comentario:{comentario.pk}')
+
+
+def puntos_por_like(like):
+    """El like suma puntos al autor del post (no a quien lo da, ni a sí mismo)."""
+    autor_id = like.post.comerciante_id
+    if autor_id == like.comerciante_id:
+        return False
+    # La clave no usa el id del Like: quitar y volver a dar like no suma de nuevo.
+    return otorgar_puntos(autor_id, 'LIKE_RECIBIDO', f'like:{like.post_id}:{like.comerciante_id}')
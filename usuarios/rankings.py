@@ -0,0 +1,283 @@
+# usuarios/rankings.py
+
+"""
+Rankings de comerciantes por puntos: global, por comuna y por tipo de negocio.
+
+Los tableros viven en la base de datos y los comparten todos los procesos:
+    - TableroRanking: uno por tablero, con su total de miembros y su top armado;
+    - PosicionRanking: una fila por cada puntaje distinto del tablero, con
+      cuántos comerciantes lo tienen y su posición (1 + los que tienen más).
+Consultar la posición de un comerciante es leer la fila de su puntaje; no se
+cuenta nada al consultar. Los tres tableros salen en una sola consulta, y el
+contexto armado se guarda TTL_CONTEXTO segundos en la caché (no depende de
+invalidaciones: como mucho muestra el tablero de hace unos segundos).
+
+Los cambios de puntos (usuarios/puntos.py, usuarios/canjes.py) y de comuna,
+tipo o estado de un comerciante (signals, bajas) se aplican dentro de la
+misma transacción: se bloquean los tableros afectados y solo se corren las
+posiciones de los puntajes que quedan entre el valor anterior y el nuevo.
+reconstruir_rankings() rehace todo tras las cargas o correcciones masivas.
+"""
+
+import hashlib
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Comerciante, PosicionRanking, TableroRanking, TIPO_NEGOCIO_CHOICES
+
+TOP_N = 10
+TTL_CONTEXTO = 30
+TAMANO_LOTE = 1000
+
+
+def _tableros(comuna, tipo_negocio):
+    return [('global', ''), ('comuna', comuna or ''), ('tipo', tipo_negocio or '')]
+
+
+def _filtro(tablero, valor):
+    filtro = {'activo': True}
+    if tablero == 'comuna':
+        filtro['comuna'] = valor
+    elif tablero == 'tipo':
+        filtro['tipo_negocio'] = valor
+    return filtro
+
+
+def _q_tableros(claves, prefijo=''):
+    return reduce(or_, (Q(**{f'{prefijo}tablero': tablero, f'{prefijo}valor': valor}) for tablero, valor in claves))
+
+
+def _consultar_top(tablero, valor):
+    filas = (
+        Comerciante.objects.filter(**_filtro(tablero, valor))
+        .order_by('-puntos', 'pk')
+        .values('pk', 'nombre_apellido', 'nombre_negocio', 'comuna', 'puntos')[:TOP_N]
+    )
+    return [
+        {'id': f['pk'], 'nombre': f['nombre_apellido'], 'negocio': f['nombre_negocio'],
+         'comuna': f['comuna'], 'puntos': f['puntos']}
+        for f in filas
+    ]
+
+
+# --- Lectura ---
+
+def _posicion_desde_arriba(tablero, puntos):
+    """Posición de un puntaje sin fila propia: la del puntaje inmediatamente mayor más sus empatados."""
+    arriba = (
+        PosicionRanking.objects.filter(tablero=tablero, puntos__gt=puntos)
+        .order_by('puntos').values('posicion', 'cantidad').first()
+    )
+    return arriba['posicion'] + arriba['cantidad'] if arriba else 1
+
+
+def _leer(comerciante):
+    claves = _tableros(comerciante.comuna, comerciante.tipo_negocio)
+    posiciones = {
+        (p.tablero.tablero, p.tablero.valor): p
+        for p in PosicionRanking.objects.select_related('tablero')
+        .filter(_q_tableros(claves, 'tablero__'), puntos=comerciante.puntos)
+    }
+    if len(posiciones) == len(claves):
+        return {
+            clave: {'top': p.tablero.top, 'posicion': p.posicion, 'total': p.tablero.total}
+            for clave, p in posiciones.items()
+        }
+
+    # Sus puntos no están en el tablero (p. ej. el objeto en memoria quedó atrás)
+    tableros = {(t.tablero, t.valor): t for t in TableroRanking.objects.filter(_q_tableros(claves))}
+    rankings = {}
+    for clave in claves:
+        tablero = tableros.get(clave)
+        if tablero is None:
+            rankings[clave] = {'top': [], 'posicion': 1, 'total': 0}
+        elif clave in posiciones:
+            rankings[clave] = {'top': tablero.top, 'posicion': posiciones[clave].posicion, 'total': tablero.total}
+        else:
+            posicion = _posicion_desde_arriba(tablero, comerciante.puntos)
+            rankings[clave] = {'top': tablero.top, 'posicion': posicion, 'total': max(tablero.total, posicion)}
+    return rankings
+
+
+def rankings_comerciante(comerciante):
+    """Contexto de los tres rankings para las vistas de perfil y beneficios."""
+    # Los puntos, la comuna y el tipo van en la clave: un cambio propio se ve al instante
+    digest = hashlib.md5(f'{comerciante.comuna}|{comerciante.tipo_negocio}'.encode('utf-8')).hexdigest()
+    clave = f'ranking:{comerciante.pk}:{comerciante.puntos}:{digest}'
+    contexto = cache.get(clave)
+    if contexto is not None:
+        return contexto
+
+    rankings = _leer(comerciante)
+    ranking_global, ranking_comuna, ranking_tipo = (
+        rankings[clave_tablero] for clave_tablero in _tableros(comerciante.comuna, comerciante.tipo_negocio)
+    )
+    tipo_display = dict(TIPO_NEGOCIO_CHOICES).get(comerciante.tipo_negocio, comerciante.tipo_negocio)
+    contexto = {
+        'ranking_global': ranking_global,
+        'ranking_comuna': ranking_comuna,
+        'ranking_tipo': ranking_tipo,
+        'rankings_listado': [
+            ('Global', ranking_global),
+            (f'Comuna: {comerciante.comuna}', ranking_comuna),
+            (f'Tipo: {tipo_display}', ranking_tipo),
+        ],
+    }
+    cache.set(clave, contexto, TTL_CONTEXTO)
+    return contexto
+
+
+# --- Actualización incremental ---
+
+def _bloquear(claves):
+    """Tableros de las claves, creados si faltan y bloqueados hasta el final de la transacción."""
+    claves = sorted(set(claves))
+    # Siempre en el mismo orden, para que dos cambios simultáneos no se bloqueen entre sí
+    tableros = {
+        (t.tablero, t.valor): t
+        for t in TableroRanking.objects.select_for_update().filter(_q_tableros(claves)).order_by('tablero', 'valor')
+    }
+    for tablero, valor in claves:
+        if (tablero, valor) not in tableros:
+            TableroRanking.objects.get_or_create(tablero=tablero, valor=valor)
+            tableros[(tablero, valor)] = TableroRanking.objects.select_for_update().get(tablero=tablero, valor=valor)
+    return tableros
+
+
+def _mover(tablero, comerciante_id, anterior=None, nuevo=None):
+    """
+    Mueve a un comerciante de 'anterior' a 'nuevo' puntos dentro del tablero
+    (None = no estaba / ya no está). Solo se tocan los puntajes intermedios.
+    """
+    posiciones = PosicionRanking.objects.filter(tablero=tablero)
+    if anterior != nuevo:
+        # Los puntajes que pasa (o que lo pasan) cambian de posición en uno
+        if anterior is None:
+            posiciones.filter(puntos__lt=nuevo).update(posicion=F('posicion') + 1)
+        elif nuevo is None:
+            posiciones.filter(puntos__lt=anterior).update(posicion=F('posicion') - 1)
+        elif anterior < nuevo:
+            posiciones.filter(puntos__gte=anterior, puntos__lt=nuevo).update(posicion=F('posicion') + 1)
+        else:
+            posiciones.filter(puntos__gte=nuevo, puntos__lt=anterior).update(posicion=F('posicion') - 1)
+
+        if anterior is not None:
+            posiciones.filter(puntos=anterior, cantidad__gt=0).update(cantidad=F('cantidad') - 1)
+            posiciones.filter(puntos=anterior, cantidad=0).delete()
+        if nuevo is not None and not posiciones.filter(puntos=nuevo).update(cantidad=F('cantidad') + 1):
+            PosicionRanking.objects.create(
+                tablero=tablero, puntos=nuevo, cantidad=1, posicion=_posicion_desde_arriba(tablero, nuevo),
+            )
+        tablero.total = max(0, tablero.total + (nuevo is not None) - (anterior is not None))
+
+    # El top se vuelve a leer solo si el comerciante está o puede entrar en él
+    top = tablero.top
+    en_top = any(fila['id'] == comerciante_id for fila in top)
+    entra_al_top = nuevo is not None and (len(top) < TOP_N or nuevo >= top[-1]['puntos'])
+    if en_top or entra_al_top:
+        tablero.top = _consultar_top(tablero.tablero, tablero.valor)
+    TableroRanking.objects.filter(pk=tablero.pk).update(total=tablero.total, top=tablero.top)
+
+
+def _aplicar(comerciante_id, antes, despues):
+    """'antes' y 'despues' son {(tablero, valor): puntos} del comerciante."""
+    claves = antes.keys() | despues.keys()
+    if not claves:
+        return
+    with transaction.atomic():
+        tableros = _bloquear(claves)
+        for clave in sorted(claves):
+            _mover(tableros[clave], comerciante_id, antes.get(clave), despues.get(clave))
+
+
+def registrar_cambio_puntos(comerciante_id, delta):
+    """Hook de los cambios de puntos; se llama dentro de su transacción, después del UPDATE."""
+    fila = (
+        Comerciante.objects.filter(pk=comerciante_id)
+        .values('puntos', 'comuna', 'tipo_negocio', 'activo')
+        .first()
+    )
+    if fila is None or not fila['activo'] or not delta:
+        return
+    claves = _tableros(fila['comuna'], fila['tipo_negocio'])
+    _aplicar(
+        comerciante_id,
+        {clave: fila['puntos'] - delta for clave in claves},
+        {clave: fila['puntos'] for clave in claves},
+    )
+
+
+def registrar_cambio_comerciante(comerciante, anterior=None):
+    """
+    Refleja altas, reactivaciones, cambios de comuna/tipo y cambios de nombre.
+    'anterior' es un dict con 'puntos', 'comuna', 'tipo_negocio' y 'activo'
+    previos (None si es nuevo).
+    """
+    antes = {}
+    if anterior and anterior['activo']:
+        antes = {clave: anterior['puntos'] for clave in _tableros(anterior['comuna'], anterior['tipo_negocio'])}
+    despues = {}
+    if comerciante.activo:
+        despues = {clave: comerciante.puntos for clave in _tableros(comerciante.comuna, comerciante.tipo_negocio)}
+    _aplicar(comerciante.pk, antes, despues)
+
+
+def registrar_baja_comerciante(comerciante):
+    """Saca al comerciante de sus tableros (baja o borrado), con los datos de la instancia."""
+    _aplicar(
+        comerciante.pk,
+        {clave: comerciante.puntos for clave in _tableros(comerciante.comuna, comerciante.tipo_negocio)},
+        {},
+    )
+
+
+# --- Reconstrucción ---
+
+def reconstruir_rankings():
+    """
+    Rehace todos los tableros desde Comerciante (tras importaciones o
+    reconciliaciones masivas, que no pasan por los hooks). Devuelve la
+    cantidad de tableros.
+    """
+    with transaction.atomic():
+        # Los cambios en curso esperan a que termine la reconstrucción
+        list(TableroRanking.objects.select_for_update().values_list('pk', flat=True))
+
+        grupos = {}
+        for tablero, campo in (('global', None), ('comuna', 'comuna'), ('tipo', 'tipo_negocio')):
+            campos = [campo] if campo else []
+            filas = (
+                Comerciante.objects.filter(activo=True)
+                .values(*campos, 'puntos').annotate(cantidad=Count('pk')).order_by(*campos, '-puntos')
+            )
+            for fila in filas:
+                grupos.setdefault((tablero, fila[campo] if campo else ''), []).append((fila['puntos'], fila['cantidad']))
+
+        PosicionRanking.objects.all().delete()
+        TableroRanking.objects.all().delete()
+        tableros = TableroRanking.objects.bulk_create([
+            TableroRanking(
+                tablero=tablero, valor=valor,
+                total=sum(cantidad for _, cantidad in puntajes),
+                top=_consultar_top(tablero, valor),
+            )
+            for (tablero, valor), puntajes in grupos.items()
+        ])
+        if any(t.pk is None for t in tableros):
+            # Sin RETURNING (MySQL) bulk_create no trae los ids
+            ids = {(t.tablero, t.valor): t.pk for t in TableroRanking.objects.all()}
+            for t in tableros:
+                t.pk = ids[(t.tablero, t.valor)]
+
+        posiciones = []
+        for tablero in tableros:
+            posicion = 1
+            for puntos, cantidad in grupos[(tablero.tablero, tablero.valor)]:
+                posiciones.append(PosicionRanking(tablero_id=tablero.pk, puntos=puntos, cantidad=cantidad, posicion=posicion))
+                posicion += cantidad
+        PosicionRanking.objects.bulk_create(posiciones, batch_size=TAMANO_LOTE)
+    return len(tableros)
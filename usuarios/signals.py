@@ -1,11 +1,15 @@
 # usuarios/signals.py
 
 from django.contrib.auth.signals import user_logged_in
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.contrib.auth.models import update_last_login
 from django.conf import settings
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Comerciante # Importa tu modelo Comerciante
+from .models import Comerciante, Post, Comentario, Like, Beneficio # Importa tu modelo Comerciante
+from . import puntos, rankings, catalogo, comunas
+from proveedor.models import Comuna
 
 # Desconecta la señal de last_login. Esto se hace para evitar que Django 
 # intente actualizar el campo 'last_login' que no existe en Comerciante.
@@ -38,4 +42,76 @@ except ImportError:
 
 @receiver(user_logged_in, sender=Comerciante)
 def do_not_update_last_login(sender, request, **kwargs):
-    pass
\ No newline at end of file
+    pass
+
+
+# --- Reglas de puntos (ver usuarios/puntos.py) ---
+
+@receiver(post_save, sender=Post)
+def otorgar_puntos_post(sender, instance, created, **kwargs):
+    if created:
+        puntos.puntos_por_post(instance)
+
+
+@receiver(post_save, sender=Comentario)
+def otorgar_puntos_comentario(sender, instance, created, **kwargs):
+    if created:
+        puntos.puntos_por_comentario(instance)
+
+
+@receiver(post_save, sender=Like)
+def otorgar_puntos_like(sender, instance, created, **kwargs):
+    if created:
+        puntos.puntos_por_like(instance)
+
+
+# --- Tableros de rankings (ver usuarios/rankings.py) ---
+
+CAMPOS_RANKING = {'puntos', 'comuna', 'tipo_negocio', 'activo', 'nombre_apellido', 'nombre_negocio'}
+
+
+@receiver(pre_save, sender=Comerciante)
+def guardar_datos_ranking_anteriores(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not CAMPOS_RANKING.intersection(update_fields):
+        return
+    anterior = None
+    if instance.pk:
+        anterior = (
+            Comerciante.objects.filter(pk=instance.pk)
+            .values('puntos', 'comuna', 'tipo_negocio', 'activo')
+            .first()
+        )
+    instance._ranking_anterior = anterior
+    instance._ranking_pendiente = True
+
+
+@receiver(post_save, sender=Comerciante)
+def actualizar_rankings_comerciante(sender, instance, **kwargs):
+    if not getattr(instance, '_ranking_pendiente', False):
+        return
+    instance._ranking_pendiente = False
+    anterior = instance._ranking_anterior
+    rankings.registrar_cambio_comerciante(instance, anterior)
+
+
+@receiver(post_delete, sender=Comerciante)
+def quitar_de_rankings(sender, instance, **kwargs):
+    # Las cuentas dadas de baja ya salieron de los rankings al desactivarse.
+    if instance.activo:
+        rankings.registrar_baja_comerciante(instance)
+
+
+# --- Catálogo de beneficios en caché (ver usuarios/catalogo.py) ---
+
+@receiver(post_save, sender=Beneficio)
+@receiver(post_delete, sender=Beneficio)
+def invalidar_catalogo_beneficios(sender, **kwargs):
+    transaction.on_commit(catalogo.invalidar_catalogo)
+
+
+# --- Índice de comunas para normalizar (ver usuarios/comunas.py) ---
+
+@receiver(post_save, sender=Comuna)
+@receiver(post_delete, sender=Comuna)
+def reiniciar_indice_comunas(sender, **kwargs):
+    comunas.reiniciar_indice()
@@ -16,9 +16,11 @@ urlpatterns = [
     
     # PERFIL
     path('perfil/', views.perfil_view, name='perfil'),
+    path('perfil/exportar/', views.exportar_datos_view, name='exportar_datos'),
     
     # BENEFICIOS (NUEVA RUTA)
     path('beneficios/', views.beneficios_view, name='beneficios'),
+    path('beneficios/<int:beneficio_id>/canjear/', views.canjear_beneficio_view, name='canjear_beneficio'),
     
     # RESTAURADO: Detalle del Post y Comentarios (Ver comentarios)
     path('post/<int:post_id>/', views.post_detail_view, name='post_detail'),
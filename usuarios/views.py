@@ -1,6 +1,7 @@
 # usuarios/views.py (CONTENIDO COMPLETO MODIFICADO)
 
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import StreamingHttpResponse
 from django.contrib import messages
 from django.contrib.auth.hashers import make_password, check_password 
 from django.core.files.storage import default_storage 
@@ -14,7 +15,7 @@ from django.contrib.auth.decorators import login_required
 # Importamos los modelos y las opciones
 from .models import (
     Comerciante, Post, Like, Comentario, INTERESTS_CHOICES, Beneficio,
-    NIVELES, CATEGORIAS 
+    NIVELES, CATEGORIAS, intereses_a_mascara
 ) 
 
 # Importamos todos los formularios necesarios
@@ -28,6 +29,13 @@ from .forms import (
     InterestsForm,
     ComentarioForm 
 )
+from .puntos import UMBRAL_PUNTOS_NIVEL
+from .canjes import canjear_beneficio, CanjeError
+from .catalogo import obtener_catalogo, beneficios_alcanzables, ORDENES_VALIDOS, ORDEN_POR_DEFECTO
+from .rankings import rankings_comerciante
+from .afinidad import comerciantes_afines
+from .bajas import solicitar_baja
+from .exportacion import generar_zip_datos
 
 # --- SIMULACIÓN DE ESTADO DE SESIÓN GLOBAL ---
 current_logged_in_user = None 
@@ -40,9 +48,11 @@ ROLES = {
 }
 
 # --- FUNCIÓN DE CÁLCULO DE NIVEL (LÓGICA SOLICITADA) ---
+# Solo calcula en memoria: nivel_actual se guarda desde usuarios/puntos.py
+# (al cambiar los puntos) y con el comando recalcular_niveles.
 def calcular_nivel_y_progreso(puntos):
     NIVELES_VALORES = [nivel[0] for nivel in NIVELES] # BRONCE, PLATA, ORO, PLATINO, DIAMANTE
-    UMBRAL_PUNTOS = 100 
+    UMBRAL_PUNTOS = UMBRAL_PUNTOS_NIVEL
     MAX_NIVEL_INDEX = len(NIVELES_VALORES) - 1 # Índice de Diamante (4)
     
     # 1. Determinar el índice del nivel actual
@@ -98,6 +108,7 @@ def registro_view(request):
             comuna_final = form.cleaned_data.get('comuna') 
             if comuna_final:
                 nuevo_comerciante.comuna = comuna_final
+                nuevo_comerciante.comuna_normalizada_id = form.cleaned_data.get('comuna_normalizada_id')
             
             # Inicializar Puntos y Nivel al registrar (BRONCE con 0 puntos)
             nuevo_comerciante.puntos = 0
@@ -139,11 +150,9 @@ def login_view(request):
                 # 1. Iniciar Sesión de Django (sin last_login porque el backend lo maneja)
                 login(request, comerciante) 
                 
-                # 2. Tu lógica de negocio (mantén esto)
-                progreso = calcular_nivel_y_progreso(comerciante.puntos)
-                comerciante.nivel_actual = progreso['nivel_codigo']
+                # 2. Tu lógica de negocio (el nivel ya viene guardado)
                 comerciante.ultima_conexion = timezone.now() # Tu campo de conexión
-                comerciante.save(update_fields=['ultima_conexion', 'nivel_actual'])
+                comerciante.save(update_fields=['ultima_conexion'])
                 current_logged_in_user = comerciante
                 
                 messages.success(request, f'¡Bienvenido {comerciante.nombre_apellido}!')
@@ -181,7 +190,7 @@ def plataforma_comerciante_view(request):
         messages.warning(request, 'Por favor, inicia sesión para acceder a la plataforma.')
         return redirect('login') 
         
-    posts_query = Post.objects.select_related('comerciante').annotate(
+    posts_query = Post.objects.filter(comerciante__activo=True).select_related('comerciante').annotate(
         comentarios_count=Count('comentarios', distinct=True), 
         likes_count=Count('likes', distinct=True),
         is_liked=Count('likes', filter=Q(likes__comerciante=current_logged_in_user)) 
@@ -257,12 +266,9 @@ def perfil_view(request):
         return redirect('login') 
         
     comerciante = current_logged_in_user 
-    progreso = calcular_nivel_y_progreso(comerciante.puntos) # Calcular progreso
-    
-    # Asegurar que el nivel del modelo esté actualizado
-    if comerciante.nivel_actual != progreso['nivel_codigo']:
-        comerciante.nivel_actual = progreso['nivel_codigo']
-        comerciante.save(update_fields=['nivel_actual'])
+    # Los puntos y el nivel se actualizan con UPDATE desde el libro: releer lo vigente
+    comerciante.refresh_from_db(fields=['puntos', 'nivel_actual'])
+    progreso = calcular_nivel_y_progreso(comerciante.puntos) # Calcular progreso (solo lectura)
     
     if request.method == 'POST':
         action = request.POST.get('action') 
@@ -270,7 +276,8 @@ def perfil_view(request):
         if action == 'edit_photo':
             photo_form = ProfilePhotoForm(request.POST, request.FILES, instance=comerciante)
             if photo_form.is_valid():
-                photo_form.save()
+                # Solo los campos del formulario: puntos y nivel se escriben desde el libro
+                photo_form.save(commit=False).save(update_fields=ProfilePhotoForm.Meta.fields)
                 messages.success(request, '¡Foto de perfil actualizada con éxito!')
                 return redirect('perfil')
             else:
@@ -284,7 +291,8 @@ def perfil_view(request):
                 if nuevo_email != comerciante.email and Comerciante.objects.filter(email=nuevo_email).exists():
                     messages.error(request, 'Este correo ya está registrado por otro usuario.')
                 else:
-                    contact_form.save()
+                    # Solo los campos del formulario: puntos y nivel se escriben desde el libro
+                    contact_form.save(commit=False).save(update_fields=ContactInfoForm.Meta.fields)
                     messages.success(request, 'Datos de contacto actualizados con éxito.')
                     current_logged_in_user.email = nuevo_email 
                     current_logged_in_user.whatsapp = contact_form.cleaned_data.get('whatsapp')
@@ -304,14 +312,20 @@ def perfil_view(request):
                 error_msgs = [f"{field.label}: {', '.join(error for error in field.errors)}" for field in business_form if field.errors]
                 messages.error(request, f'Error en los datos del negocio. {"; ".join(error_msgs)}')
 
+        elif action == 'delete_account':
+            solicitar_baja(comerciante)
+            logout(request)
+            current_logged_in_user = None
+            messages.info(request, 'Tu cuenta fue desactivada y sus datos se eliminarán en breve.')
+            return redirect('login')
+
         elif action == 'edit_interests':
             interests_form = InterestsForm(request.POST)
             if interests_form.is_valid():
                 intereses_seleccionados = interests_form.cleaned_data['intereses']
-                intereses_csv = ','.join(intereses_seleccionados)
                 
-                comerciante.intereses = intereses_csv
-                comerciante.save(update_fields=['intereses']) 
+                comerciante.intereses_mask = intereses_a_mascara(intereses_seleccionados)
+                comerciante.save(update_fields=['intereses_mask']) 
                 
                 messages.success(request, 'Intereses actualizados con éxito.')
                 return redirect('perfil')
@@ -322,8 +336,8 @@ def perfil_view(request):
     contact_form = ContactInfoForm(instance=comerciante) 
     business_form = BusinessDataForm(instance=comerciante) 
 
-    intereses_actuales_codigos = comerciante.intereses.split(',') if comerciante.intereses else []
-    interests_form = InterestsForm(initial={'intereses': [c for c in intereses_actuales_codigos if c]})
+    intereses_actuales_codigos = comerciante.intereses_codigos
+    interests_form = InterestsForm(initial={'intereses': intereses_actuales_codigos})
 
     intereses_choices_dict = dict(INTERESTS_CHOICES)
 
@@ -344,8 +358,11 @@ def perfil_view(request):
         'business_form': business_form,
         'interests_form': interests_form,
         
-        'intereses_actuales_codigos': [c for c in intereses_actuales_codigos if c],
+        'intereses_actuales_codigos': intereses_actuales_codigos,
         'intereses_choices_dict': intereses_choices_dict,
+        'comerciantes_afines': comerciantes_afines(comerciante),
+
+        **rankings_comerciante(comerciante),
     }
     
     return render(request, 'usuarios/perfil.html', context)
@@ -367,23 +384,20 @@ def beneficios_view(request):
     
     # 2. Obtener parámetros de la URL para filtrar y ordenar
     category_filter = request.GET.get('category', 'TODOS')
-    sort_by = request.GET.get('sort_by', '-fecha_creacion') 
+    sort_by = request.GET.get('sort_by', ORDEN_POR_DEFECTO) 
+    if sort_by not in ORDENES_VALIDOS:
+        sort_by = ORDEN_POR_DEFECTO
+    solo_alcanzables = request.GET.get('alcanzables') == '1'
     
-    # 3. Obtener beneficios y aplicar filtros
-    beneficios_queryset = Beneficio.objects.all()
-    
-    if category_filter and category_filter != 'TODOS':
-        beneficios_queryset = beneficios_queryset.filter(categoria=category_filter)
-        
-    valid_sort_fields = ['vence', '-vence', 'puntos_requeridos', '-puntos_requeridos', '-fecha_creacion']
-    if sort_by in valid_sort_fields:
-        beneficios_queryset = beneficios_queryset.order_by(sort_by)
+    # 3. Obtener beneficios: el catálogo en caché (una consulta como máximo) o,
+    # si solo se quieren los alcanzables, una consulta filtrada por sus puntos
+    if solo_alcanzables:
+        beneficios = beneficios_alcanzables(category_filter, sort_by, comerciante.puntos)
     else:
-        sort_by = '-fecha_creacion'
-        beneficios_queryset = beneficios_queryset.order_by(sort_by)
+        beneficios = obtener_catalogo(category_filter, sort_by)
 
     # 4. Checkear si hay beneficios (para el mensaje "No hay beneficios")
-    no_beneficios_disponibles = not beneficios_queryset.exists()
+    no_beneficios_disponibles = not beneficios
     
     context = {
         'comerciante': comerciante,
@@ -391,23 +405,62 @@ def beneficios_view(request):
         
         # CONTEXTO DE PUNTOS CALCULADO
         'puntos_actuales': comerciante.puntos,
-        'nivel_actual': dict(NIVELES).get(progreso['nivel_codigo'], 'Bronce'),
+        'nivel_actual': dict(NIVELES).get(comerciante.nivel_actual, 'Bronce'),
         'puntos_restantes': progreso['puntos_restantes'],
         'puntos_siguiente_nivel': progreso['puntos_siguiente_nivel'],
         'progreso_porcentaje': progreso['progreso_porcentaje'],
         'proximo_nivel': progreso['proximo_nivel'],
         
         # CONTEXTO DE BENEFICIOS
-        'beneficios': beneficios_queryset,
+        'beneficios': beneficios,
         'no_beneficios_disponibles': no_beneficios_disponibles,
         'CATEGORIAS': CATEGORIAS, 
         'current_category': category_filter, 
         'current_sort': sort_by, 
+        'solo_alcanzables': solo_alcanzables,
+
+        **rankings_comerciante(comerciante),
     }
     
     return render(request, 'usuarios/beneficios.html', context)
 
 
+def canjear_beneficio_view(request, beneficio_id):
+    global current_logged_in_user
+
+    if not current_logged_in_user:
+        messages.error(request, 'Debes iniciar sesión para canjear beneficios.')
+        return redirect('login')
+
+    if request.method == 'POST':
+        try:
+            canje = canjear_beneficio(current_logged_in_user.pk, beneficio_id)
+            # El saldo en memoria se pone al día aquí, no en cada visita a beneficios
+            current_logged_in_user.refresh_from_db(fields=['puntos', 'nivel_actual'])
+            messages.success(request, f'¡Canjeaste "{canje.beneficio.titulo}" por {canje.puntos} puntos!')
+        except CanjeError as e:
+            messages.error(request, str(e))
+
+    return redirect('beneficios')
+
+
+def exportar_datos_view(request):
+    global current_logged_in_user
+
+    if not current_logged_in_user:
+        messages.error(request, 'Debes iniciar sesión para descargar tus datos.')
+        return redirect('login')
+
+    # El zip se genera mientras se descarga; no se arma completo en memoria.
+    response = StreamingHttpResponse(
+        generar_zip_datos(current_logged_in_user.pk),
+        content_type='application/zip',
+    )
+    fecha = timezone.localdate().isoformat()
+    response['Content-Disposition'] = f'attachment; filename="mis_datos_{fecha}.zip"'
+    return response
+
+
 # --- VISTAS DE DETALLE DE POST Y ACCIONES ---
 
 def post_detail_view(request, post_id):